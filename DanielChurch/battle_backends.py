@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+
+class RateLimited(Exception):
+    """
+    Raised by a backend when the completion service asks us to slow down.
+    """
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("rate limited")
+        self.retry_after = retry_after
+
+
+class UsageCounter:
+    """
+    Counts requests and the tokens they used in `usage`.
+    """
+
+    def __init__(self):
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def record_usage(self, prompt_tokens: int, completion_tokens: int):
+        self.usage["requests"] += 1
+        self.usage["prompt_tokens"] += prompt_tokens
+        self.usage["completion_tokens"] += completion_tokens
+
+
+class CompletionBackend(UsageCounter, ABC):
+    """
+    Async chat completion service used by the concurrent battle resolver.
+    Every backend counts its requests and the tokens they used in `usage`.
+    """
+
+    @abstractmethod
+    async def complete(self, messages: List[dict], model: str, max_tokens: int) -> str:
+        """
+        Send one chat completion request and return the reply text.
+        """
+
+
+class OpenAIBackend(CompletionBackend):
+    """
+    Sends chat completions to OpenAI with the async client.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        import openai
+
+        super().__init__()
+        self._openai = openai
+        self.client = openai.AsyncOpenAI(api_key=api_key)
+
+    async def complete(self, messages: List[dict], model: str, max_tokens: int) -> str:
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens
+            )
+        except self._openai.RateLimitError as e:
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            raise RateLimited(float(retry_after) if retry_after else None) from e
+        if response.usage is not None:
+            self.record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+
+class FakeBackend(CompletionBackend):
+    """
+    Local stand-in for the completion service, for tests and offline runs.
+
+    The winner of each battle comes from `choose(team1, team2)` if given,
+    otherwise from a stable hash of the matchup. `latency` simulates the
+    round trip, and `rate_limit_every` makes every n-th request fail with
+    RateLimited, asking to wait `retry_after` seconds (None leaves the wait to
+    the caller's backoff). Batched prompts get a JSON
+    answer, in which `malformed_every` spoils every n-th verdict. Token
+    usage is estimated at four characters per token.
+    """
+
+    _CHOICE_PATTERN = re.compile(r"winner's school: (.+) or (.+)\.\s*$")
+    _BATCH_PATTERN = re.compile(r"^(\d+)\. (.+?) \(.*\) vs (.+?) \(.*\)$", re.MULTILINE)
+
+    def __init__(self, choose: Optional[Callable[[str, str], str]] = None,
+                 latency: float = 0.0, rate_limit_every: int = 0, malformed_every: int = 0,
+                 retry_after: Optional[float] = 0.0):
+        super().__init__()
+        self.choose = choose or self._hash_choice
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.malformed_every = malformed_every
+        self.requests = 0
+
+    @staticmethod
+    def _hash_choice(team1: str, team2: str) -> str:
+        first, second = sorted([team1, team2])
+        digest = hashlib.sha256(f"{first}|{second}".encode()).digest()
+        return first if digest[0] % 2 == 0 else second
+
+    def _answer(self, prompt: str) -> str:
+        matchups = self._BATCH_PATTERN.findall(prompt)
+        if matchups:
+            verdicts = []
+            for n, (number, team1, team2) in enumerate(matchups, 1):
+                if self.malformed_every and n % self.malformed_every == 0:
+                    verdicts.append({"id": int(number), "winner": "Nobody"})
+                else:
+                    verdicts.append({"id": int(number), "winner": self.choose(team1, team2)})
+            return json.dumps({"verdicts": verdicts})
+
+        match = self._CHOICE_PATTERN.search(prompt)
+        if not match:
+            return "I cannot decide."
+        return self.choose(match.group(1), match.group(2))
+
+    async def complete(self, messages: List[dict], model: str, max_tokens: int) -> str:
+        self.requests += 1
+        request_number = self.requests
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            raise RateLimited(retry_after=self.retry_after)
+        answer = self._answer(messages[-1]["content"])
+        self.record_usage(sum(len(message["content"]) for message in messages) // 4, len(answer) // 4)
+        return answer
+
+
+BACKENDS: Dict[str, Callable[[], CompletionBackend]] = {
+    "openai": OpenAIBackend,
+    "fake": FakeBackend,
+}
@@ -0,0 +1,106 @@
+import json
+import os
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = "mascot_battle_cache.json"
+CACHE_FORMAT_VERSION = 1
+
+
+class BattleCache:
+    """
+    Persistent store of mascot battle outcomes.
+
+    Entries are keyed by (model, prompt version, unordered team pair), so the
+    same matchup asked in either order shares one entry. Each entry keeps the
+    number of wins per team and the number of ties over every sample taken,
+    which gives both a verdict (the majority winner) and an empirical win rate.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.entries = data.get("entries", {})
+
+    @staticmethod
+    def key(model: str, prompt_version: int, team1: str, team2: str) -> str:
+        """
+        Build the cache key for a matchup, independent of team order.
+        """
+        first, second = sorted([team1, team2])
+        return f"{model}|{prompt_version}|{first}|{second}"
+
+    def get(self, model: str, prompt_version: int, team1: str, team2: str) -> Optional[dict]:
+        """
+        Return the stored entry for a matchup, or None if it was never sampled.
+        """
+        return self.entries.get(self.key(model, prompt_version, team1, team2))
+
+    def samples(self, model: str, prompt_version: int, team1: str, team2: str) -> int:
+        """
+        Return how many times a matchup has been sampled.
+        """
+        entry = self.get(model, prompt_version, team1, team2)
+        return entry["samples"] if entry else 0
+
+    def record(self, model: str, prompt_version: int, team1: str, team2: str,
+               winner: Optional[str]) -> dict:
+        """
+        Add one sampled outcome for a matchup. A winner of None records a tie.
+        """
+        key = self.key(model, prompt_version, team1, team2)
+        entry = self.entries.get(key)
+        if entry is None:
+            first, second = sorted([team1, team2])
+            entry = {
+                "model": model,
+                "prompt_version": prompt_version,
+                "teams": [first, second],
+                "wins": {first: 0, second: 0},
+                "ties": 0,
+                "samples": 0,
+            }
+            self.entries[key] = entry
+
+        if winner is None:
+            entry["ties"] += 1
+        else:
+            entry["wins"][winner] += 1
+        entry["samples"] += 1
+        return entry
+
+    def verdict(self, model: str, prompt_version: int, team1: str, team2: str) -> Optional[str]:
+        """
+        Return the majority winner of a matchup.
+        None means the matchup was never sampled or its samples are evenly split.
+        """
+        entry = self.get(model, prompt_version, team1, team2)
+        if not entry:
+            return None
+        wins1 = entry["wins"][team1]
+        wins2 = entry["wins"][team2]
+        if wins1 == wins2:
+            return None
+        return team1 if wins1 > wins2 else team2
+
+    def win_rate(self, model: str, prompt_version: int, team1: str, team2: str) -> Optional[float]:
+        """
+        Return the empirical probability that team1 beats team2.
+        Ties count as half a win for each side. None if the matchup was never sampled.
+        """
+        entry = self.get(model, prompt_version, team1, team2)
+        if not entry or entry["samples"] == 0:
+            return None
+        return (entry["wins"][team1] + 0.5 * entry["ties"]) / entry["samples"]
+
+    def save(self):
+        """
+        Write the cache to disk, replacing the old file atomically.
+        """
+        data = {"version": CACHE_FORMAT_VERSION, "entries": self.entries}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
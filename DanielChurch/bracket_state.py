@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+EMPTY = -1
+
+
+def link_rounds(rounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Work out where each game's winner goes when the bracket has no explicit links.
+    Games are numbered in (Round, Game) order, and the k-th game feeds slot k % 2
+    of game k // 2 + (first-round games), as the bracket's Game numbers always
+    have. For a power-of-two field that pairs each round's games in order; in a
+    smaller field the odd game out meets a later round's winner.
+    """
+    next_game = np.full(len(rounds), EMPTY, dtype=np.int32)
+    next_slot = np.zeros(len(rounds), dtype=np.int8)
+    if len(rounds) == 0:
+        return next_game, next_slot
+
+    k = np.arange(len(rounds))
+    target = k // 2 + np.count_nonzero(rounds == rounds.min())
+    linked = (rounds < rounds.max()) & (target < len(rounds))
+    next_game[linked] = target[linked]
+    next_slot[linked] = k[linked] % 2
+    return next_game, next_slot
+
+
+class BracketState:
+    """
+    Flat array view of a bracket, used while the tournament is being played.
+
+    Games are stored in (Round, Game) order. Teams are integer codes into
+    `teams`, with EMPTY marking an open slot or an undecided winner. Each game
+    knows which game its winner moves to (`next_game`, `next_slot`) and which
+    games feed its two slots (`feeders`), so advancing a winner is two array
+    writes instead of a DataFrame scan.
+
+    A bracket CSV may give the links itself with `NextGame` (the Game number)
+    and `NextSlot` (1 or 2) columns, which is needed for fields with play-in
+    games. Otherwise games are linked by their numbering (`link_rounds`).
+    """
+
+    def __init__(self, rounds: np.ndarray, games: np.ndarray, slots: np.ndarray,
+                 winners: np.ndarray, teams: List[str],
+                 next_game: Optional[np.ndarray] = None, next_slot: Optional[np.ndarray] = None):
+        self.rounds = np.asarray(rounds, dtype=np.int32)
+        self.games = np.asarray(games, dtype=np.int32)
+        self.slots = np.asarray(slots, dtype=np.int32)
+        self.winners = np.asarray(winners, dtype=np.int32)
+        self.teams = list(teams)
+        self.explicit_links = next_game is not None
+
+        if next_game is None:
+            next_game, next_slot = link_rounds(self.rounds)
+        self.next_game = np.asarray(next_game, dtype=np.int32)
+        self.next_slot = np.asarray(next_slot, dtype=np.int8)
+
+        self.feeders = np.full((len(self.games), 2), EMPTY, dtype=np.int32)
+        linked = np.flatnonzero(self.next_game != EMPTY)
+        self.feeders[self.next_game[linked], self.next_slot[linked]] = linked
+
+        self._relink()
+
+    def _relink(self):
+        """
+        Rebuild every slot that another game feeds from that game's winner,
+        replacing whatever the CSV had there, and empty any other slot naming
+        a team that already entered the bracket in an earlier game. A recorded
+        result whose teams change this way was played between the wrong teams
+        and is dropped.
+        """
+        entered = set()
+        for game in range(len(self.games)):
+            fed = self.feeders[game] != EMPTY
+            expected = np.where(fed, self.winners[self.feeders[game]], self.slots[game])
+            for slot in np.flatnonzero(~fed & (expected != EMPTY)):
+                if expected[slot] in entered:
+                    print(f"⚠️ Clearing {self.teams[expected[slot]]} from Round {self.rounds[game]}, "
+                          f"Game {self.games[game]}: it already entered the bracket")
+                    expected[slot] = EMPTY
+                entered.add(expected[slot])
+            if (expected == self.slots[game]).all():
+                continue
+            if self.winners[game] != EMPTY:
+                print(f"⚠️ Dropping the result of Round {self.rounds[game]}, Game {self.games[game]}: "
+                      f"its teams do not match the games feeding it")
+                self.winners[game] = EMPTY
+            self.slots[game] = expected
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "BracketState":
+        """
+        Build the state from a bracket DataFrame (Round, Game, Team1, Team2, Winner).
+        """
+        df = df.sort_values(['Round', 'Game']).reset_index(drop=True)
+        names = pd.concat([df['Team1'], df['Team2'], df['Winner']]).dropna()
+        teams = sorted(names.unique())
+        codes = {team: code for code, team in enumerate(teams)}
+
+        def encode(column: str) -> np.ndarray:
+            return df[column].map(codes).fillna(EMPTY).to_numpy(dtype=np.int32)
+
+        next_game = next_slot = None
+        if 'NextGame' in df.columns:
+            index_of_game = {game: i for i, game in enumerate(df['Game'])}
+            next_game = df['NextGame'].map(index_of_game).fillna(EMPTY).to_numpy(dtype=np.int32)
+            next_slot = df['NextSlot'].fillna(1).to_numpy(dtype=np.int8) - 1
+
+        return cls(df['Round'].to_numpy(), df['Game'].to_numpy(),
+                   np.column_stack([encode('Team1'), encode('Team2')]), encode('Winner'),
+                   teams, next_game, next_slot)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Convert the state back into a bracket DataFrame.
+        """
+        # EMPTY (-1) indexes the trailing None
+        names = np.array(self.teams + [None], dtype=object)
+        df = pd.DataFrame({
+            'Round': self.rounds,
+            'Game': self.games,
+            'Team1': names[self.slots[:, 0]],
+            'Team2': names[self.slots[:, 1]],
+            'Winner': names[self.winners],
+        })
+        if self.explicit_links:
+            next_numbers = pd.Series(self.games[self.next_game]).where(self.next_game != EMPTY)
+            df['NextGame'] = next_numbers.astype('Int64')
+            df['NextSlot'] = self.next_slot + 1
+        return df
+
+    def round_games(self, current_round: int) -> np.ndarray:
+        """
+        Return the indices of a round's games.
+        """
+        return np.flatnonzero(self.rounds == current_round)
+
+    def ready_games(self, current_round: int) -> np.ndarray:
+        """
+        Return the indices of a round's games that have both teams and no winner yet.
+        """
+        games = self.round_games(current_round)
+        ready = (self.winners[games] == EMPTY) & (self.slots[games] != EMPTY).all(axis=1)
+        return games[ready]
+
+    def bye_team(self, game: int) -> int:
+        """
+        Return the team that advances without playing, or EMPTY if the game is not a bye.
+        A game is a bye when one slot has a team and nothing can ever fill the other.
+        """
+        filled = self.slots[game] != EMPTY
+        fed = self.feeders[game] != EMPTY
+        if filled.sum() == 1 and not (fed & ~filled).any():
+            return int(self.slots[game][filled][0])
+        return EMPTY
+
+    def set_winner(self, game: int, team: int):
+        """
+        Record a game's winner and move them into their next-round slot.
+        """
+        self.winners[game] = team
+        self._advance(game)
+
+    def _advance(self, game: int):
+        following = self.next_game[game]
+        if following != EMPTY:
+            self.slots[following, self.next_slot[game]] = self.winners[game]
+
+    def champion(self) -> Optional[str]:
+        """
+        Return the winner of the final game, if it has been played.
+        """
+        final = self.winners[-1]
+        return None if final == EMPTY else self.teams[final]
+
+    def replay(self, win_prob: np.ndarray, replays: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Play the undecided part of the bracket `replays` times at once.
+
+        `win_prob[i, j]` is the probability that team code i beats team code j.
+        Decided games keep their recorded winner. Returns a (replays x games)
+        array of winner codes.
+        """
+        n_games = len(self.games)
+        winners = np.empty((replays, n_games), dtype=np.int32)
+        uniforms = rng.random((replays, n_games))
+
+        for game in range(n_games):
+            if self.winners[game] != EMPTY:
+                winners[:, game] = self.winners[game]
+                continue
+
+            # A slot is open when it has no team and no game feeds it
+            open_slots = (self.feeders[game] == EMPTY) & (self.slots[game] == EMPTY)
+            if open_slots.all():
+                raise ValueError(f"Round {self.rounds[game]}, Game {self.games[game]} has two open slots "
+                                 f"that no game fills")
+
+            sides = []
+            for slot in range(2):
+                feeder = self.feeders[game, slot]
+                if feeder != EMPTY:
+                    sides.append(winners[:, feeder])
+                else:
+                    sides.append(np.full(replays, self.slots[game, slot], dtype=np.int32))
+            team1, team2 = sides
+
+            # Byes pass the only team straight through
+            if open_slots[1]:
+                winners[:, game] = team1
+                continue
+            if open_slots[0]:
+                winners[:, game] = team2
+                continue
+
+            winners[:, game] = np.where(uniforms[:, game] < win_prob[team1, team2], team1, team2)
+
+        return winners
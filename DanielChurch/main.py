@@ -56,6 +56,69 @@ def get_team_stats(team_id):
         print(f"Error fetching data: {e}")
         return None
 
+def get_team_games(team_id):
+    """
+    Fetch a team's completed games from ESPN API, one row per game
+    """
+    base_url = f"http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams/{team_id}/schedule"
+    sec_names = {str(espn_id): school for school, espn_id in SEC_SCHOOLS.items()}
+    
+    try:
+        response = requests.get(base_url)
+        response.raise_for_status()
+        data = response.json()
+    except requests.RequestException as e:
+        print(f"Error fetching data: {e}")
+        return []
+    
+    games = []
+    for event in data.get('events', []):
+        for competition in event.get('competitions', [])[:1]:
+            if not competition.get('status', {}).get('type', {}).get('completed', False):
+                continue
+            
+            sides = {}
+            for team in competition.get('competitors', []):
+                score = team.get('score', {})
+                if isinstance(score, dict):
+                    score = score.get('value')
+                team_id_str = str(team.get('id'))
+                sides[team.get('homeAway')] = {
+                    'name': sec_names.get(team_id_str, team.get('team', {}).get('location', team_id_str)),
+                    'score': score
+                }
+            
+            if 'home' not in sides or 'away' not in sides:
+                continue
+            games.append({
+                'Game ID': event.get('id'),
+                'Date': event.get('date'),
+                'Home': sides['home']['name'],
+                'Away': sides['away']['name'],
+                'Home Score': sides['home']['score'],
+                'Away Score': sides['away']['score'],
+                'Neutral': competition.get('neutralSite', False)
+            })
+    
+    return games
+
+def save_game_results(path='sec_game_results.csv'):
+    """
+    Download every SEC team's completed games and save the head-to-head
+    results, so ratings can be fitted on them
+    """
+    all_games = []
+    for school, team_id in SEC_SCHOOLS.items():
+        print(f"Fetching games for {school}...")
+        all_games.extend(get_team_games(team_id))
+    
+    # Games between two SEC teams show up on both schedules
+    columns = ['Game ID', 'Date', 'Home', 'Away', 'Home Score', 'Away Score', 'Neutral']
+    df = pd.DataFrame(all_games, columns=columns).drop_duplicates(subset='Game ID')
+    df.to_csv(path, index=False)
+    print(f"\n{len(df)} game results have been saved to '{path}'")
+    return df
+
 def main():
     all_teams_data = []
     
@@ -80,6 +143,8 @@ def main():
     print(df.to_string(index=False))
     df.to_csv('sec_basketball_stats.csv', index=False)
     print("\nData has been saved to 'sec_basketball_stats.csv'")
+    
+    save_game_results()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
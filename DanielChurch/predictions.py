@@ -1,15 +1,38 @@
 import os
+import re
+import json
+import time
+import argparse
+import asyncio
 import openai
+import numpy as np
 import pandas as pd
 import random
-from typing import List, Tuple
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from battle_cache import BattleCache, DEFAULT_CACHE_PATH
+from battle_backends import BACKENDS, CompletionBackend, RateLimited, UsageCounter
+from bracket_state import BracketState, EMPTY
 
 # Load environment variables
 load_dotenv()
 
 # Configure OpenAI
 openai.api_key = os.getenv("OPENAI_API_KEY")
+MODEL = "gpt-4"
+
+# Bump whenever the battle prompt changes so cached verdicts from the old prompt are not reused
+PROMPT_VERSION = 1
+
+# Every pair of the 16 teams fits in one batched request
+BATCH_SIZE = 120
+# Completion tokens allowed per verdict in a batched answer
+BATCH_TOKENS_PER_PAIR = 20
+USAGE_LOG_PATH = "api_usage.jsonl"
+
+# Requests and tokens of the synchronous ask_battle calls, logged like a backend's usage
+SYNC_USAGE = UsageCounter()
 
 # SEC Mascots dictionary for easy lookup
 SEC_MASCOTS = {
@@ -22,9 +45,11 @@ SEC_MASCOTS = {
     "LSU": "Tigers",
     "Mississippi State": "Bulldogs",
     "Missouri": "Tigers",
+    "Oklahoma": "Sooners (Sooner Schooner Ponies)",
     "Ole Miss": "Rebels (Bear)",
     "South Carolina": "Gamecocks",
     "Tennessee": "Volunteers (Smokey the Hound)",
+    "Texas": "Longhorns (Bevo the Steer)",
     "Texas A&M": "Aggies (Rough Collie)",
     "Vanderbilt": "Commodores (Anchor)"
 }
@@ -37,10 +62,9 @@ def flip_coin(team1: str, team2: str) -> str:
     print(f"🎲 Tie breaker - Coin flip: {winner} wins!")
     return winner
 
-def get_battle_winner(team1: str, team2: str) -> str:
+def build_battle_messages(team1: str, team2: str) -> List[dict]:
     """
-    Use OpenAI API to determine which mascot would win in a fight.
-    If the response isn't clearly one of the two schools, use a coin flip.
+    Build the chat messages asking which mascot would win in a fight.
     """
     mascot1 = SEC_MASCOTS[team1]
     mascot2 = SEC_MASCOTS[team2]
@@ -49,67 +73,410 @@ def get_battle_winner(team1: str, team2: str) -> str:
     which would win in a fight? Consider the natural abilities, size, and strength of each mascot. 
     Respond with ONLY the name of the winner's school: {team1} or {team2}."""
 
+    return [
+        {"role": "system", "content": "You are a battle analysis expert determining the winner of mascot fights."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_battle_result(content: str, team1: str, team2: str) -> Optional[str]:
+    """
+    Turn a model response into the winning school, or None for a tie.
+    """
+    result = content.strip()
+    
+    # If the response isn't exactly one of the team names, it's considered a tie
+    if result not in [team1, team2]:
+        return None
+    
+    return result
+
+def ask_battle(team1: str, team2: str) -> Optional[str]:
+    """
+    Use OpenAI API to determine which mascot would win in a fight.
+    Returns None if the response isn't clearly one of the two schools.
+    """
     response = openai.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a battle analysis expert determining the winner of mascot fights."},
-            {"role": "user", "content": prompt}
-        ],
+        model=MODEL,
+        messages=build_battle_messages(team1, team2),
         max_tokens=50
     )
+    if response.usage is not None:
+        SYNC_USAGE.record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+    
+    return parse_battle_result(response.choices[0].message.content, team1, team2)
+
+async def complete_with_backoff(backend: CompletionBackend, messages: List[dict], max_tokens: int,
+                                label: str, max_retries: int = 5, base_delay: float = 1.0) -> str:
+    """
+    Send one request, backing off exponentially while the backend is rate limited.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await backend.complete(messages, MODEL, max_tokens)
+        except RateLimited as e:
+            if attempt == max_retries:
+                raise
+            delay = e.retry_after if e.retry_after is not None else base_delay * 2 ** attempt
+            print(f"⏳ Rate limited on {label}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def ask_battle_async(team1: str, team2: str, backend: CompletionBackend,
+                           semaphore: asyncio.Semaphore, max_retries: int = 5,
+                           base_delay: float = 1.0) -> Optional[str]:
+    """
+    Async version of ask_battle. Holds a semaphore slot while the request is
+    in flight and backs off exponentially when the backend is rate limited.
+    """
+    async with semaphore:
+        content = await complete_with_backoff(backend, build_battle_messages(team1, team2), 50,
+                                              f"{team1} vs {team2}", max_retries, base_delay)
+        return parse_battle_result(content, team1, team2)
+
+async def resolve_battles(pairs: List[Tuple[str, str]], backend: CompletionBackend,
+                          concurrency: int = 8, max_retries: int = 5) -> List[Optional[str]]:
+    """
+    Ask about all battles at once, with at most `concurrency` requests in flight.
+    Results come back in the same order as `pairs`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        ask_battle_async(team1, team2, backend, semaphore, max_retries)
+        for team1, team2 in pairs
+    ))
+
+def build_batch_messages(pairs: List[Tuple[str, str]]) -> List[dict]:
+    """
+    Build the chat messages asking for the winner of several mascot fights at
+    once, answered as one JSON object with a numbered verdict per matchup.
+    """
+    matchups = "\n".join(f"{i}. {team1} ({SEC_MASCOTS[team1]}) vs {team2} ({SEC_MASCOTS[team2]})"
+                          for i, (team1, team2) in enumerate(pairs, 1))
+    
+    prompt = f"""For each hypothetical battle below, decide which mascot would win in a fight.
+Consider the natural abilities, size, and strength of each mascot.
+
+{matchups}
+
+Respond with ONLY a JSON object of the form {{"verdicts": [{{"id": 1, "winner": "<school>"}}, ...]}},
+with one verdict per battle, where the winner is exactly one of the two schools named in that battle."""
+
+    return [
+        {"role": "system", "content": "You are a battle analysis expert determining the winner of mascot fights."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_batch_result(content: str, pairs: List[Tuple[str, str]]) -> List[Optional[str]]:
+    """
+    Turn a batched model response into the winning school of each pair, in
+    order. A pair whose verdict is missing, repeated or names neither of its
+    schools gets None, as does every pair when the response is not valid JSON.
+    """
+    results: List[Optional[str]] = [None] * len(pairs)
     
-    result = response.choices[0].message.content.strip()
+    # Tolerate prose or code fences around the JSON object
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    try:
+        verdicts = json.loads(match.group(0))["verdicts"] if match else []
+    except (ValueError, KeyError, TypeError):
+        return results
+    if not isinstance(verdicts, list):
+        return results
     
-    # If the response isn't exactly one of the team names, it's considered a tie
-    if result not in [team1, team2]:
+    seen = set()
+    for verdict in verdicts:
+        if not isinstance(verdict, dict) or not isinstance(verdict.get("id"), int):
+            continue
+        index = verdict["id"] - 1
+        if not 0 <= index < len(pairs):
+            continue
+        if index in seen:
+            # Conflicting answers for one battle are no answer at all
+            results[index] = None
+            continue
+        seen.add(index)
+        winner = verdict.get("winner")
+        if isinstance(winner, str) and winner.strip() in pairs[index]:
+            results[index] = winner.strip()
+    return results
+
+async def ask_battles_batched(pairs: List[Tuple[str, str]], backend: CompletionBackend,
+                              batch_size: int = BATCH_SIZE, concurrency: int = 8,
+                              max_retries: int = 5) -> List[Optional[str]]:
+    """
+    Ask about many battles with one structured request per `batch_size`
+    pairs. Results come back in the same order as `pairs`; None marks a pair
+    the model gave no valid verdict for.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def ask_chunk(chunk: List[Tuple[str, str]]) -> List[Optional[str]]:
+        async with semaphore:
+            content = await complete_with_backoff(
+                backend, build_batch_messages(chunk), BATCH_TOKENS_PER_PAIR * len(chunk) + 50,
+                f"a batch of {len(chunk)} battles", max_retries)
+            return parse_batch_result(content, chunk)
+    
+    chunks = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+    answers = await asyncio.gather(*(ask_chunk(chunk) for chunk in chunks))
+    return [result for chunk in answers for result in chunk]
+
+def format_usage(usage: Dict[str, int]) -> str:
+    """
+    Describe a backend's request and token counts.
+    """
+    total = usage["prompt_tokens"] + usage["completion_tokens"]
+    return (f"{usage['requests']} request(s), {usage['prompt_tokens']:,} prompt + "
+            f"{usage['completion_tokens']:,} completion = {total:,} tokens")
+
+def log_usage(backend: UsageCounter, command: str, batched: bool, path: str = USAGE_LOG_PATH):
+    """
+    Print the run's token usage and append it to the usage log, one JSON line per run.
+    """
+    print(f"\n📊 API usage: {format_usage(backend.usage)}")
+    record = {"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "command": command, "model": MODEL,
+              "prompt_version": PROMPT_VERSION, "batched": batched, **backend.usage}
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+def get_battle_winner(team1: str, team2: str, cache: Optional[BattleCache] = None,
+                      offline: bool = False) -> str:
+    """
+    Determine which mascot would win in a fight.
+    A cached verdict is used when available; otherwise OpenAI is asked and the
+    answer is stored in the cache. In offline mode no request is ever sent.
+    Ties and unknown matchups are settled with a coin flip.
+    """
+    if cache is not None and cache.samples(MODEL, PROMPT_VERSION, team1, team2):
+        result = cache.verdict(MODEL, PROMPT_VERSION, team1, team2)
+        if result is None:
+            print(f"⚔️ Cached battle is a tie between {team1} and {team2}!")
+            return flip_coin(team1, team2)
+        return result
+    
+    if offline:
+        print(f"📭 No cached battle between {team1} and {team2}!")
+        return flip_coin(team1, team2)
+    
+    result = ask_battle(team1, team2)
+    
+    if cache is not None:
+        cache.record(MODEL, PROMPT_VERSION, team1, team2, result)
+        cache.save()
+    
+    if result is None:
         print(f"⚔️ Battle resulted in a tie between {team1} and {team2}!")
         return flip_coin(team1, team2)
     
     return result
 
-def update_bracket(df: pd.DataFrame) -> pd.DataFrame:
+def precompute_battles(cache: BattleCache, samples: int = 1, teams: Optional[List[str]] = None):
+    """
+    Ask OpenAI about every pair of teams until each pair has the requested
+    number of samples. Progress is saved after every pair, so an interrupted
+    run picks up where it stopped.
+    """
+    teams = teams or sorted(SEC_MASCOTS)
+    pairs = list(combinations(teams, 2))
+    
+    print(f"Precomputing {len(pairs)} mascot battles ({samples} sample(s) each)")
+    print("=" * 50)
+    
+    for i, (team1, team2) in enumerate(pairs, 1):
+        needed = samples - cache.samples(MODEL, PROMPT_VERSION, team1, team2)
+        for _ in range(needed):
+            cache.record(MODEL, PROMPT_VERSION, team1, team2, ask_battle(team1, team2))
+        if needed > 0:
+            cache.save()
+        
+        win_rate = cache.win_rate(MODEL, PROMPT_VERSION, team1, team2)
+        print(f"[{i}/{len(pairs)}] {team1} vs {team2}: {team1} wins {win_rate:.0%}")
+
+async def precompute_battles_batched(cache: BattleCache, backend: CompletionBackend, samples: int = 1,
+                                     teams: Optional[List[str]] = None, batch_size: int = BATCH_SIZE,
+                                     concurrency: int = 8, max_attempts: int = 3):
+    """
+    Fill the cache for every pair of teams with batched requests: each pass
+    asks about every pair still short of samples, and pairs without a valid
+    verdict are asked again in the next pass, up to `max_attempts` passes
+    per sample. Progress is saved after every pass.
+    """
+    teams = teams or sorted(SEC_MASCOTS)
+    pairs = list(combinations(teams, 2))
+    
+    print(f"Precomputing {len(pairs)} mascot battles ({samples} sample(s) each, "
+          f"up to {batch_size} per request)")
+    print("=" * 50)
+    
+    for sample in range(1, samples + 1):
+        for attempt in range(max_attempts):
+            to_ask = [pair for pair in pairs if cache.samples(MODEL, PROMPT_VERSION, *pair) < sample]
+            if not to_ask:
+                break
+            results = await ask_battles_batched(to_ask, backend, batch_size, concurrency)
+            for pair, result in zip(to_ask, results):
+                if result is not None:
+                    cache.record(MODEL, PROMPT_VERSION, pair[0], pair[1], result)
+            cache.save()
+            malformed = sum(result is None for result in results)
+            print(f"Sample {sample}: {len(to_ask) - malformed}/{len(to_ask)} valid verdicts"
+                  + (f", {malformed} to ask again" if malformed and attempt + 1 < max_attempts else ""))
+    
+    missing = [pair for pair in pairs if cache.samples(MODEL, PROMPT_VERSION, *pair) < samples]
+    if missing:
+        print(f"⚠️ {len(missing)} pair(s) are still short of {samples} sample(s)")
+
+def battle_win_matrix(cache: BattleCache, teams: List[str]) -> np.ndarray:
+    """
+    Build a (teams x teams) matrix of cached win rates, where entry [i, j] is
+    the probability that teams[i] beats teams[j]. Unsampled pairs are 50/50.
+    """
+    matrix = np.full((len(teams), len(teams)), 0.5)
+    for i, j in combinations(range(len(teams)), 2):
+        win_rate = cache.win_rate(MODEL, PROMPT_VERSION, teams[i], teams[j])
+        if win_rate is not None:
+            matrix[i, j] = win_rate
+            matrix[j, i] = 1.0 - win_rate
+    return matrix
+
+def print_matchup(current_round: int, game: int, team1: str, team2: str):
+    """
+    Print a game's matchup.
+    """
+    print(f"\nRound {current_round}, Game {game}:")
+    print(f"{team1} ({SEC_MASCOTS[team1]}) vs {team2} ({SEC_MASCOTS[team2]})")
+
+def print_winner(winner: str):
+    """
+    Print a game's result.
+    """
+    print(f"Winner: {winner} ({SEC_MASCOTS[winner]})")
+    print("-" * 50)
+
+def advance_byes(state: BracketState, current_round: int):
+    """
+    Move teams without an opponent straight into the next round.
+    """
+    for game in state.round_games(current_round):
+        if state.winners[game] != EMPTY:
+            continue
+        team = state.bye_team(game)
+        if team != EMPTY:
+            print(f"\n🎟️ {state.teams[team]} advances with a bye (Round {current_round}, Game {state.games[game]})")
+            state.set_winner(game, team)
+
+def update_bracket(df: pd.DataFrame, cache: Optional[BattleCache] = None,
+                   offline: bool = False) -> pd.DataFrame:
     """
     Process each round of the tournament and update the bracket.
     """
-    max_round = df['Round'].max()
+    state = BracketState.from_frame(df)
     
-    for current_round in range(1, max_round + 1):
-        round_games = df[df['Round'] == current_round]
+    for current_round in np.unique(state.rounds):
+        advance_byes(state, current_round)
         
-        for _, game in round_games.iterrows():
-            # Skip if we've already processed this game
-            if pd.notna(game['Winner']):
-                continue
-                
-            # Skip if we don't have both teams yet
-            if pd.isna(game['Team1']) or pd.isna(game['Team2']):
-                continue
-                
-            # Print the matchup
-            print(f"\nRound {current_round}, Game {game['Game']}:")
-            print(f"{game['Team1']} ({SEC_MASCOTS[game['Team1']]}) vs {game['Team2']} ({SEC_MASCOTS[game['Team2']]})")
+        for game in state.ready_games(current_round):
+            team1, team2 = (state.teams[code] for code in state.slots[game])
+            print_matchup(current_round, state.games[game], team1, team2)
             
             # Get the winner
-            winner = get_battle_winner(game['Team1'], game['Team2'])
+            winner = get_battle_winner(team1, team2, cache, offline)
+            state.set_winner(game, state.teams.index(winner))
             
-            # Update the winner in the dataframe
-            df.loc[(df['Round'] == current_round) & (df['Game'] == game['Game']), 'Winner'] = winner
+            print_winner(winner)
             
-            # Update the next round's matchup
-            if current_round < max_round:
-                next_game = (game['Game'] - 1) // 2 + len(df[df['Round'] == 1]) + 1
-                next_position = 'Team1' if game['Game'] % 2 == 1 else 'Team2'
-                df.loc[(df['Game'] == next_game), next_position] = winner
+    return state.to_frame()
+
+async def update_bracket_async(df: pd.DataFrame, backend: CompletionBackend,
+                               cache: Optional[BattleCache] = None, offline: bool = False,
+                               concurrency: int = 8, max_retries: int = 5,
+                               batched: bool = False, batch_size: int = BATCH_SIZE) -> pd.DataFrame:
+    """
+    Process the tournament round by round, sending every uncached battle of a
+    round concurrently. Results are applied in game order, so the bracket and
+    the coin flips come out the same regardless of response timing.
+    
+    When batched, each round's battles go out together as structured requests
+    of up to `batch_size` pairs. Verdicts that are malformed are not cached
+    and their games are settled with a coin flip.
+    """
+    state = BracketState.from_frame(df)
+    
+    for current_round in np.unique(state.rounds):
+        advance_byes(state, current_round)
+        
+        games = state.ready_games(current_round)
+        pairs = [tuple(state.teams[code] for code in state.slots[game]) for game in games]
+        
+        # Only battles without a cached verdict need a request
+        to_ask = []
+        if not offline:
+            to_ask = [pair for pair in pairs
+                      if cache is None or not cache.samples(MODEL, PROMPT_VERSION, *pair)]
+        if batched:
+            results = await ask_battles_batched(to_ask, backend, batch_size, concurrency, max_retries)
+        else:
+            results = await resolve_battles(to_ask, backend, concurrency, max_retries)
+        answers = dict(zip(to_ask, results))
+        
+        if cache is not None and to_ask:
+            for pair, result in answers.items():
+                # A batched None is a malformed verdict, not a tie
+                if result is not None or not batched:
+                    cache.record(MODEL, PROMPT_VERSION, pair[0], pair[1], result)
+            cache.save()
+        
+        for game, pair in zip(games, pairs):
+            print_matchup(current_round, state.games[game], *pair)
             
-            # Print the final result
-            print(f"Winner: {winner} ({SEC_MASCOTS[winner]})")
-            print("-" * 50)
+            if pair in answers and answers[pair] is not None:
+                winner = answers[pair]
+            elif pair in answers and batched:
+                print(f"⚠️ No valid verdict for {pair[0]} vs {pair[1]}!")
+                winner = flip_coin(*pair)
+            elif pair in answers:
+                print(f"⚔️ Battle resulted in a tie between {pair[0]} and {pair[1]}!")
+                winner = flip_coin(*pair)
+            else:
+                winner = get_battle_winner(pair[0], pair[1], cache, offline=True)
+            state.set_winner(game, state.teams.index(winner))
             
-    return df
+            print_winner(winner)
+    
+    return state.to_frame()
 
-def run_tournament():
+def simulate_tournaments(df: pd.DataFrame, cache: BattleCache, replays: int = 10000,
+                         seed: int = 2025) -> pd.Series:
+    """
+    Replay the undecided part of the bracket many times from cached win rates,
+    without calling the API. Returns each team's share of championships.
+    """
+    state = BracketState.from_frame(df)
+    win_prob = battle_win_matrix(cache, state.teams)
+    winners = state.replay(win_prob, replays, np.random.default_rng(seed))
+    
+    counts = np.bincount(winners[:, -1], minlength=len(state.teams))
+    shares = pd.Series(counts / replays, index=state.teams)
+    return shares[shares > 0].sort_values(ascending=False)
+
+def run_simulation(cache: BattleCache, replays: int = 10000):
+    """
+    Estimate championship odds for the bracket CSV from cached battles.
+    """
+    df = pd.read_csv('2025_sec_tournament_bracket.csv')
+    
+    print(f"SEC Mascot Battle Tournament - {replays} offline replays")
+    print("=" * 50)
+    
+    for team, share in simulate_tournaments(df, cache, replays).items():
+        print(f"{team:<20} {share:.1%}")
+
+def run_tournament(cache: Optional[BattleCache] = None, offline: bool = False,
+                   backend: Optional[CompletionBackend] = None, concurrency: int = 8,
+                   batched: bool = False, batch_size: int = BATCH_SIZE):
     """
     Run the tournament using the bracket CSV file.
+    When a backend is given, each round's battles are resolved concurrently,
+    or in batched requests when `batched` is set.
     """
     # Read the bracket
     df = pd.read_csv('2025_sec_tournament_bracket.csv')
@@ -118,7 +485,11 @@ def run_tournament():
     print("=" * 50)
     
     # Update the bracket
-    df = update_bracket(df)
+    if backend is not None:
+        df = asyncio.run(update_bracket_async(df, backend, cache, offline, concurrency,
+                                              batched=batched, batch_size=batch_size))
+    else:
+        df = update_bracket(df, cache, offline)
     
     # Save the updated bracket
     df.to_csv('2025_sec_tournament_bracket.csv', index=False)
@@ -130,6 +501,45 @@ def run_tournament():
         print(f"{champion} ({SEC_MASCOTS[champion]})")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='SEC Mascot Battle Tournament')
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'precompute', 'simulate'],
+                        help='run the bracket (default), fill the battle cache for every pair of teams, '
+                             'or replay the bracket offline from cached win rates')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Path to the battle cache file')
+    parser.add_argument('--no-cache', action='store_true', help='Ask OpenAI for every game, ignoring the cache')
+    parser.add_argument('--offline', action='store_true', help='Only use cached verdicts, never call OpenAI')
+    parser.add_argument('--samples', type=int, default=1, help='Samples per pair when precomputing')
+    parser.add_argument('--replays', type=int, default=10000, help='Bracket replays when simulating')
+    parser.add_argument('--concurrent', action='store_true',
+                        help="Send each round's battles at the same time")
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum requests in flight with --concurrent')
+    parser.add_argument('--backend', default='openai', choices=sorted(BACKENDS),
+                        help="Completion backend for --concurrent and --batched ('fake' answers locally)")
+    parser.add_argument('--batched', action='store_true',
+                        help='Ask about many battles in one structured request per round (or per batch '
+                             'when precomputing)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='Most battles per batched request (default: all 120 pairs)')
+    args = parser.parse_args()
+    
     # Set random seed for reproducibility of coin flips
     random.seed(2025)
-    run_tournament()
\ No newline at end of file
+    cache = None if args.no_cache else BattleCache(args.cache)
+    
+    backend = BACKENDS[args.backend]() if args.concurrent or args.batched else None
+    
+    if args.command == 'precompute' and args.batched:
+        asyncio.run(precompute_battles_batched(cache or BattleCache(args.cache), backend, args.samples,
+                                               batch_size=args.batch_size, concurrency=args.concurrency))
+    elif args.command == 'precompute':
+        precompute_battles(cache or BattleCache(args.cache), samples=args.samples)
+    elif args.command == 'simulate':
+        run_simulation(cache or BattleCache(args.cache), replays=args.replays)
+    else:
+        run_tournament(cache, offline=args.offline, backend=backend, concurrency=args.concurrency,
+                       batched=args.batched, batch_size=args.batch_size)
+    
+    # Runs without a backend ask through the synchronous client
+    counter = backend if backend is not None else SYNC_USAGE
+    if counter.usage["requests"]:
+        log_usage(counter, args.command, args.batched)
\ No newline at end of file
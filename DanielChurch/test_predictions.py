@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Test script for the SEC Mascot Battle Tournament.
+
+Exercises batched battle requests against the local FakeBackend, so no
+request is ever sent to OpenAI.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import tempfile
+import contextlib
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from battle_backends import FakeBackend, RateLimited
+from battle_cache import BattleCache
+from bracket_state import BracketState, EMPTY, link_rounds
+import predictions
+from predictions import (MODEL, PROMPT_VERSION, parse_batch_result, ask_battles_batched, resolve_battles,
+                         precompute_battles_batched, update_bracket_async, log_usage, complete_with_backoff,
+                         build_battle_messages, precompute_battles)
+
+TEAMS = ["Auburn", "Florida", "Georgia", "LSU", "Tennessee", "Texas"]
+
+
+class TrackingBackend(FakeBackend):
+    """
+    Fake backend whose latency varies by prompt, so answers finish out of
+    order, and which records the most requests it ever had in flight.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+        self.finished = []
+
+    async def complete(self, messages, model, max_tokens):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.002 * (len(messages[-1]["content"]) % 7))
+            answer = await super().complete(messages, model, max_tokens)
+            self.finished.append(messages[-1]["content"])
+            return answer
+        finally:
+            self.in_flight -= 1
+
+
+@contextlib.contextmanager
+def patched(module, **values):
+    """
+    Replace module attributes for the duration of a with block.
+    """
+    saved = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def undecided_bracket() -> pd.DataFrame:
+    """
+    A four-team bracket with nothing played yet.
+    """
+    return pd.DataFrame({
+        'Round': [1, 1, 2],
+        'Game': [1, 2, 3],
+        'Team1': ["Auburn", "Texas", None],
+        'Team2': ["LSU", "Georgia", None],
+        'Winner': [None, None, None],
+    })
+
+
+def test_bracket_linking() -> bool:
+    """
+    Test that next-game links follow the bracket numbering for full and partial fields.
+    """
+    print("\nTesting bracket links...")
+    next_game, next_slot = link_rounds(np.array([1, 1, 1, 1, 2, 2, 3]))
+    if next_game.tolist() != [4, 4, 5, 5, 6, 6, EMPTY] or next_slot.tolist() != [0, 1, 0, 1, 0, 1, 0]:
+        return False
+
+    # The 14-team bracket: game 7 meets game 8's winner, and game 13's winner takes a bye in the final
+    df = pd.read_csv('2025_sec_tournament_bracket.csv')
+    state = BracketState.from_frame(df)
+    print(f"Next games: {state.next_game.tolist()}")
+    if state.next_game.tolist() != [7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, EMPTY]:
+        return False
+    if state.bye_team(13) != EMPTY:
+        return False
+    # Loading the committed bracket changes nothing
+    return state.to_frame().fillna("").compare(df.fillna("")).empty
+
+
+def test_relink_clears_stale_slots() -> bool:
+    """
+    Test that loading a bracket rebuilds fed slots, drops results between the wrong teams
+    and clears teams that already entered the bracket.
+    """
+    print("\nTesting bracket relinking...")
+    df = pd.read_csv('2025_sec_tournament_bracket.csv')
+    df.loc[df['Game'] == 12, 'Team2'] = "Tennessee"
+    df.loc[df['Game'] == 14, 'Team2'] = "Auburn"
+    state = BracketState.from_frame(df).to_frame().set_index('Game')
+
+    if (state.loc[12, 'Team1'], state.loc[12, 'Team2']) != ("LSU", "Missouri") or pd.notna(state.loc[12, 'Winner']):
+        return False
+    # Game 13 waits on the dropped result, and Auburn cannot come back for the final
+    return pd.isna(state.loc[13, 'Team2']) and pd.isna(state.loc[14, 'Team2'])
+
+
+def test_replay_open_slots() -> bool:
+    """
+    Test that replays pass byes through and raise on a game nothing can fill.
+    """
+    print("\nTesting offline replays...")
+    state = BracketState.from_frame(pd.read_csv('2025_sec_tournament_bracket.csv'))
+    win_prob = np.full((len(state.teams), len(state.teams)), 0.5)
+    winners = state.replay(win_prob, 1000, np.random.default_rng(0))
+    finalists = {state.teams[code] for code in np.unique(winners[:, -1])}
+    print(f"Champions seen: {sorted(finalists)}")
+    if finalists != {"Alabama", "LSU", "Texas A&M"}:
+        return False
+
+    df = undecided_bracket()
+    df.loc[1, ['Team1', 'Team2']] = None
+    state = BracketState.from_frame(df)
+    try:
+        state.replay(np.full((len(state.teams), len(state.teams)), 0.5), 10, np.random.default_rng(0))
+    except ValueError as e:
+        print(f"Rejected: {e}")
+        return True
+    return False
+
+
+def test_backoff_when_rate_limited() -> bool:
+    """
+    Test that rate-limited requests are retried, waiting as long as the backend asks
+    or backing off exponentially when it does not say.
+    """
+    print("\nTesting rate-limit backoff...")
+    pairs = list(combinations(TEAMS, 2))
+
+    # Every third request is refused with a zero wait; a one-second backoff would show in the timing
+    backend = FakeBackend(rate_limit_every=3)
+    start = time.perf_counter()
+    results = asyncio.run(resolve_battles(pairs, backend))
+    elapsed = time.perf_counter() - start
+    print(f"{backend.requests} requests for {len(pairs)} battles in {elapsed:.2f}s")
+    if results != [FakeBackend._hash_choice(*pair) for pair in pairs] or elapsed > 0.5:
+        return False
+    if backend.usage["requests"] != len(pairs) or backend.requests != 22:
+        return False
+
+    messages = build_battle_messages("Auburn", "LSU")
+    backend = FakeBackend(rate_limit_every=2, retry_after=0.05)
+    start = time.perf_counter()
+    asyncio.run(complete_with_backoff(backend, messages, 50, "test", base_delay=5.0))
+    asyncio.run(complete_with_backoff(backend, messages, 50, "test", base_delay=5.0))
+    if not 0.05 <= time.perf_counter() - start < 1.0:
+        return False
+
+    # Without a requested wait: 0.01 + 0.02 seconds, then the last refusal is raised
+    backend = FakeBackend(rate_limit_every=1, retry_after=None)
+    start = time.perf_counter()
+    try:
+        asyncio.run(complete_with_backoff(backend, messages, 50, "test", max_retries=2, base_delay=0.01))
+        return False
+    except RateLimited:
+        pass
+    return backend.requests == 3 and time.perf_counter() - start >= 0.03
+
+
+def test_concurrent_order_and_limit() -> bool:
+    """
+    Test that concurrent battles come back in input order and respect the concurrency limit.
+    """
+    print("\nTesting concurrent battles...")
+    pairs = list(combinations(TEAMS, 2))
+    backend = TrackingBackend()
+    results = asyncio.run(resolve_battles(pairs, backend, concurrency=3))
+    in_order = [build_battle_messages(*pair)[-1]["content"] for pair in pairs]
+    print(f"Peak requests in flight: {backend.peak}")
+    if backend.finished == in_order:
+        # The latencies did not reorder anything, so the test shows nothing
+        return False
+    return results == [FakeBackend._hash_choice(*pair) for pair in pairs] and backend.peak == 3
+
+
+def test_precompute_cache_keying() -> bool:
+    """
+    Test that a precompute rerun asks nothing and a prompt version bump asks everything again.
+    """
+    print("\nTesting the battle cache...")
+    pairs = list(combinations(TEAMS, 2))
+    asked = []
+
+    def ask_battle(team1: str, team2: str) -> str:
+        asked.append((team1, team2))
+        return FakeBackend._hash_choice(team1, team2)
+
+    with tempfile.TemporaryDirectory() as folder, patched(predictions, ask_battle=ask_battle):
+        path = os.path.join(folder, "cache.json")
+        precompute_battles(BattleCache(path), samples=2, teams=TEAMS)
+        if len(asked) != 2 * len(pairs):
+            return False
+
+        # A rerun from the saved file is free
+        precompute_battles(BattleCache(path), samples=2, teams=TEAMS)
+        if len(asked) != 2 * len(pairs):
+            return False
+
+        # Verdicts from the old prompt are kept but not reused
+        with patched(predictions, PROMPT_VERSION=PROMPT_VERSION + 1):
+            precompute_battles(BattleCache(path), samples=1, teams=TEAMS)
+        cache = BattleCache(path)
+        print(f"Requests: {len(asked)}; cache entries: {len(cache.entries)}")
+        if len(asked) != 3 * len(pairs) or len(cache.entries) != 2 * len(pairs):
+            return False
+        return all(cache.samples(MODEL, PROMPT_VERSION, *pair) == 2
+                   and cache.samples(MODEL, PROMPT_VERSION + 1, *pair) == 1 for pair in pairs)
+
+
+def test_parse_batch_result() -> bool:
+    """
+    Test that only well-formed verdicts naming one of their two schools are accepted.
+    """
+    print("\nTesting batched verdict parsing...")
+    pairs = [("Auburn", "LSU"), ("Texas", "Georgia")]
+
+    def verdicts(*items) -> str:
+        return json.dumps({"verdicts": [{"id": i, "winner": winner} for i, winner in items]})
+
+    cases = [
+        ("No JSON at all", "Auburn, obviously.", [None, None]),
+        ("Invalid JSON", '{"verdicts": [}', [None, None]),
+        ("Verdicts not a list", '{"verdicts": {"1": "Auburn"}}', [None, None]),
+        ("Code fence around JSON", "```json\n" + verdicts((1, "Auburn"), (2, "Georgia")) + "\n```",
+         ["Auburn", "Georgia"]),
+        ("Duplicate id", verdicts((1, "Auburn"), (1, "LSU"), (2, "Texas")), [None, "Texas"]),
+        ("Out-of-range ids", verdicts((0, "Auburn"), (3, "Texas"), (2, "Texas")), [None, "Texas"]),
+        ("Wrong school", verdicts((1, "Alabama"), (2, " Georgia ")), [None, "Georgia"]),
+        ("String id", '{"verdicts": [{"id": "1", "winner": "Auburn"}]}', [None, None]),
+    ]
+
+    passed = True
+    for name, content, expected in cases:
+        result = parse_batch_result(content, pairs)
+        print(f"{name}: {result}")
+        passed = passed and result == expected
+    return passed
+
+
+def test_precompute_reasks_malformed() -> bool:
+    """
+    Test that precompute asks again about pairs without a valid verdict and never records them as ties.
+    """
+    print("\nTesting batched precompute...")
+    pairs = list(combinations(TEAMS, 2))
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Every third verdict in a request is spoiled: 15 pairs in batches of 5 leave 3, then 1, then none
+        cache = BattleCache(os.path.join(folder, "cache.json"))
+        backend = FakeBackend(malformed_every=3)
+        asyncio.run(precompute_battles_batched(cache, backend, samples=1, teams=TEAMS, batch_size=5))
+        if backend.usage["requests"] != 3 + 1 + 1:
+            return False
+        for team1, team2 in pairs:
+            entry = cache.get(MODEL, PROMPT_VERSION, team1, team2)
+            if entry is None or entry["samples"] != 1 or entry["ties"] != 0:
+                return False
+            if cache.verdict(MODEL, PROMPT_VERSION, team1, team2) != FakeBackend._hash_choice(team1, team2):
+                return False
+
+        # Progress was saved; out of attempts, a pair is left short rather than guessed
+        reloaded = BattleCache(os.path.join(folder, "cache.json"))
+        short = BattleCache(os.path.join(folder, "short.json"))
+        asyncio.run(precompute_battles_batched(short, FakeBackend(malformed_every=3), samples=1, teams=TEAMS,
+                                               batch_size=5, max_attempts=2))
+        missing = [pair for pair in pairs if not short.samples(MODEL, PROMPT_VERSION, *pair)]
+        print(f"Pairs still missing after two passes: {missing}")
+        return len(reloaded.entries) == len(pairs) and len(missing) == 1
+
+
+def test_batched_coin_flip_fallback() -> bool:
+    """
+    Test that games without a valid batched verdict are settled by a coin flip and not cached.
+    """
+    print("\nTesting batched coin-flip fallback...")
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache = BattleCache(os.path.join(folder, "cache.json"))
+        backend = FakeBackend(malformed_every=1)
+        random.seed(2025)
+        df = asyncio.run(update_bracket_async(undecided_bracket(), backend, cache, batched=True))
+
+        # One request per round, every game still decided, nothing cached
+        if backend.usage["requests"] != 2 or cache.entries:
+            return False
+        if df['Winner'].isna().any():
+            return False
+        for _, row in df.iterrows():
+            if row['Winner'] not in (row['Team1'], row['Team2']):
+                return False
+
+        # With valid verdicts, the same bracket follows the backend and caches every battle
+        backend = FakeBackend()
+        df = asyncio.run(update_bracket_async(undecided_bracket(), backend, cache, batched=True))
+        first = FakeBackend._hash_choice("Auburn", "LSU")
+        return df['Winner'].iloc[0] == first and len(cache.entries) == 3
+
+
+def test_usage_counts_and_log() -> bool:
+    """
+    Test request and token counts for batched and single requests, and the usage log.
+    """
+    print("\nTesting usage accounting...")
+    pairs = list(combinations(TEAMS, 2))
+
+    single, batched = FakeBackend(), FakeBackend()
+    asyncio.run(resolve_battles(pairs, single))
+    asyncio.run(ask_battles_batched(pairs, batched, batch_size=4))
+    print(f"Single requests: {single.usage}")
+    print(f"Batched requests: {batched.usage}")
+    if single.usage["requests"] != len(pairs) or batched.usage["requests"] != 4:
+        return False
+    if batched.usage["prompt_tokens"] >= single.usage["prompt_tokens"]:
+        return False
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "usage.jsonl")
+        log_usage(single, "run", False, path)
+        log_usage(batched, "precompute", True, path)
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+    if [record["batched"] for record in records] != [False, True]:
+        return False
+    return all(record[key] == backend.usage[key] and record["model"] == MODEL
+               for record, backend in zip(records, (single, batched)) for key in backend.usage)
+
+
+def main():
+    """Run all tests."""
+    print("SEC Mascot Battle Test Suite")
+    print("============================")
+
+    tests = [
+        test_bracket_linking,
+        test_relink_clears_stale_slots,
+        test_replay_open_slots,
+        test_backoff_when_rate_limited,
+        test_concurrent_order_and_limit,
+        test_precompute_cache_keying,
+        test_parse_batch_result,
+        test_precompute_reasks_malformed,
+        test_batched_coin_flip_fallback,
+        test_usage_counts_and_log,
+    ]
+
+    results = []
+    for test in tests:
+        results.append(test())
+
+    print("\nTest Results Summary:")
+    print("====================")
+    for i, (test, result) in enumerate(zip(tests, results), 1):
+        print(f"{i}. {test.__name__}: {'PASS' if result else 'FAIL'}")
+
+    overall = all(results)
+    print(f"\nOverall Test Result: {'PASS' if overall else 'FAIL'}")
+
+    return overall
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
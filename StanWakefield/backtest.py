@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Backtesting for the SEC Tournament Predictor.
+
+Replays past tournaments and scores how well each model configuration
+predicted them. A configuration is a set of composite weights, a rating
+range and an Elo scale, and optionally a win model; for every season it
+turns the pre-tournament stats into ratings and a win-probability matrix,
+and the exact advancement
+probabilities (tournament_engine.advancement_probabilities) are compared
+with what actually happened, so no simulation is needed and hundreds of
+configurations over dozens of seasons take seconds.
+
+Predictions are scored at three levels:
+
+- game: each game actually played, with the win probability of its actual
+  pairing (known only once both teams got there);
+- round: each team's pre-tournament probability of winning a game in each
+  round it could reach;
+- champion: the pre-tournament title odds of every entrant.
+
+Each level reports log loss, Brier score (for the champion level, summed
+over teams, per season) and a calibration table of predicted against
+observed frequencies.
+
+Manifest format (paths relative to the manifest, as in batch_predict.py):
+
+    {
+      "seasons": [
+        {"name": "2023-24", "season": "data/2023-24.season", "bracket": "archive/2024/bracket.json",
+         "results": "archive/2024/regular_season.csv", "winners": ["Texas", "Vanderbilt", ...]},
+        ...
+      ],
+      "configurations": [
+        {"name": "default"},
+        {"name": "shooting", "weights": {"field_goal_pct": 150, "three_pt_pct": 80}, "scale": 300},
+        {"name": "fitted + battles", "win_model": ["fitted:3", "battles:1"], "blend_space": "logit",
+         "battle_cache": "mascot_battle_cache.json"}
+      ]
+    }
+
+"winners" lists the actual winner of every bracket game in playing order.
+A configuration's weights default to the predictor's COMPOSITE_WEIGHTS,
+given as a list in stat order or a dict of stat -> weight (others 0).
+"win_model" takes the names of --win-model (elo, stat-logistic, fitted,
+battles, with optional :weight to blend) and is built by
+win_models.build_win_model: elo uses the configuration's ratings and scale,
+stat-logistic its weights, fitted a Bradley-Terry fit on the season's
+"results" (regular-season games, which must not include the tournament)
+and battles the configuration's "battle_cache", reading the verdicts of
+"battle_model" and "battle_prompt_version" (by default the current ones).
+"""
+
+import os
+import time
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+from sec_tournament_predictor import SEC_TEAMS, SEC_BRACKET, COMPOSITE_WEIGHTS
+from stats_table import STAT_FIELDS
+from batch_predict import load_manifest, season_stats
+from win_models import (BradleyTerryModel, build_win_model, parse_win_model_specs,
+                        BATTLE_MODEL, BATTLE_PROMPT_VERSION)
+from rating_uncertainty import normalize_ratings, RATING_FLOOR, RATING_CEILING
+from tournament_engine import Bracket, NOT_FED, win_probability_matrix, advancement_probabilities, round_probabilities
+
+LEVELS = ["game", "round", "champion"]
+CALIBRATION_BINS = 10
+# Probabilities are clipped this far from 0 and 1 before taking logs
+EPSILON = 1e-12
+
+
+def configuration_weights(configuration):
+    """Return a configuration's composite weights as an array in STAT_FIELDS order."""
+    weights = configuration.get("weights")
+    if weights is None:
+        return COMPOSITE_WEIGHTS
+    if isinstance(weights, dict):
+        unknown = set(weights) - set(STAT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown stats in weights: {', '.join(sorted(unknown))}")
+        return np.array([weights.get(field, 0.0) for field in STAT_FIELDS])
+    return np.asarray(weights, dtype=float)
+
+
+def actual_outcomes(bracket, winners):
+    """
+    Check a season's winners against its bracket and return (sides, winner
+    indexes): the two teams that actually met in each game and who won.
+    """
+    if len(winners) != bracket.n_games:
+        raise ValueError(f"Expected {bracket.n_games} winners, got {len(winners)}")
+    won = np.array([bracket.team_index[team] for team in winners])
+    sides = np.where(bracket.side_team != NOT_FED, bracket.side_team, won[np.maximum(bracket.side_game, 0)])
+    for g in range(bracket.n_games):
+        if won[g] not in sides[g]:
+            raise ValueError(f"{winners[g]} did not play in game {g}")
+    return sides, won
+
+
+class BacktestSeason:
+    """A past tournament: its bracket, pre-tournament stats and actual results."""
+
+    def __init__(self, name, bracket, stats, winners, results=None):
+        self.name = name
+        self.bracket = bracket
+        # Teams or stats the season lacks get its averages, as the predictor's loaders do
+        self.table = stats.reindex(bracket.teams).filled_with_means()
+        self.stats = self.table.values
+        # Pre-tournament game results for the fitted win model, fitted once on first use
+        self.results = results
+        self._fitted = None
+        self.sides, self.won = actual_outcomes(bracket, winners)
+        self.entrants = np.array([bracket.team_index[team] for team in bracket.entrants()])
+        # Which (round, team) cells happened: the team won a game in that round
+        self.round_won = np.zeros((len(bracket.round_names), bracket.n_teams), dtype=bool)
+        self.round_won[bracket.game_round, self.won] = True
+        # A team can only win in rounds from the one it enters onwards
+        first_round = np.full(bracket.n_teams, len(bracket.round_names))
+        games, sides = np.nonzero(bracket.side_team != NOT_FED)
+        np.minimum.at(first_round, bracket.side_team[games, sides], bracket.game_round[games])
+        self.round_mask = np.arange(len(bracket.round_names))[:, None] >= first_round[None, :]
+
+    def fitted_model(self):
+        """The Bradley-Terry model fitted on this season's results, or None without results."""
+        if self._fitted is None and self.results is not None:
+            self._fitted = BradleyTerryModel(self.results)
+        return self._fitted
+
+    def matrix(self, configuration):
+        """The configuration's win-probability matrix for this season's teams."""
+        weights = configuration_weights(configuration)
+        low, high = configuration.get("rating_range", (RATING_FLOOR, RATING_CEILING))
+        ratings = normalize_ratings(1500.0 + self.stats @ weights, low, high)
+        scale = configuration.get("scale", 400.0)
+        if "win_model" not in configuration:
+            return win_probability_matrix(ratings, scale)
+
+        names, model_weights = parse_win_model_specs(configuration["win_model"])
+        if "fitted" in names and self.results is None:
+            raise ValueError(f"Season {self.name} has no results for the fitted win model")
+        model = build_win_model(names, model_weights, configuration.get("blend_space", "probability"),
+                                ratings=dict(zip(self.bracket.teams, ratings)), stats=self.table,
+                                stat_weights=weights, results=self.fitted_model(),
+                                battle_cache=configuration.get("battle_cache"), scale=scale,
+                                battle_model=configuration.get("battle_model", BATTLE_MODEL),
+                                battle_prompt_version=configuration.get("battle_prompt_version",
+                                                                        BATTLE_PROMPT_VERSION))
+        return model.probability_matrix(self.bracket.teams)
+
+    def predictions(self, configuration):
+        """Return {level: (probabilities, outcomes)} for one configuration."""
+        matrix = self.matrix(configuration)
+        dist = advancement_probabilities(self.bracket, matrix)
+        rounds = round_probabilities(self.bracket, dist)
+
+        a, b = self.sides[:, 0], self.sides[:, 1]
+        champion = self.won[self.bracket.final]
+        return {
+            "game": (matrix[a, b], self.won == a),
+            "round": (rounds[self.round_mask], self.round_won[self.round_mask]),
+            "champion": (dist[self.bracket.final, self.entrants], self.entrants == champion),
+        }
+
+
+def load_seasons(manifest_seasons):
+    """Load every manifest season that lists its winners."""
+    seasons = []
+    for season in manifest_seasons:
+        if "winners" not in season:
+            print(f"Skipping {season['name']}: no winners listed")
+            continue
+        bracket = Bracket.load(season["bracket"], SEC_TEAMS) if "bracket" in season else SEC_BRACKET
+        seasons.append(BacktestSeason(season["name"], bracket, season_stats(season), season["winners"],
+                                      season.get("results")))
+    return seasons
+
+
+def scores(probabilities, outcomes):
+    """Mean log loss and Brier score of binary predictions."""
+    p = np.clip(probabilities, EPSILON, 1 - EPSILON)
+    y = outcomes.astype(float)
+    return -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)), np.mean((p - y) ** 2)
+
+
+def calibration_table(probabilities, outcomes, bins=CALIBRATION_BINS):
+    """Predicted against observed frequency in equal-width probability bins (empty bins are left out)."""
+    which = np.minimum((probabilities * bins).astype(int), bins - 1)
+    count = np.bincount(which, minlength=bins)
+    predicted = np.bincount(which, weights=probabilities, minlength=bins)
+    observed = np.bincount(which, weights=outcomes.astype(float), minlength=bins)
+    used = count > 0
+    return pd.DataFrame({
+        "bin_low": np.arange(bins)[used] / bins,
+        "bin_high": (np.arange(bins)[used] + 1) / bins,
+        "count": count[used],
+        "mean_predicted": predicted[used] / count[used],
+        "observed": observed[used] / count[used],
+    })
+
+
+def evaluate(seasons, configuration):
+    """Score one configuration on every season; returns (summary rows, calibration table)."""
+    pooled = {level: ([], []) for level in LEVELS}
+    champion_log_loss, champion_brier = [], []
+    for season in seasons:
+        for level, (p, y) in season.predictions(configuration).items():
+            pooled[level][0].append(p)
+            pooled[level][1].append(y)
+        p, y = pooled["champion"][0][-1], pooled["champion"][1][-1]
+        champion_log_loss.append(-np.log(max(p[y].sum(), EPSILON)))
+        champion_brier.append(np.sum((p - y) ** 2))
+
+    rows, tables = [], []
+    for level in LEVELS:
+        p, y = np.concatenate(pooled[level][0]), np.concatenate(pooled[level][1])
+        if level == "game":
+            # Score games from the favourite's side so the curve runs from 0.5 to 1
+            flip = p < 0.5
+            p, y = np.where(flip, 1 - p, p), np.where(flip, ~y, y)
+        if level == "champion":
+            log_loss, brier = np.mean(champion_log_loss), np.mean(champion_brier)
+        else:
+            log_loss, brier = scores(p, y)
+        rows.append({"configuration": configuration["name"], "level": level, "predictions": len(p),
+                     "log_loss": log_loss, "brier": brier})
+        table = calibration_table(p, y)
+        table.insert(0, "level", level)
+        table.insert(0, "configuration", configuration["name"])
+        tables.append(table)
+    return rows, pd.concat(tables, ignore_index=True)
+
+
+def run_backtest(seasons, configurations):
+    """Score every configuration on every season; returns (summary, calibration) DataFrames."""
+    rows, tables = [], []
+    for configuration in configurations:
+        summary, calibration = evaluate(seasons, configuration)
+        rows += summary
+        tables.append(calibration)
+    return pd.DataFrame(rows), pd.concat(tables, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest SEC Tournament predictions on past tournaments")
+    parser.add_argument("manifest", help="JSON manifest of past seasons and configurations")
+    parser.add_argument("--scale", type=float, nargs="+", default=None,
+                        help="Try every configuration with each of these Elo scales")
+    parser.add_argument("--output", default="backtest_summary.csv", help="Scores of every configuration")
+    parser.add_argument("--calibration", default="backtest_calibration.csv", help="Calibration tables")
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        configurations = json.load(f).get("configurations") or [{"name": "default"}]
+    # Battle caches are relative to the manifest, like its season paths
+    base = os.path.dirname(os.path.abspath(args.manifest))
+    configurations = [dict(configuration, battle_cache=os.path.join(base, configuration["battle_cache"]))
+                      if "battle_cache" in configuration else configuration for configuration in configurations]
+    if args.scale:
+        configurations = [dict(configuration, name=f"{configuration['name']} scale={scale:g}", scale=scale)
+                          for configuration in configurations for scale in args.scale]
+    seasons = load_seasons(load_manifest(args.manifest))
+    if not seasons:
+        print("No seasons with results to backtest.")
+        return
+
+    start = time.time()
+    summary, calibration = run_backtest(seasons, configurations)
+    elapsed = time.time() - start
+    summary.to_csv(args.output, index=False)
+    calibration.to_csv(args.calibration, index=False)
+
+    table = summary.pivot(index="configuration", columns="level", values="log_loss")[LEVELS]
+    print(f"\nLog loss over {len(seasons)} seasons (lower is better):")
+    print(table.sort_values("game").round(4).to_string())
+    print(f"\nScored {len(configurations)} configurations in {elapsed:.2f}s; "
+          f"results written to {args.output} and {args.calibration}")
+
+
+if __name__ == "__main__":
+    main()
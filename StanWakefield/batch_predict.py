@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Batch predictions for many seasons in one run.
+
+Reads a JSON manifest of seasons and predicts each one in a shared pool of
+worker processes. Each worker starts its OCR engine once and reuses it for
+every season it is given, and OCR text is cached on disk by image content,
+so screenshots shared between archive folders or re-runs are read once.
+All seasons are written to a single long-format table with one row per
+season, team and round.
+
+Manifest format:
+
+    {
+      "seasons": [
+        {"name": "2024-25", "stats": "archive/2025/stats", "iterations": 10000},
+        {"name": "2023-24", "data": "archive/2024/stats.json", "bracket": "archive/2024/bracket.json"},
+        {"name": "2022-23", "season": "data/2022-23.season"},
+        {"name": "2024-25 results", "results": "sec_game_results.csv"},
+        {"name": "fallback", "fallback": true}
+      ]
+    }
+
+"season" is a season file (see season_data.py) and "data" a JSON file of
+{team: {stat: value}}. "bracket" is a bracket spec as read by
+tournament_engine.Bracket.load; it defaults to the current SEC bracket. Relative paths are resolved against the manifest's folder.
+"""
+
+import os
+import io
+import json
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sec_tournament_predictor import (SECTournamentPredictor, SEC_TEAMS, SEC_BRACKET, ITERATIONS,
+                                     MIN_STATS_PER_TEAM, fallback_stats)
+from ocr_engine import get_ocr_engine, CachedOCREngine, OCR_ENGINES
+from stats_table import StatsTable
+from win_models import EloModel
+from tournament_engine import (Bracket, advancement_probabilities,
+                               round_probabilities, simulate_bracket, simulated_round_probabilities)
+
+DEFAULT_OCR_CACHE = ".ocr_cache"
+RESULT_COLUMNS = ["season", "team", "rating", "round_index", "round", "exact", "simulated", "iterations"]
+
+# One OCR engine per worker process, created by _init_worker
+_ocr_engine = None
+
+
+def load_manifest(path):
+    """Load a manifest and resolve its paths against the manifest's folder."""
+    with open(path) as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    seasons = []
+    for i, season in enumerate(manifest["seasons"]):
+        season = dict(season)
+        season.setdefault("name", f"season-{i}")
+        if not any(key in season for key in ("stats", "season", "data", "results", "fallback")):
+            raise ValueError(f"Season '{season['name']}' needs one of stats, season, data, results or fallback")
+        for key in ("stats", "season", "data", "results", "bracket"):
+            if key in season:
+                season[key] = os.path.join(base, season[key])
+        seasons.append(season)
+    return seasons
+
+
+def _init_worker(ocr_engine_name, ocr_cache):
+    global _ocr_engine
+    engine = get_ocr_engine(ocr_engine_name)
+    _ocr_engine = CachedOCREngine(engine, ocr_cache) if ocr_cache else engine
+
+
+def season_stats(season, ocr_engine=None):
+    """
+    Return the stats of one manifest season (a stats folder, season file, data
+    file or fallback). Gaps are filled from the season's own averages, never
+    from the current fallback data; a season whose stats cannot be read raises
+    ValueError.
+    """
+    predictor = SECTournamentPredictor(stats_folder=season.get("stats", "stats"), ocr_engine=ocr_engine)
+    if "season" in season:
+        predictor.load_season(season["season"])
+        return predictor.stats
+    if season.get("fallback", False):
+        stats = fallback_stats()
+        if stats is None:
+            raise ValueError("Fallback data not available")
+        return stats
+
+    if "data" in season:
+        with open(season["data"]) as f:
+            stats = StatsTable.from_dict(json.load(f), SEC_TEAMS)
+    else:
+        stats = predictor.read_stat_images()
+        if stats.count() < len(SEC_TEAMS) * MIN_STATS_PER_TEAM:
+            raise ValueError(f"Only {stats.count()} stats read from '{season['stats']}'")
+    # Fill gaps from this season's averages rather than the current fallback data
+    return stats.filled_with_means()
+
+
+def season_ratings(season, ocr_engine=None):
+    """Return the predictor's Elo ratings for one manifest season."""
+    predictor = SECTournamentPredictor(ocr_engine=ocr_engine)
+    if "results" in season:
+        return predictor.fit_ratings_from_results(season["results"])
+    predictor.stats = season_stats(season, ocr_engine)
+    predictor.initialize_elo_ratings()
+    return predictor.elo_ratings
+
+
+def predict_season(season, iterations=ITERATIONS, seed=None, verbose=False):
+    """Predict one season and return its rows of the results table as columns."""
+    output = None if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        ratings = season_ratings(season, _ocr_engine)
+
+    bracket = Bracket.load(season["bracket"], SEC_TEAMS) if "bracket" in season else SEC_BRACKET
+    iterations = season.get("iterations", iterations)
+    rng = np.random.default_rng(season.get("seed", seed))
+
+    rating_array = np.array([ratings.get(team, 1500.0) for team in bracket.teams])
+    matrix = EloModel(ratings).probability_matrix(bracket.teams)
+    exact = round_probabilities(bracket, advancement_probabilities(bracket, matrix))
+    simulated = simulated_round_probabilities(bracket, simulate_bracket(bracket, matrix, iterations, rng))
+
+    # Only teams that are in this season's bracket get rows
+    entrants = [bracket.team_index[team] for team in bracket.entrants()]
+    n_rounds = len(bracket.round_names)
+    rounds = np.repeat(np.arange(n_rounds), len(entrants))
+    teams = np.tile(entrants, n_rounds)
+    return {
+        "season": [season["name"]] * len(teams),
+        "team": [bracket.teams[t] for t in teams],
+        "rating": rating_array[teams],
+        "round_index": rounds,
+        "round": [bracket.round_names[r] for r in rounds],
+        "exact": exact[rounds, teams],
+        "simulated": simulated[rounds, teams],
+        "iterations": np.full(len(teams), iterations),
+    }
+
+
+def run_batch(seasons, iterations=ITERATIONS, workers=None, ocr_engine="pytesseract",
+              ocr_cache=DEFAULT_OCR_CACHE, seed=2025, verbose=False):
+    """Predict every season in a shared process pool and return one combined DataFrame."""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(ocr_engine, ocr_cache)) as pool:
+        futures = {pool.submit(predict_season, season, iterations, seed + i, verbose): i
+                   for i, season in enumerate(seasons)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+                print(f"Finished {seasons[i]['name']}")
+            except Exception as e:
+                print(f"Error predicting {seasons[i]['name']}: {e}")
+
+    # Keep manifest order regardless of which season finished first
+    frames = [pd.DataFrame(results[i], columns=RESULT_COLUMNS) for i in sorted(results)]
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def save_results(table, path):
+    """Write the results table as Parquet (.parquet, needs pyarrow) or CSV."""
+    if path.endswith(".parquet"):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+def main():
+    """Run predictions for every season in a manifest."""
+    parser = argparse.ArgumentParser(description='Batch SEC Basketball Tournament predictions')
+    parser.add_argument('manifest', help='JSON manifest of seasons to predict')
+    parser.add_argument('--output', default='batch_predictions.csv',
+                        help='Combined results file (.csv or .parquet)')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS,
+                        help='Simulations per season unless the manifest says otherwise')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--ocr-engine', default='pytesseract', choices=sorted(OCR_ENGINES),
+                        help='OCR engine used by every worker')
+    parser.add_argument('--ocr-cache', default=DEFAULT_OCR_CACHE,
+                        help='Folder for cached OCR text (empty string to disable)')
+    parser.add_argument('--seed', type=int, default=2025, help='Base random seed; season i uses seed + i')
+    parser.add_argument('--verbose', action='store_true', help='Show per-season predictor output')
+    args = parser.parse_args()
+
+    seasons = load_manifest(args.manifest)
+    start = time.time()
+    table = run_batch(seasons, args.iterations, args.workers, args.ocr_engine,
+                      args.ocr_cache or None, args.seed, args.verbose)
+    save_results(table, args.output)
+    print(f"Predicted {table['season'].nunique()} of {len(seasons)} seasons in "
+          f"{time.time() - start:.1f}s; results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Distributed tournament simulation over several machines.
+
+A coordinator splits every scenario (a set of ratings, optionally with
+per-simulation rating noise, on a bracket) into work units of consecutive
+seed blocks and hands them to workers over TCP. Each seed block is a fixed
+number of tournaments drawn from a random stream derived from the base seed,
+the scenario and the block number alone, so a unit gives the same counts on
+any worker and the totals do not depend on who ran what.
+
+Workers return a (rounds x teams) count array per unit. A unit whose worker
+disconnects goes back in the queue, and a unit leased for longer than the
+lease time is handed to another worker as well. Only the first result for a
+seed range is added, so reissued units never count twice.
+
+The protocol is one JSON object per line:
+
+    worker -> {"type": "hello"}                     coordinator -> {"type": "scenarios", ...}
+    worker -> {"type": "next"} or {"type": "result", "scenario": 0, "start": 0, "stop": 10, "counts": [[...]]}
+    coordinator -> {"type": "work", "scenario": 0, "start": 10, "stop": 20}, {"type": "wait"} or {"type": "done"}
+
+Everything runs on one host too:
+
+    python distributed.py coordinator --rating-sd 0 30 60 --blocks 400 --port 8766
+    python distributed.py worker --port 8766 --processes 4
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import socketserver
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from tournament_engine import Bracket, win_probability_matrix, play_bracket_ratings, simulate_bracket
+from rating_uncertainty import normalize_ratings, sample_ratings
+
+DEFAULT_PORT = 8766
+DEFAULT_BLOCK_SIZE = 100000
+DEFAULT_LEASE = 120.0
+
+
+def sweep_scenarios(stats, weight_sets, rating_sds, bracket, base=1500.0):
+    """
+    One scenario per combination of a named weight vector and a rating
+    standard deviation, with ratings built like the predictor's stat-based Elo.
+    Missing stats are filled with their averages.
+    """
+    values = stats.reindex(bracket.teams).filled_with_means().values
+    scenarios = []
+    for name, weights in weight_sets.items():
+        ratings = normalize_ratings(base + values @ np.asarray(weights, float))
+        for sd in rating_sds:
+            scenarios.append({"name": f"{name} sd={sd:g}", "ratings": ratings.tolist(),
+                              "rating_sd": float(sd), "bracket": bracket.to_dict()})
+    return scenarios
+
+
+def block_counts(scenario, bracket, index, block, block_size, seed):
+    """(rounds x teams) counts of round wins in one seed block of a scenario."""
+    rng = np.random.default_rng([seed, index, block])
+    if scenario.get("rating_sd"):
+        ratings = sample_ratings(scenario["ratings"], block_size, rng, scenario["rating_sd"])
+        winners = play_bracket_ratings(bracket, ratings, rng.random((block_size, bracket.n_games)))
+    else:
+        winners = simulate_bracket(bracket, win_probability_matrix(scenario["ratings"]), block_size, rng)
+    counts = np.zeros((len(bracket.round_names), bracket.n_teams), dtype=np.int64)
+    for g in range(bracket.n_games):
+        counts[bracket.game_round[g]] += np.bincount(winners[:, g], minlength=bracket.n_teams)
+    return counts
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    """Answers one worker connection until it finishes or goes away."""
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        worker = f"{self.client_address[0]}:{self.client_address[1]}"
+        try:
+            for line in self.rfile:
+                reply = coordinator.handle(worker, json.loads(line))
+                self.wfile.write((json.dumps(reply) + "\n").encode())
+                if reply["type"] == "done":
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            coordinator.worker_lost(worker)
+
+
+class Coordinator:
+    """Hands out (scenario, seed range) units and adds up each range's counts once."""
+
+    def __init__(self, scenarios, blocks, block_size=DEFAULT_BLOCK_SIZE, blocks_per_unit=10, seed=2025,
+                 lease=DEFAULT_LEASE, host="127.0.0.1", port=DEFAULT_PORT):
+        self.scenarios = scenarios
+        self.brackets = [Bracket.from_dict(scenario["bracket"]) for scenario in scenarios]
+        self.blocks = blocks
+        self.block_size = block_size
+        self.seed = seed
+        self.lease = lease
+        self.pending = deque((s, start, min(start + blocks_per_unit, blocks))
+                             for s in range(len(scenarios)) for start in range(0, blocks, blocks_per_unit))
+        self.n_units = len(self.pending)
+        # unit -> (worker, lease deadline) for units handed out and not yet returned
+        self.leased = {}
+        self.completed = set()
+        self.totals = [np.zeros((len(b.round_names), b.n_teams), dtype=np.int64) for b in self.brackets]
+        self.counters = {"issued": 0, "reissued": 0, "duplicates": 0, "lost": 0}
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self.server = socketserver.ThreadingTCPServer((host, port), _WorkerHandler, bind_and_activate=False)
+        self.server.allow_reuse_address = True
+        self.server.daemon_threads = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.server.coordinator = self
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def handle(self, worker, message):
+        """Process one message from a worker and return the reply."""
+        with self._lock:
+            if message["type"] == "hello":
+                return {"type": "scenarios", "scenarios": self.scenarios,
+                        "block_size": self.block_size, "seed": self.seed}
+            if message["type"] == "result":
+                self._accept(message)
+
+            unit = self._next_unit(worker)
+            if unit is not None:
+                return {"type": "work", "scenario": unit[0], "start": unit[1], "stop": unit[2]}
+            if self._finished.is_set():
+                return {"type": "done"}
+            return {"type": "wait", "seconds": min(1.0, self.lease / 4)}
+
+    def _accept(self, message):
+        unit = (message["scenario"], message["start"], message["stop"])
+        if unit in self.completed:
+            self.counters["duplicates"] += 1
+            return
+        counts = np.asarray(message["counts"], dtype=np.int64)
+        if counts.shape != self.totals[unit[0]].shape:
+            raise ValueError(f"Counts of shape {counts.shape} for scenario {unit[0]}")
+        self.totals[unit[0]] += counts
+        self.completed.add(unit)
+        self.leased.pop(unit, None)
+        if len(self.completed) == self.n_units:
+            self._finished.set()
+
+    def _next_unit(self, worker):
+        now = time.monotonic()
+        while self.pending:
+            unit = self.pending.popleft()
+            if unit not in self.completed:
+                self.leased[unit] = (worker, now + self.lease)
+                self.counters["issued"] += 1
+                return unit
+        # Nothing new to hand out: take over a unit whose lease ran out
+        for unit, (holder, deadline) in self.leased.items():
+            if deadline < now and holder != worker:
+                self.leased[unit] = (worker, now + self.lease)
+                self.counters["reissued"] += 1
+                return unit
+        return None
+
+    def worker_lost(self, worker):
+        """Put the units a disconnected worker was holding back in the queue."""
+        with self._lock:
+            for unit in [unit for unit, (holder, _) in self.leased.items() if holder == worker]:
+                del self.leased[unit]
+                self.pending.appendleft(unit)
+                self.counters["lost"] += 1
+
+    def run(self, timeout=None):
+        """Serve workers until every unit is done (or timeout seconds pass); return the results table."""
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            self._finished.wait(timeout)
+            # Let connected workers hear they are done before closing
+            time.sleep(min(1.0, self.lease / 4))
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+        return self.results()
+
+    def results(self):
+        """Long-format table of each scenario's round-win counts and probabilities so far."""
+        rows = []
+        for index, (scenario, bracket, counts) in enumerate(zip(self.scenarios, self.brackets, self.totals)):
+            done = sum(stop - start for s, start, stop in self.completed if s == index) * self.block_size
+            for r, round_name in enumerate(bracket.round_names):
+                for t in bracket.entrants():
+                    count = int(counts[r, bracket.team_index[t]])
+                    rows.append({"scenario": scenario["name"], "team": t, "round_index": r, "round": round_name,
+                                 "count": count, "probability": count / done if done else np.nan,
+                                 "iterations": done})
+        return pd.DataFrame(rows)
+
+
+def run_worker(host="127.0.0.1", port=DEFAULT_PORT, fail_after=None):
+    """
+    Take units from a coordinator and return their counts until it says done.
+    fail_after drops the connection after receiving that many units, without
+    answering the last one (used to test recovery from lost workers).
+    """
+    with socket.create_connection((host, port)) as connection:
+        reader = connection.makefile("r")
+
+        def ask(message):
+            connection.sendall((json.dumps(message) + "\n").encode())
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("Coordinator closed the connection")
+            return json.loads(line)
+
+        setup = ask({"type": "hello"})
+        scenarios = setup["scenarios"]
+        brackets = [Bracket.from_dict(scenario["bracket"]) for scenario in scenarios]
+        received = 0
+        reply = ask({"type": "next"})
+        while reply["type"] != "done":
+            if reply["type"] == "wait":
+                time.sleep(reply["seconds"])
+                reply = ask({"type": "next"})
+                continue
+            received += 1
+            if fail_after is not None and received >= fail_after:
+                return received
+            s, start, stop = reply["scenario"], reply["start"], reply["stop"]
+            counts = sum(block_counts(scenarios[s], brackets[s], s, block, setup["block_size"], setup["seed"])
+                         for block in range(start, stop))
+            reply = ask({"type": "result", "scenario": s, "start": start, "stop": stop,
+                         "counts": counts.tolist()})
+        return received
+
+
+def start_local_workers(port, processes, host="127.0.0.1"):
+    """Start worker processes on this machine; returns the Popen objects."""
+    command = [sys.executable, __file__, "worker", "--host", host, "--port", str(port)]
+    return [subprocess.Popen(command) for _ in range(processes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed SEC Tournament simulation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="Hand out work units and collect the counts")
+    coordinator.add_argument("--season-data", default=None,
+                             help="Season file to build ratings from (default: the fallback stats)")
+    coordinator.add_argument("--weights", default=None,
+                             help="JSON file of {name: [composite weights]} to sweep (default: the predictor's)")
+    coordinator.add_argument("--rating-sd", type=float, nargs="+", default=[0.0],
+                             help="Rating standard deviations to sweep")
+    coordinator.add_argument("--blocks", type=int, default=100, help="Seed blocks per scenario")
+    coordinator.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Tournaments per seed block")
+    coordinator.add_argument("--blocks-per-unit", type=int, default=10, help="Seed blocks per work unit")
+    coordinator.add_argument("--seed", type=int, default=2025, help="Base random seed")
+    coordinator.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                             help="Seconds before an unanswered unit is handed to another worker")
+    coordinator.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    coordinator.add_argument("--local-workers", type=int, default=0, help="Also start this many local workers")
+    coordinator.add_argument("--output", default="distributed_predictions.csv", help="Results CSV")
+
+    worker = commands.add_parser("worker", help="Run units for a coordinator")
+    worker.add_argument("--host", default="127.0.0.1", help="Coordinator address")
+    worker.add_argument("--port", type=int, default=DEFAULT_PORT, help="Coordinator port")
+    worker.add_argument("--processes", type=int, default=1, help="Worker processes to start on this machine")
+    worker.add_argument("--fail-after", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        if args.processes > 1:
+            for process in start_local_workers(args.port, args.processes, args.host):
+                process.wait()
+        else:
+            run_worker(args.host, args.port, args.fail_after)
+        return
+
+    from sec_tournament_predictor import SEC_BRACKET, COMPOSITE_WEIGHTS, fallback_stats
+    from season_data import load_season
+    stats = load_season(args.season_data)[0] if args.season_data else fallback_stats()
+    weight_sets = {"default": COMPOSITE_WEIGHTS}
+    if args.weights:
+        with open(args.weights) as f:
+            weight_sets = json.load(f)
+    scenarios = sweep_scenarios(stats, weight_sets, args.rating_sd, SEC_BRACKET)
+
+    coordinator = Coordinator(scenarios, args.blocks, args.block_size, args.blocks_per_unit, args.seed,
+                              args.lease, args.host, args.port)
+    total = len(scenarios) * args.blocks * args.block_size
+    print(f"Coordinating {coordinator.n_units} units ({total:,} tournaments) on port {coordinator.address[1]}")
+    workers = start_local_workers(coordinator.address[1], args.local_workers) if args.local_workers else []
+    start = time.time()
+    table = coordinator.run()
+    for process in workers:
+        process.wait()
+    table.to_csv(args.output, index=False)
+    print(f"Finished in {time.time() - start:.1f}s ({coordinator.counters}); results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
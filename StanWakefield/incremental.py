@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Incremental recomputation of predictions when a few stats change.
+
+The pipeline is stats -> composite score -> normalized rating -> row and
+column of the win-probability matrix -> bracket games the team can reach.
+IncrementalPredictions keeps every stage in memory and, when one team's
+numbers change, only redoes what depends on them:
+
+- a team's composite depends on its own stats, plus column averages for any
+  stat another team is missing, so teams filled with that average change too;
+- ratings are min-max normalized, so they all move together whenever the
+  lowest or highest composite changes; otherwise only the changed teams do;
+- a team's matrix row and column only enter the games on its path to the
+  final, so only those games' advancement probabilities are recomputed.
+"""
+
+import time
+import numpy as np
+from rating_uncertainty import normalize_ratings
+from tournament_engine import win_probability_matrix, update_advancement, round_probabilities
+
+
+class IncrementalPredictions:
+    """Exact tournament odds kept up to date as individual stats change."""
+
+    def __init__(self, bracket, stats, weights, base=1500.0, scale=400.0):
+        self.bracket = bracket
+        self.stats = stats.copy()
+        self.weights = np.asarray(weights, dtype=float)
+        self.base = base
+        self.scale = scale
+        # Bracket team order -> stats row, for teams the stats table knows
+        self.rows = np.array([self.stats.team_index[team] for team in bracket.teams])
+        self.last_update = {}
+        self.recompute()
+
+    def recompute(self):
+        """Rebuild every stage from the stats."""
+        self.filled = np.where(self.stats.valid, self.stats.values, self.stats.column_means())
+        self.composite = self.base + self.filled[self.rows] @ self.weights
+        self.ratings = normalize_ratings(self.composite)
+        self.matrix = win_probability_matrix(self.ratings, self.scale)
+        self.dist = np.zeros((self.bracket.n_games, self.bracket.n_teams))
+        update_advancement(self.bracket, self.matrix, self.dist, range(self.bracket.n_games))
+
+    def update(self, changes):
+        """
+        Apply {team: {field: value}} stat changes and refresh the odds. A value
+        of None marks the stat as missing. Returns a summary of what was redone.
+        """
+        start = time.perf_counter()
+        fields = set()
+        changed = set()
+        for team, stats in changes.items():
+            for field, value in stats.items():
+                if value is None:
+                    self.stats.valid[self.stats.team_index[team], self.stats.field_index[field]] = False
+                else:
+                    self.stats.set(team, field, value)
+                fields.add(self.stats.field_index[field])
+            changed.add(self.bracket.team_index[team])
+
+        # Teams missing a changed stat are filled with its new average
+        for j in fields:
+            means = self.stats.column_means()
+            missing = np.flatnonzero(~self.stats.valid[self.rows, j])
+            changed.update(missing.tolist())
+            self.filled[:, j] = np.where(self.stats.valid[:, j], self.stats.values[:, j], means[j])
+        changed = sorted(changed)
+
+        old_low, old_high = self.composite.min(), self.composite.max()
+        self.composite[changed] = self.base + self.filled[self.rows[changed]] @ self.weights
+        full = self.composite.min() != old_low or self.composite.max() != old_high
+
+        if full:
+            # The normalization range moved, so every rating and matrix entry changes
+            self.ratings = normalize_ratings(self.composite)
+            self.matrix = win_probability_matrix(self.ratings, self.scale)
+            games = range(self.bracket.n_games)
+        else:
+            low, high = old_low, old_high
+            self.ratings[changed] = normalize_ratings(np.append(self.composite[changed], [low, high]))[:-2]
+            rows = 1.0 / (1.0 + 10.0 ** ((self.ratings[None, :] - self.ratings[changed, None]) / self.scale))
+            self.matrix[changed, :] = rows
+            self.matrix[:, changed] = 1.0 - rows.T
+            games = sorted({g for t in changed for g in self.bracket.team_path(self.bracket.teams[t])})
+
+        update_advancement(self.bracket, self.matrix, self.dist, games)
+        self.last_update = {
+            "teams": [self.bracket.teams[t] for t in changed],
+            "full": bool(full),
+            "games": len(games),
+            "seconds": time.perf_counter() - start,
+        }
+        return self.last_update
+
+    def round_probabilities(self):
+        """(rounds x teams) probability of each team winning its game in each round."""
+        return round_probabilities(self.bracket, self.dist)
+
+    def championship_probabilities(self):
+        """Dict of each team's probability of winning the final."""
+        return dict(zip(self.bracket.teams, self.dist[self.bracket.final].tolist()))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Streaming simulation kernel for very large iteration counts.
+
+The NumPy engine builds a (simulations x games) array of uniforms and winners,
+so its memory grows with the number of simulations. With Numba installed
+(`pip install numba`), this kernel instead plays one tournament at a time in
+each thread, keeping only the current bracket's winners and a fixed
+(rounds x teams) counter per chunk, so memory stays constant however many
+tournaments are run. Work is split into a fixed number of chunks, each with
+its own splitmix64 random stream derived from the seed, so results do not
+depend on the number of cores.
+
+Without Numba, simulate_round_counts falls back to the NumPy engine run in
+fixed-size batches, which also keeps memory bounded.
+"""
+
+import numpy as np
+from tournament_engine import NOT_FED, simulate_bracket
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # Leave the kernel as plain Python so the module still imports
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+ENGINES = ["auto", "numba", "numpy"]
+
+# Chunks of work, each with its own random stream; fixed so results don't depend on thread count
+N_CHUNKS = 256
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_TO_UNIT = 1.0 / 9007199254740992.0  # 2^-53
+
+
+@njit(cache=True)
+def _splitmix64(state):
+    """Advance a splitmix64 state; return (new state, uniform in [0, 1))."""
+    state = state + _GOLDEN
+    z = state
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    z = z ^ (z >> np.uint64(31))
+    return state, (z >> np.uint64(11)) * _TO_UNIT
+
+
+@njit(parallel=True, cache=True)
+def _round_counts_kernel(side_team, side_game, game_round, matrix, n_rounds, iterations, seed, n_chunks):
+    n_games = side_team.shape[0]
+    n_teams = matrix.shape[0]
+    counts = np.zeros((n_chunks, n_rounds, n_teams), dtype=np.int64)
+    per_chunk = (iterations + n_chunks - 1) // n_chunks
+
+    for c in prange(n_chunks):
+        # Seed each chunk's stream from the run seed and the chunk number
+        state = np.uint64(seed)
+        for _ in range(c + 1):
+            state, _u = _splitmix64(state)
+        state = state ^ np.uint64(c)
+
+        winners = np.empty(n_games, dtype=np.int64)
+        stop = min(iterations, (c + 1) * per_chunk)
+        for _ in range(c * per_chunk, stop):
+            for g in range(n_games):
+                a = side_team[g, 0] if side_team[g, 0] != NOT_FED else winners[side_game[g, 0]]
+                b = side_team[g, 1] if side_team[g, 1] != NOT_FED else winners[side_game[g, 1]]
+                state, u = _splitmix64(state)
+                winners[g] = a if u < matrix[a, b] else b
+                counts[c, game_round[g], winners[g]] += 1
+
+    return counts.sum(axis=0)
+
+
+def _numpy_round_counts(bracket, matrix, iterations, seed, batch_size):
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((len(bracket.round_names), bracket.n_teams), dtype=np.int64)
+    for start in range(0, iterations, batch_size):
+        winners = simulate_bracket(bracket, matrix, min(batch_size, iterations - start), rng)
+        for g in range(bracket.n_games):
+            counts[bracket.game_round[g]] += np.bincount(winners[:, g], minlength=bracket.n_teams)
+    return counts
+
+
+def simulate_round_counts(bracket, matrix, iterations, seed=None, engine="auto", batch_size=1000000):
+    """
+    Return a (rounds x teams) array counting how many of iterations simulated
+    tournaments each team won a game in each round. engine is "numba", "numpy"
+    or "auto" (Numba when installed).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'; choose from {', '.join(ENGINES)}")
+    if engine == "numba" and not HAVE_NUMBA:
+        print("Warning: Numba is not installed. Using the NumPy engine instead.")
+    if engine == "numpy" or not HAVE_NUMBA:
+        return _numpy_round_counts(bracket, matrix, iterations, seed, batch_size)
+
+    # Kept as uint64: half of all derived seeds do not fit the int64 Numba would infer for an int
+    seed = np.random.SeedSequence(seed).generate_state(1, np.uint64)[0]
+    return _round_counts_kernel(bracket.side_team, bracket.side_game, bracket.game_round,
+                                np.ascontiguousarray(matrix, dtype=np.float64),
+                                len(bracket.round_names), iterations, seed, N_CHUNKS)
@@ -6,31 +6,76 @@ This script helps debug OCR extraction from statistical images
 
 import os
 import sys
+import time
 from PIL import Image
-import pytesseract
 import argparse
+from ocr_preprocess import preprocess_image, profile_for
+from ocr_engine import get_ocr_engine, OCR_ENGINES
+from sec_tournament_predictor import SECTournamentPredictor, stat_type_for
 
-def extract_text(image_path):
-    """Extract text from an image using pytesseract OCR"""
+def extract_text(image_path, preprocess=False, engine=None):
+    """Extract text from an image using an OCR engine (pytesseract by default)"""
+    engine = engine or get_ocr_engine()
     try:
         img = Image.open(image_path)
-        text = pytesseract.image_to_string(img)
+        if preprocess:
+            profile = profile_for(stat_type_for(os.path.basename(image_path)))
+            return engine.image_to_string(preprocess_image(img, profile), profile)
+        text = engine.image_to_string(img)
         return text
     except Exception as e:
         print(f"Error extracting text from {image_path}: {e}")
         return ""
 
+def read_stat_image(image_path, preprocess=False, engine=None):
+    """Read a stat image the way the predictor does, with row re-reads; return {team: {field: (value, confidence)}}"""
+    stat_type = stat_type_for(os.path.basename(image_path))
+    if not stat_type:
+        return {}
+    predictor = SECTournamentPredictor(preprocess_ocr=preprocess, ocr_engine=engine)
+    return predictor._extract_image(image_path, stat_type)
+
+def compare_preprocessing(directory, engine):
+    """Time raw and preprocessed extraction on every image and count the teams each path matches"""
+    print(f"{'Image':<32} {'Raw s':>7} {'Raw teams':>10} {'Prep s':>7} {'Prep teams':>11}")
+    totals = [0.0, 0, 0.0, 0]
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+            continue
+        file_path = os.path.join(directory, filename)
+        row = []
+        for preprocess in (False, True):
+            start = time.time()
+            try:
+                teams = len(read_stat_image(file_path, preprocess=preprocess, engine=engine))
+            except Exception as e:
+                print(f"Error reading {file_path}: {e}")
+                teams = 0
+            row += [time.time() - start, teams]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{filename:<32} {row[0]:>7.2f} {row[1]:>10} {row[2]:>7.2f} {row[3]:>11}")
+    print(f"{'Total':<32} {totals[0]:>7.2f} {totals[1]:>10} {totals[2]:>7.2f} {totals[3]:>11}")
+
 def main():
     parser = argparse.ArgumentParser(description='Debug OCR extraction from SEC stats images')
     parser.add_argument('--image', type=str, help='Path to image file to process', default=None)
     parser.add_argument('--dir', type=str, help='Directory containing images to process', default='stats')
     parser.add_argument('--output', type=str, help='Path to save OCR output', default=None)
+    parser.add_argument('--preprocess', action='store_true',
+                        help='Crop, binarize and rescale images before OCR, as the predictor does')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare speed and teams matched for raw vs preprocessed extraction over --dir')
+    parser.add_argument('--engine', default='pytesseract', choices=sorted(OCR_ENGINES),
+                        help='OCR engine to use; tesserocr loads the model once for all images')
     args = parser.parse_args()
+    engine = get_ocr_engine(args.engine)
     
-    if args.image:
+    if args.compare:
+        compare_preprocessing(args.dir, engine)
+    elif args.image:
         # Process single image
         print(f"Processing image: {args.image}")
-        text = extract_text(args.image)
+        text = extract_text(args.image, preprocess=args.preprocess, engine=engine)
         
         if args.output:
             with open(args.output, 'w') as f:
@@ -54,7 +99,7 @@ def main():
             if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
                 file_path = os.path.join(args.dir, filename)
                 print(f"Processing image: {file_path}")
-                text = extract_text(file_path)
+                text = extract_text(file_path, preprocess=args.preprocess, engine=engine)
                 
                 if args.output:
                     output_file = os.path.join(args.output, f"{os.path.splitext(filename)[0]}.txt")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+OCR engines for the SEC Tournament Predictor.
+
+Every OCR call goes through an OCREngine. The default engine uses pytesseract,
+which writes each image to a temporary file and starts a new tesseract
+process for it. The optional tesserocr engine keeps one tesseract instance
+(and its loaded language model) in process and reuses it for every image,
+so batch extraction pays the model-load cost once.
+
+Besides flat text, engines return word-level results with tesseract's
+confidence (0-100) for each word, grouped into lines (image_to_data), so
+callers can tell which rows of a stats table were read reliably.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import pytesseract
+
+
+class OCRWord:
+    """One recognized word with its confidence (0-100) and (left, top, right, bottom) box."""
+
+    def __init__(self, text, confidence, box):
+        self.text = text
+        self.confidence = float(confidence)
+        self.box = tuple(int(v) for v in box)
+
+
+class OCRLine:
+    """The words tesseract placed on one text line."""
+
+    def __init__(self, words):
+        self.words = list(words)
+
+    @property
+    def text(self):
+        return " ".join(word.text for word in self.words)
+
+    @property
+    def confidence(self):
+        """Confidence of the least certain word, since one misread digit spoils the row."""
+        return min(word.confidence for word in self.words)
+
+    @property
+    def box(self):
+        boxes = np.array([word.box for word in self.words])
+        return (int(boxes[:, 0].min()), int(boxes[:, 1].min()), int(boxes[:, 2].max()), int(boxes[:, 3].max()))
+
+
+class OCREngine(ABC):
+    """Interface for turning an image into text."""
+
+    name = None
+
+    @abstractmethod
+    def image_to_string(self, image, profile=None):
+        """Return the text in a PIL image, using the profile's tesseract settings if given."""
+
+    @abstractmethod
+    def image_to_data(self, image, profile=None):
+        """Return the recognized text as a list of OCRLines with word confidences and boxes."""
+
+    def close(self):
+        """Release any resources held by the engine."""
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract command-line program once per image."""
+
+    name = "pytesseract"
+
+    def image_to_string(self, image, profile=None):
+        config = profile.tesseract_config() if profile else ""
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image, profile=None):
+        config = profile.tesseract_config() if profile else ""
+        data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+        lines = {}
+        for i, text in enumerate(data["text"]):
+            # Rows for blocks, paragraphs and lines themselves have a confidence of -1
+            if not text.strip() or float(data["conf"][i]) < 0:
+                continue
+            box = (data["left"][i], data["top"][i],
+                   data["left"][i] + data["width"][i], data["top"][i] + data["height"][i])
+            line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(line, []).append(OCRWord(text.strip(), data["conf"][i], box))
+        return [OCRLine(words) for words in lines.values()]
+
+
+class TesserocrEngine(OCREngine):
+    """Keeps a tesseract instance loaded in process through the tesserocr bindings."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang="eng"):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._api = tesserocr.PyTessBaseAPI(lang=lang)
+        # The tesseract API object is not safe to share between threads
+        self._lock = threading.Lock()
+
+    def _set_image(self, image, profile):
+        # Variables persist on the instance, so reset them for every image
+        self._api.Clear()
+        self._api.SetPageSegMode(profile.psm if profile else self._tesserocr.PSM.AUTO)
+        self._api.SetVariable("tessedit_char_whitelist", "")
+        if profile:
+            for name, value in profile.tesseract_variables().items():
+                self._api.SetVariable(name, value)
+        self._api.SetImage(image)
+
+    def image_to_string(self, image, profile=None):
+        with self._lock:
+            self._set_image(image, profile)
+            return self._api.GetUTF8Text()
+
+    def image_to_data(self, image, profile=None):
+        level, line_level = self._tesserocr.RIL.WORD, self._tesserocr.RIL.TEXTLINE
+        lines = []
+        with self._lock:
+            self._set_image(image, profile)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            for word in self._tesserocr.iterate_level(iterator, level):
+                text = word.GetUTF8Text(level)
+                if not text or not text.strip():
+                    continue
+                if not lines or word.IsAtBeginningOf(line_level):
+                    lines.append([])
+                lines[-1].append(OCRWord(text.strip(), word.Confidence(level), word.BoundingBox(level)))
+        return [OCRLine(words) for words in lines]
+
+    def close(self):
+        self._api.End()
+
+
+class CachedOCREngine(OCREngine):
+    """
+    Wraps another engine and stores its text on disk keyed by the image pixels
+    and tesseract settings, so the same screenshot is only read once across
+    runs and across processes sharing the cache directory.
+    """
+
+    def __init__(self, engine, cache_dir):
+        self.engine = engine
+        self.name = engine.name
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, image, profile=None):
+        digest = hashlib.sha256()
+        digest.update(f"{self.engine.name}|{image.mode}|{image.size}|".encode())
+        digest.update((profile.tesseract_config() if profile else "").encode())
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def image_to_string(self, image, profile=None):
+        path = os.path.join(self.cache_dir, self.key(image, profile) + ".txt")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+
+        text = self.engine.image_to_string(image, profile)
+        # Write under a unique name first so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        return text
+
+    def image_to_data(self, image, profile=None):
+        path = os.path.join(self.cache_dir, self.key(image, profile) + ".json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return [OCRLine(OCRWord(*word) for word in line) for line in json.load(f)]
+
+        lines = self.engine.image_to_data(image, profile)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([[[word.text, word.confidence, word.box] for word in line.words] for line in lines], f)
+        os.replace(tmp_path, path)
+        return lines
+
+    def close(self):
+        self.engine.close()
+
+
+OCR_ENGINES = {
+    PytesseractEngine.name: PytesseractEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+
+
+def get_ocr_engine(name="pytesseract"):
+    """Create the named OCR engine, falling back to pytesseract if it is unavailable."""
+    try:
+        return OCR_ENGINES[name]()
+    except ImportError:
+        print(f"Warning: OCR engine '{name}' is not installed. Using pytesseract instead.")
+        return PytesseractEngine()
+    except RuntimeError as e:
+        print(f"Warning: Could not start OCR engine '{name}': {e}. Using pytesseract instead.")
+        return PytesseractEngine()
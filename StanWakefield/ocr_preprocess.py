@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Image preprocessing for OCR in the SEC Tournament Predictor.
+
+The stat screenshots are wide, mostly white pages with a title, two tables
+side by side and zebra-striped rows. Tesseract spends most of its time on
+layout analysis of that page, so each image is reduced to the table it needs
+before OCR: grayscale, binarize (Otsu), locate the table below its header
+rule, crop, and rescale so text lines are the height tesseract reads best.
+Settings are chosen per stat type through OCRProfile.
+"""
+
+import string
+import numpy as np
+from PIL import Image
+
+# Characters that can appear in a stats table row
+OCR_WHITELIST = string.ascii_letters + string.digits + ".&-"
+# Limits on the rescale to the target line height; large screenshots are shrunk, small ones enlarged
+MIN_SCALE = 0.25
+MAX_SCALE = 3.0
+
+
+class OCRProfile:
+    """Preprocessing and tesseract settings for one kind of stat screenshot."""
+
+    def __init__(self, psm=6, whitelist=OCR_WHITELIST, region=(0.0, 1.0),
+                 crop_table=True, target_line_height=20):
+        # psm 6 reads the crop as one uniform block of text, which suits table rows
+        self.psm = psm
+        self.whitelist = whitelist
+        # Horizontal slice of the page to keep, as fractions of its width
+        self.region = region
+        self.crop_table = crop_table
+        self.target_line_height = target_line_height
+
+    def tesseract_variables(self):
+        """Return the tesseract variables to set for this profile."""
+        variables = {"preserve_interword_spaces": "1"}
+        if self.whitelist:
+            variables["tessedit_char_whitelist"] = self.whitelist
+        return variables
+
+    def tesseract_config(self):
+        """Return the tesseract command-line config for this profile."""
+        config = f"--psm {self.psm}"
+        for name, value in self.tesseract_variables().items():
+            config += f" -c {name}={value}"
+        return config
+
+
+DEFAULT_PROFILE = OCRProfile()
+
+# Most screenshots put the team's own stat in the left table and the
+# opponent's in the right; offense-defense needs both tables.
+OCR_PROFILES = {
+    "offense-defense": OCRProfile(),
+    "field-goal-percentage": OCRProfile(region=(0.0, 0.5)),
+    "3-point-field-goals": OCRProfile(region=(0.0, 0.5)),
+    "free-throw-percentage": OCRProfile(region=(0.0, 0.5)),
+    "combined-team-rebounds": OCRProfile(region=(0.0, 0.5)),
+    "turnovers": OCRProfile(region=(0.0, 0.5)),
+    "blocked-shots-and-assists": OCRProfile(),
+}
+
+
+# Re-reading a single table row: psm 7 treats the crop as one line of text
+LINE_PROFILE = OCRProfile(psm=7, crop_table=False)
+
+
+def profile_for(stat_type):
+    """Return the OCR profile for a stat type, or the default profile."""
+    return OCR_PROFILES.get(stat_type, DEFAULT_PROFILE)
+
+
+def to_grayscale(image):
+    """Convert an image to an 8-bit grayscale array, flattening transparency onto white."""
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    return np.asarray(image.convert("L"))
+
+
+def otsu_threshold(gray):
+    """Return the Otsu threshold separating dark text from a light background."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(float)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between))
+
+
+def find_table_region(gray, ink):
+    """
+    Return (top, bottom, left, right) of the table in the image.
+
+    The table starts at the first full-width rule (the line under the page
+    title) and ends at the last row of ink. Rules are light gray, so they
+    are found on the grayscale image rather than the binarized one.
+    """
+    height, width = ink.shape
+    rule_rows = np.flatnonzero((gray < 240).mean(axis=1) > 0.6)
+    ink_rows = np.flatnonzero(ink.any(axis=1))
+    ink_cols = np.flatnonzero(ink.any(axis=0))
+    if len(ink_rows) == 0:
+        return 0, height, 0, width
+
+    top = rule_rows[0] if len(rule_rows) and rule_rows[0] < ink_rows[-1] else ink_rows[0]
+    pad = 4
+    return (max(top - pad, 0), min(ink_rows[-1] + pad + 1, height),
+            max(ink_cols[0] - pad, 0), min(ink_cols[-1] + pad + 1, width))
+
+
+def estimate_line_height(ink):
+    """Return the median height in pixels of the text lines in a binarized image."""
+    rows = ink.any(axis=1).astype(np.int8)
+    edges = np.diff(np.concatenate([[0], rows, [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return 0
+    return float(np.median(ends - starts))
+
+
+def preprocess_image(image, profile=DEFAULT_PROFILE):
+    """Return a cropped, rescaled, binarized copy of a stat screenshot ready for OCR."""
+    gray = to_grayscale(image)
+
+    # Keep only the part of the page this stat type needs
+    left = int(profile.region[0] * gray.shape[1])
+    right = int(profile.region[1] * gray.shape[1])
+    gray = gray[:, left:right]
+
+    ink = gray < otsu_threshold(gray)
+    if profile.crop_table:
+        top, bottom, left, right = find_table_region(gray, ink)
+        gray = gray[top:bottom, left:right]
+        ink = ink[top:bottom, left:right]
+
+    # Scale so text lines come out near the target height, then binarize again
+    result = Image.fromarray(gray)
+    line_height = estimate_line_height(ink)
+    if line_height > 0:
+        scale = min(max(profile.target_line_height / line_height, MIN_SCALE), MAX_SCALE)
+        if abs(scale - 1.0) > 0.05:
+            size = (int(result.width * scale), int(result.height * scale))
+            result = result.resize(size, Image.LANCZOS)
+
+    scaled = np.asarray(result)
+    binary = np.where(scaled < otsu_threshold(scaled), 0, 255).astype(np.uint8)
+    return Image.fromarray(binary)
+
+
+def crop_line(image, box, scale=2.0, pad=6):
+    """
+    Return the strip of an OCR'd image holding one text line, from the rows of
+    its (left, top, right, bottom) box, upscaled for a second, closer read with
+    LINE_PROFILE. The strip keeps the full width so no digits at the ends of
+    the row are lost.
+    """
+    gray = to_grayscale(image)
+    top, bottom = max(box[1] - pad, 0), min(box[3] + pad, gray.shape[0])
+    line = Image.fromarray(gray[top:bottom])
+    line = line.resize((int(line.width * scale), int(line.height * scale)), Image.LANCZOS)
+    scaled = np.asarray(line)
+    binary = np.where(scaled < otsu_threshold(scaled), 0, 255).astype(np.uint8)
+    return Image.fromarray(binary)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Conditional queries over simulated tournaments.
+
+OutcomeIndex keeps, for every game and team, a bitmap over the simulations
+in which that team won that game, packed 64 simulations to a word. Events
+such as "Alabama reaches the final" or "a first-round team makes the
+semifinals" are ORs of those bitmaps, and a conditional probability is an
+AND of two events followed by a popcount, so a query never rescans the
+simulations themselves.
+
+    index = OutcomeIndex(SEC_BRACKET, winners)
+    index.probability(index.champion("Auburn"), given=index.reaches("Alabama", "Championship"))
+"""
+
+import numpy as np
+
+# Bits set in each byte value, for NumPy versions without bitwise_count
+_BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def _popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_BYTE_BITS[words.view(np.uint8)].sum())
+
+
+class Event:
+    """A set of simulations, as a packed bitmap. Combine with &, | and ~."""
+
+    def __init__(self, index, bits):
+        self.index = index
+        self.bits = bits
+
+    def __and__(self, other):
+        return Event(self.index, self.bits & other.bits)
+
+    def __or__(self, other):
+        return Event(self.index, self.bits | other.bits)
+
+    def __invert__(self):
+        return Event(self.index, ~self.bits & self.index.valid)
+
+    def count(self):
+        """Number of simulations in the event."""
+        return _popcount(self.bits)
+
+
+class OutcomeIndex:
+    """Per-game, per-team bitmaps of which simulations each team won each game."""
+
+    def __init__(self, bracket, winners):
+        """winners is a (simulations x games) array of winning team indexes, as from simulate_bracket."""
+        self.bracket = bracket
+        self.iterations = len(winners)
+        self.words = (self.iterations + 63) // 64
+        self.valid = self._pack(np.ones(self.iterations, dtype=bool))
+        self.bits = np.zeros((bracket.n_games, bracket.n_teams, self.words), dtype=np.uint64)
+        for g in range(bracket.n_games):
+            for t in np.unique(winners[:, g]):
+                self.bits[g, t] = self._pack(winners[:, g] == t)
+
+    def _pack(self, mask):
+        packed = np.packbits(mask, bitorder="little")
+        padded = np.zeros(self.words * 8, dtype=np.uint8)
+        padded[:len(packed)] = packed
+        return padded.view(np.uint64)
+
+    def _round(self, round_name):
+        if round_name in self.bracket.round_names:
+            return self.bracket.round_names.index(round_name)
+        if isinstance(round_name, int) and 0 <= round_name < len(self.bracket.round_names):
+            return round_name
+        raise ValueError(f"Unknown round: {round_name}")
+
+    def everything(self):
+        """Every simulation."""
+        return Event(self, self.valid.copy())
+
+    def nothing(self):
+        """No simulation."""
+        return Event(self, np.zeros(self.words, dtype=np.uint64))
+
+    def won_game(self, team, game):
+        """Simulations in which team won the given game."""
+        return Event(self, self.bits[game, self.bracket.team_index[team]].copy())
+
+    def wins(self, team, round_name):
+        """Simulations in which team won its game in the given round."""
+        games = np.flatnonzero(self.bracket.game_round == self._round(round_name))
+        t = self.bracket.team_index[team]
+        return Event(self, np.bitwise_or.reduce(self.bits[games, t], axis=0))
+
+    def reaches(self, team, round_name):
+        """Simulations in which team plays a game in the given round."""
+        t = self.bracket.team_index[team]
+        event = self.nothing()
+        for g in np.flatnonzero(self.bracket.game_round == self._round(round_name)):
+            for s in range(2):
+                if self.bracket.side_team[g, s] == t:
+                    return self.everything()
+                if self.bracket.side_game[g, s] >= 0:
+                    event.bits |= self.bits[self.bracket.side_game[g, s], t]
+        return event
+
+    def champion(self, team):
+        """Simulations in which team won the final."""
+        return self.won_game(team, self.bracket.final)
+
+    def entered(self, round_name):
+        """Teams whose first game is in the given round (for the SEC, the seeds playing there)."""
+        r = self._round(round_name)
+        games = np.flatnonzero(self.bracket.game_round == r)
+        seated = self.bracket.side_team[games]
+        return [self.bracket.teams[t] for t in sorted(set(seated[seated >= 0].tolist()))]
+
+    def any_of(self, events):
+        """Simulations in at least one of the events; no events means no simulation."""
+        event = self.nothing()
+        for other in events:
+            event.bits |= other.bits
+        return event
+
+    def all_of(self, events):
+        """Simulations in every one of the events; no events means every simulation."""
+        event = self.everything()
+        for other in events:
+            event.bits &= other.bits
+        return event
+
+    def probability(self, event, given=None):
+        """P(event | given) with the sample counts behind it."""
+        given = given if given is not None else self.everything()
+        given_count = given.count()
+        count = (event & given).count()
+        probability = count / given_count if given_count else float("nan")
+        return {
+            "probability": probability,
+            "count": count,
+            "given_count": given_count,
+            "standard_error": float(np.sqrt(probability * (1 - probability) / given_count))
+                              if given_count else float("nan"),
+        }
+
+    def marginals(self, round_name=None, given=None):
+        """P(team wins its game in round | given) for every team; the final by default."""
+        round_name = round_name if round_name is not None else self.bracket.round_names[-1]
+        return {team: self.probability(self.wins(team, round_name), given)
+                for team in self.bracket.teams}
+
+    def event_from_spec(self, spec):
+        """
+        Build an event from a dict such as {"team": "Alabama", "reaches": "Championship"},
+        {"teams": [...], "wins": "Semifinals"} (any of the teams),
+        {"entered": "First Round", "reaches": "Semifinals"} (any team that started there) or
+        {"team": "Auburn", "game": 14} (the team won that game). A list of specs means all
+        of them. No teams, or an empty list, matches no simulation or every one.
+        """
+        if isinstance(spec, list):
+            return self.all_of(self.event_from_spec(item) for item in spec)
+        if not isinstance(spec, dict):
+            raise ValueError("An event is a dict or a list of dicts")
+
+        if "team" in spec:
+            teams = [spec["team"]]
+        elif "teams" in spec:
+            teams = spec["teams"]
+        elif "entered" in spec:
+            teams = self.entered(spec["entered"])
+        else:
+            raise ValueError("An event needs team, teams or entered")
+        for team in teams:
+            if team not in self.bracket.team_index:
+                raise ValueError(f"Unknown team: {team}")
+
+        if "wins" in spec:
+            return self.any_of(self.wins(team, spec["wins"]) for team in teams)
+        if "reaches" in spec:
+            return self.any_of(self.reaches(team, spec["reaches"]) for team in teams)
+        if "game" in spec:
+            game = spec["game"]
+            if isinstance(game, bool) or not isinstance(game, int) or not 0 <= game < self.bracket.n_games:
+                raise ValueError(f"Unknown game: {game}")
+            return self.any_of(self.won_game(team, game) for team in teams)
+        raise ValueError("An event needs wins, reaches or game")
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local prediction service for the SEC Basketball Championship Predictor.
+
+Builds the predictor once and keeps its ratings, probability matrix, exact
+advancement probabilities and latest simulation results in memory, then
+answers queries over a small HTTP/JSON API. A background thread polls the
+inputs (stat images, results file, fallback data) and rebuilds the state when
+they change; queries keep being answered from the previous state meanwhile.
+
+Endpoints (all GET unless noted):
+    /status                      inputs, iterations and when the state was built
+    /bracket                     games in playing order
+    /odds                        championship probabilities, exact and simulated
+    /rounds                      probability of each team winning in each round
+    /head-to-head?a=X&b=Y        single-game win probability
+    /matchups?round=Semifinals   probability of every pairing in a round (all rounds if omitted)
+    /what-if?winner=G:Team&rating=Team:1650
+    POST /what-if                {"winners": {"8": "Auburn"}, "ratings": {"Florida": 1700}}
+    POST /conditional            {"event": {"team": "Auburn", "wins": "Championship"},
+                                  "given": {"team": "Alabama", "reaches": "Championship"}}
+                                 or {"round": "Championship", "given": ...} for every team
+    POST /refresh                rebuild the state now
+"""
+
+import os
+import json
+import time
+import threading
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+from sec_tournament_predictor import (SECTournamentPredictor, SEC_TEAMS, SEC_BRACKET, ITERATIONS,
+                                      FALLBACK_SEASON_FILES)
+from tournament_engine import (win_probability_matrix, advancement_probabilities, round_probabilities,
+                               matchup_probabilities, lock_paths)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class PredictionService:
+    """Holds the warm predictor state and answers queries against it."""
+
+    def __init__(self, stats_folder="stats", use_fallback=False, results_path=None,
+                 iterations=ITERATIONS, poll_interval=5.0, **predictor_options):
+        self.stats_folder = stats_folder
+        self.use_fallback = use_fallback
+        self.results_path = results_path
+        self.iterations = iterations
+        self.poll_interval = poll_interval
+        # Passed through to SECTournamentPredictor (preprocess_ocr, ocr_engine)
+        self.predictor_options = predictor_options
+        self.state = None
+        self.signature = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def input_signature(self):
+        """Return (path, mtime, size) for every input file, to detect changes cheaply."""
+        # The fallback season file is what fallback_stats reads, so a regenerated one triggers a rebuild
+        paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "fallback_data.py")]
+        paths += FALLBACK_SEASON_FILES
+        if self.results_path:
+            paths.append(self.results_path)
+        if not self.use_fallback and os.path.isdir(self.stats_folder):
+            paths += sorted(os.path.join(self.stats_folder, f)
+                            for f in os.listdir(self.stats_folder) if f.endswith(".png"))
+
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def build_state(self):
+        """Build the predictor and everything the queries need from it."""
+        predictor = SECTournamentPredictor(stats_folder=self.stats_folder, use_fallback=self.use_fallback,
+                                           **self.predictor_options)
+        if self.results_path:
+            predictor.fit_ratings_from_results(self.results_path)
+        else:
+            predictor.extract_data_from_images()
+            predictor.initialize_elo_ratings()
+
+        matrix = predictor.probability_matrix()
+        dist = advancement_probabilities(SEC_BRACKET, matrix)
+        outcomes = predictor.outcome_index(iterations=self.iterations)
+        champions = {team: outcomes.champion(team).count() for team in SEC_TEAMS}
+
+        return {
+            "ratings": np.array([predictor.elo_ratings[team] for team in SEC_TEAMS]),
+            "matrix": matrix,
+            "rounds": round_probabilities(SEC_BRACKET, dist),
+            "matchups": matchup_probabilities(SEC_BRACKET, dist),
+            "simulated": champions,
+            "outcomes": outcomes,
+            "built_at": time.time(),
+        }
+
+    def refresh(self):
+        """Rebuild the state from the current inputs and swap it in."""
+        with self._refresh_lock:
+            signature = self.input_signature()
+            state = self.build_state()
+            self.state, self.signature = state, signature
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            if self.input_signature() != self.signature:
+                print("Inputs changed, recomputing predictions...")
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error recomputing predictions: {e}")
+
+    def start(self):
+        """Build the initial state and start watching the inputs in the background."""
+        self.refresh()
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _team(self, name):
+        if name not in SEC_BRACKET.team_index:
+            raise ValueError(f"Unknown team: {name}")
+        return SEC_BRACKET.team_index[name]
+
+    def status(self):
+        state = self.state
+        return {
+            "stats_folder": self.stats_folder,
+            "use_fallback": self.use_fallback,
+            "results_path": self.results_path,
+            "iterations": self.iterations,
+            "built_at": state["built_at"],
+        }
+
+    def championship_odds(self):
+        state = self.state
+        total = sum(state["simulated"].values())
+        exact = state["rounds"][-1]
+        odds = [{"team": team, "probability": float(exact[i]),
+                 "simulated": state["simulated"][team] / total}
+                for i, team in enumerate(SEC_TEAMS)]
+        return sorted(odds, key=lambda x: x["probability"], reverse=True)
+
+    def round_odds(self, rounds=None):
+        rounds = self.state["rounds"] if rounds is None else rounds
+        return {name: dict(zip(SEC_TEAMS, row.tolist()))
+                for name, row in zip(SEC_BRACKET.round_names, rounds)}
+
+    def head_to_head(self, team_a, team_b):
+        probability = float(self.state["matrix"][self._team(team_a), self._team(team_b)])
+        return {"team_a": team_a, "team_b": team_b, "probability_a": probability}
+
+    def matchups(self, round_name=None):
+        """Exact probability of every pairing that can occur, per round, most likely first."""
+        meetings = self.state["matchups"]
+        if round_name is not None and round_name not in SEC_BRACKET.round_names:
+            raise ValueError(f"Unknown round: {round_name}")
+        odds = {}
+        for name, table in zip(SEC_BRACKET.round_names, meetings):
+            if round_name is not None and name != round_name:
+                continue
+            first, second = np.nonzero(np.triu(table, k=1))
+            pairs = [{"team_a": SEC_TEAMS[i], "team_b": SEC_TEAMS[j], "probability": float(table[i, j])}
+                     for i, j in zip(first, second)]
+            odds[name] = sorted(pairs, key=lambda x: x["probability"], reverse=True)
+        return odds
+
+    def what_if(self, winners=None, ratings=None):
+        """
+        Exact odds with some games' winners and/or some teams' ratings
+        overridden. A locked winner also wins its earlier games, and the
+        answer lists every game that ends up locked.
+        """
+        state = self.state
+        matrix = state["matrix"]
+        if ratings:
+            adjusted = state["ratings"].copy()
+            for team, rating in ratings.items():
+                adjusted[self._team(team)] = float(rating)
+            matrix = win_probability_matrix(adjusted)
+
+        locked = {}
+        for game, team in (winners or {}).items():
+            game = int(game)
+            if not 0 <= game < SEC_BRACKET.n_games:
+                raise ValueError(f"Unknown game: {game}")
+            self._team(team)
+            locked[game] = team
+        locked = lock_paths(SEC_BRACKET, locked)
+
+        rounds = round_probabilities(SEC_BRACKET, advancement_probabilities(SEC_BRACKET, matrix, locked))
+        return {"winners": locked, "ratings": ratings or {}, "rounds": self.round_odds(rounds)}
+
+    def conditional(self, event=None, given=None, round_name=None):
+        """
+        Probability of an event, or of every team winning a round, given other
+        events, from the stored simulations (see OutcomeIndex.event_from_spec).
+        """
+        outcomes = self.state["outcomes"]
+        condition = outcomes.event_from_spec(given) if given else None
+        if event:
+            return outcomes.probability(outcomes.event_from_spec(event), condition)
+        if round_name not in SEC_BRACKET.round_names:
+            raise ValueError(f"Unknown round: {round_name}")
+        return outcomes.marginals(round_name, condition)
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the PredictionService attached to the server."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        service = self.server.service
+        routes = {
+            "/status": service.status,
+            "/bracket": SEC_BRACKET.to_dict,
+            "/odds": service.championship_odds,
+            "/rounds": service.round_odds,
+            "/head-to-head": lambda: service.head_to_head(query["a"][0], query["b"][0]),
+            "/matchups": lambda: service.matchups(query.get("round", [None])[0]),
+            "/what-if": lambda: service.what_if(
+                dict(item.split(":", 1) for item in query.get("winner", [])),
+                {team: float(rating) for team, rating in
+                 (item.rsplit(":", 1) for item in query.get("rating", []))}),
+        }
+        self._answer(routes.get(url.path))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        service = self.server.service
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            return self._send_json(400, {"error": f"Bad request: invalid JSON ({e})"})
+        if not isinstance(body, dict):
+            return self._send_json(400, {"error": "Bad request: the body must be a JSON object"})
+        routes = {
+            "/what-if": lambda: service.what_if(body.get("winners"), body.get("ratings")),
+            "/refresh": lambda: (service.refresh(), service.status())[1],
+            "/conditional": lambda: service.conditional(body.get("event"), body.get("given"),
+                                                        body.get("round", SEC_BRACKET.round_names[-1])),
+        }
+        self._answer(routes.get(url.path))
+
+    def _answer(self, handler):
+        if handler is None:
+            return self._send_json(404, {"error": "Not found"})
+        try:
+            self._send_json(200, handler())
+        except (KeyError, ValueError, TypeError) as e:
+            # TypeError covers JSON bodies of the wrong shape, e.g. a string where a dict belongs
+            self._send_json(400, {"error": f"Bad request: {e}"})
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Start the service and answer requests until interrupted."""
+    service.start()
+    server = ThreadingHTTPServer((host, port), PredictionRequestHandler)
+    server.service = service
+    print(f"Serving predictions on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+def main():
+    """Run the prediction service."""
+    parser = argparse.ArgumentParser(description='SEC Basketball Tournament prediction service')
+    parser.add_argument('--stats', default='stats', help='Path to the folder containing stat images')
+    parser.add_argument('--fallback', action='store_true', help='Use fallback data instead of OCR extraction')
+    parser.add_argument('--results', default=None, help='CSV of game results to fit ratings on')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS, help='Simulations per recompute')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--poll', type=float, default=5.0, help='Seconds between input change checks')
+    args = parser.parse_args()
+
+    service = PredictionService(args.stats, args.fallback, args.results, args.iterations, args.poll)
+    serve(service, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the SEC Basketball Championship Predictor.
+
+Keeps the predictions up to date while screenshots and data files change
+during the tournament. The inputs are polled every few seconds with one
+os.stat per file, which costs next to nothing while nothing changes. A file
+whose modification time or size moved is hashed, and only if its contents
+differ is it processed again:
+
+- a changed stat image is re-read on its own, and only the stats that differ
+  are applied to the incremental predictions (see incremental.py);
+- a changed results file refits the ratings, a changed season file reloads
+  the stats, and a changed bracket file rebuilds the odds on the new bracket,
+  without reading any image again.
+
+After each change the odds are written to a JSON file and the chart is
+redrawn, both through a temporary file and a rename, so readers never see a
+half-written output.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import argparse
+
+from sec_tournament_predictor import (SECTournamentPredictor, SEC_TEAMS, SEC_BRACKET, COMPOSITE_WEIGHTS,
+                                      stat_type_for)
+from tournament_engine import Bracket, advancement_probabilities, round_probabilities
+from incremental import IncrementalPredictions
+from win_models import EloModel
+from ocr_engine import get_ocr_engine, OCR_ENGINES
+
+DEFAULT_OUTPUT = "sec_predictions.json"
+DEFAULT_CHART = "sec_championship_prediction.png"
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def file_hash(path):
+    """Return the sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path, payload):
+    """Write JSON to path through a temporary file in the same folder."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PredictionWatcher:
+    """Rebuilds only what changed inputs affect and rewrites the outputs."""
+
+    def __init__(self, stats_folder="stats", results_path=None, season_path=None, bracket_path=None,
+                 output_path=DEFAULT_OUTPUT, chart_path=DEFAULT_CHART, poll_interval=DEFAULT_POLL_INTERVAL,
+                 **predictor_options):
+        self.stats_folder = stats_folder
+        self.results_path = results_path
+        self.season_path = season_path
+        self.bracket_path = bracket_path
+        self.output_path = output_path
+        self.chart_path = chart_path
+        self.poll_interval = poll_interval
+        # Passed through to SECTournamentPredictor (preprocess_ocr, ocr_engine)
+        self.predictor_options = predictor_options
+        # path -> (mtime_ns, size) and path -> sha256 of the inputs last processed
+        self.signatures = {}
+        self.hashes = {}
+        self.predictor = None
+        self.bracket = SEC_BRACKET
+        self.incremental = None
+        self.last_change = None
+        self._stop = threading.Event()
+
+    def input_paths(self):
+        """Every file the predictions depend on."""
+        paths = []
+        if self.bracket_path:
+            paths.append(self.bracket_path)
+        if self.results_path:
+            paths.append(self.results_path)
+        elif self.season_path:
+            paths += self.season_files()
+        elif os.path.isdir(self.stats_folder):
+            paths += sorted(os.path.join(self.stats_folder, f)
+                            for f in os.listdir(self.stats_folder) if f.endswith(".png"))
+        return paths
+
+    def changed_inputs(self):
+        """
+        Return the inputs whose contents changed since they were last processed.
+        Files whose mtime and size are unchanged are not read at all.
+        """
+        changed = []
+        for path in self.input_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self.signatures.get(path) == signature:
+                continue
+            self.signatures[path] = signature
+            digest = file_hash(path)
+            if self.hashes.get(path) != digest:
+                self.hashes[path] = digest
+                changed.append(path)
+        return changed
+
+    def build(self):
+        """Build everything from the current inputs."""
+        self.changed_inputs()
+        self.predictor = SECTournamentPredictor(stats_folder=self.stats_folder, **self.predictor_options)
+        if self.bracket_path:
+            self.bracket = Bracket.load(self.bracket_path, SEC_TEAMS)
+        if self.results_path:
+            self.predictor.fit_ratings_from_results(self.results_path)
+        else:
+            if self.season_path:
+                self.predictor.load_season(self.season_path)
+            else:
+                self.predictor.extract_data_from_images()
+            self.incremental = IncrementalPredictions(self.bracket, self.predictor.stats, COMPOSITE_WEIGHTS)
+        self.last_change = {"inputs": [], "full": True, "at": time.time()}
+
+    def season_files(self):
+        if not self.season_path:
+            return []
+        return [os.path.join(self.season_path, name) for name in ("schema.json", "values.npy", "valid.npy")]
+
+    def apply(self, changed):
+        """Bring the predictions up to date with the changed input files."""
+        start = time.perf_counter()
+        full = False
+        if self.bracket_path in changed:
+            self.bracket = Bracket.load(self.bracket_path, SEC_TEAMS)
+            full = True
+        if self.results_path in changed:
+            self.predictor.fit_ratings_from_results(self.results_path)
+        if any(path in changed for path in self.season_files()):
+            self.predictor.load_season(self.season_path)
+            full = True
+
+        changes = {}
+        for path in changed:
+            if path.endswith(".png") and stat_type_for(os.path.basename(path)):
+                print(f"Re-reading {os.path.basename(path)}...")
+                for team, stats in self.predictor.stat_changes_from_image(path).items():
+                    for field, value in stats.items():
+                        self.predictor.stats.set(team, field, value)
+                        changes.setdefault(team, {})[field] = value
+
+        teams = []
+        if full and not self.results_path:
+            self.incremental = IncrementalPredictions(self.bracket, self.predictor.stats, COMPOSITE_WEIGHTS)
+        elif changes and self.incremental is not None:
+            teams = self.incremental.update(changes)["teams"]
+
+        self.last_change = {
+            "inputs": [os.path.basename(path) for path in changed],
+            "full": full,
+            "teams": teams,
+            "seconds": time.perf_counter() - start,
+            "at": time.time(),
+        }
+        return self.last_change
+
+    def round_probabilities(self):
+        """(rounds x teams) exact probability of each team winning its game in each round."""
+        if self.incremental is not None:
+            return self.incremental.round_probabilities()
+        matrix = EloModel(self.predictor.elo_ratings).probability_matrix(self.bracket.teams)
+        return round_probabilities(self.bracket, advancement_probabilities(self.bracket, matrix))
+
+    def ratings(self):
+        if self.incremental is not None:
+            return dict(zip(self.bracket.teams, self.incremental.ratings.tolist()))
+        return dict(self.predictor.elo_ratings)
+
+    def write_outputs(self):
+        """Atomically rewrite the JSON odds and the championship chart."""
+        rounds = self.round_probabilities()
+        champion = dict(zip(self.bracket.teams, rounds[-1].tolist()))
+        write_json_atomic(self.output_path, {
+            "built_at": time.time(),
+            "last_change": self.last_change,
+            "ratings": self.ratings(),
+            "championship": dict(sorted(champion.items(), key=lambda x: x[1], reverse=True)),
+            "rounds": {name: dict(zip(self.bracket.teams, row.tolist()))
+                       for name, row in zip(self.bracket.round_names, rounds)},
+        })
+        if self.chart_path:
+            self.predictor._plot_results(sorted(champion.items(), key=lambda x: x[1], reverse=True),
+                                         self.chart_path)
+
+    def run(self):
+        """Build, write the outputs and keep them current until stopped or interrupted."""
+        self.build()
+        self.write_outputs()
+        print(f"Watching {len(self.input_paths())} input files; odds in '{self.output_path}'")
+        try:
+            while not self._stop.wait(self.poll_interval):
+                changed = self.changed_inputs()
+                if not changed:
+                    continue
+                try:
+                    summary = self.apply(changed)
+                    self.write_outputs()
+                    print(f"Updated predictions for {', '.join(summary['inputs'])} "
+                          f"in {summary['seconds'] * 1000:.0f}ms")
+                except Exception as e:
+                    print(f"Error updating predictions: {e}")
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep SEC Tournament predictions current as inputs change")
+    parser.add_argument("--stats", default="stats", help="Folder of stat images to watch")
+    parser.add_argument("--results", default=None, help="CSV of game results to fit ratings on")
+    parser.add_argument("--season-data", default=None, help="Season file to read the stats from instead of OCR")
+    parser.add_argument("--bracket", default=None, help="Bracket JSON file (default: the 2025 SEC bracket)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file the odds are written to")
+    parser.add_argument("--chart", default=DEFAULT_CHART, help="Chart image to redraw after each change")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between checks of the inputs")
+    parser.add_argument("--preprocess-ocr", action="store_true",
+                        help="Crop, rescale and binarize the screenshots before OCR")
+    parser.add_argument("--ocr-engine", default="pytesseract", choices=sorted(OCR_ENGINES), help="OCR engine")
+    args = parser.parse_args()
+
+    PredictionWatcher(args.stats, args.results, args.season_data, args.bracket, args.output, args.chart,
+                      args.poll_interval, preprocess_ocr=args.preprocess_ocr,
+                      ocr_engine=get_ocr_engine(args.ocr_engine)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Bradley-Terry rating fitter for the SEC Tournament Predictor.
+
+Fits team strengths directly on head-to-head game results instead of the
+hand-weighted stat formula. The model is
+
+    P(i beats j) = 1 / (1 + exp(-(theta_i - theta_j + h * home)))
+
+where home is +1 when i is at home, -1 when j is, and 0 on a neutral floor.
+It is solved with Newton iterations on the penalized log-likelihood; the
+gradient and Hessian are accumulated from the team x game incidence with
+bincount, so a full Division I season (~6,000 games) fits in milliseconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Converts a logistic strength gap to Elo points, so fitted ratings work with
+# the 400-point Elo formula in calculate_win_probability
+ELO_PER_LOGIT = 400.0 / np.log(10.0)
+BASE_ELO = 1500.0
+
+
+def load_game_results(path):
+    """Load game results saved by DanielChurch/main.py (or any CSV with the same columns)."""
+    df = pd.read_csv(path)
+    df = df.dropna(subset=['Home Score', 'Away Score'])
+    if 'Neutral' not in df.columns:
+        df['Neutral'] = False
+    return df
+
+
+def fit_bradley_terry(results, home_advantage=True, margin_weighted=False,
+                      prior=0.01, max_iter=50, tol=1e-8):
+    """
+    Fit Bradley-Terry ratings on game results.
+
+    results needs Home, Away, Home Score, Away Score and Neutral columns.
+    With margin_weighted, each game counts ln(1 + margin) times, so blowouts
+    say more than one-point games. prior is a small ridge penalty that keeps
+    unbeaten or winless teams finite and pins the ratings' mean at zero.
+
+    Returns (ratings, home_edge): a dict of team -> Elo-scale rating centered
+    on 1500, and the home-court edge in Elo points.
+    """
+    home_won = results['Home Score'].to_numpy(float) > results['Away Score'].to_numpy(float)
+    teams, codes = np.unique(np.concatenate([results['Home'].to_numpy(str),
+                                             results['Away'].to_numpy(str)]),
+                             return_inverse=True)
+    n_games = len(results)
+    n_teams = len(teams)
+    home, away = codes[:n_games], codes[n_games:]
+
+    # Every game is written from the winner's point of view
+    winner = np.where(home_won, home, away)
+    loser = np.where(home_won, away, home)
+    venue = np.where(results['Neutral'].to_numpy(bool), 0.0, np.where(home_won, 1.0, -1.0))
+    if not home_advantage:
+        venue = np.zeros(n_games)
+
+    weight = np.ones(n_games)
+    if margin_weighted:
+        margin = np.abs(results['Home Score'].to_numpy(float) - results['Away Score'].to_numpy(float))
+        weight = np.log1p(margin)
+
+    # Parameters are the team strengths followed by the home-court edge
+    n_params = n_teams + 1
+    h = n_teams
+    params = np.zeros(n_params)
+    penalty = np.full(n_params, prior)
+    if not home_advantage:
+        penalty[h] = 1.0
+
+    for _ in range(max_iter):
+        z = params[winner] - params[loser] + params[h] * venue
+        p = 1.0 / (1.0 + np.exp(-z))
+        r = weight * (1.0 - p)
+        s = weight * p * (1.0 - p)
+
+        gradient = (np.bincount(winner, r, n_params) - np.bincount(loser, r, n_params)
+                    - penalty * params)
+        gradient[h] += np.dot(r, venue)
+
+        # Hessian of the negative log-likelihood, X^T S X, built from the incidence pairs
+        hh = np.full(n_games, h)
+        rows = np.concatenate([winner, loser, winner, loser, winner, loser, hh, hh, hh])
+        cols = np.concatenate([winner, loser, loser, winner, hh, hh, winner, loser, hh])
+        vals = np.concatenate([s, s, -s, -s, s * venue, -s * venue, s * venue, -s * venue, s * venue ** 2])
+        hessian = np.bincount(rows * n_params + cols, vals, n_params * n_params).reshape(n_params, n_params)
+        hessian[np.diag_indices(n_params)] += penalty
+
+        step = np.linalg.solve(hessian, gradient)
+        params += step
+        if np.max(np.abs(step)) < tol:
+            break
+
+    strengths = params[:n_teams] - params[:n_teams].mean()
+    ratings = {team: BASE_ELO + ELO_PER_LOGIT * strength for team, strength in zip(teams, strengths)}
+    return ratings, ELO_PER_LOGIT * params[h]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+On-disk memo of simulation results.
+
+A simulation's result depends only on its inputs: the stats, the ratings and
+any rating noise or dynamics, the win model, the bracket, the number of
+iterations, the seed and the engine. canonical_key hashes all of them into
+one key (dicts by sorted key, floats by repr, arrays by dtype, shape and
+bytes), so a run whose inputs match an earlier one, from the CLI, a script or
+a test, can load its counts instead of simulating again.
+
+Each result is one .npz file in the cache directory holding its count arrays
+and a JSON metadata record. Reading a result touches its file, and after
+every write the least recently used files are deleted until the directory
+is back under its size limit.
+
+    cache = ResultCache(".result_cache")
+    key = canonical_key({"iterations": 10000, "seed": 7, ...})
+    result = cache.get(key)
+    if result is None:
+        cache.put(key, {"rounds": counts}, {"engine": "numpy"})
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+DEFAULT_RESULT_CACHE = ".result_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Bump when the simulators change in a way that changes results for the same inputs
+RESULT_CACHE_VERSION = 1
+
+
+def _feed(digest, value):
+    """Add a value to the digest in a form that does not depend on dict order or container type."""
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value):
+            _feed(digest, str(key))
+            _feed(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _feed(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f"array|{array.dtype.str}|{array.shape}|".encode())
+        digest.update(array.tobytes())
+    elif isinstance(value, (bool, np.bool_)) or value is None:
+        digest.update(f"{value!r}|".encode())
+    elif isinstance(value, (int, np.integer)):
+        digest.update(f"int|{int(value)}|".encode())
+    elif isinstance(value, (float, np.floating)):
+        digest.update(f"float|{float(value)!r}|".encode())
+    elif isinstance(value, str):
+        digest.update(f"str|{len(value)}|{value}".encode())
+    else:
+        raise TypeError(f"Cannot hash {type(value).__name__} into a result key")
+
+
+def canonical_key(inputs):
+    """Return the sha256 hex key of a nested structure of dicts, lists, arrays and scalars."""
+    digest = hashlib.sha256()
+    _feed(digest, {"version": RESULT_CACHE_VERSION, "inputs": inputs})
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded, least-recently-used store of simulation results keyed by canonical_key."""
+
+    def __init__(self, cache_dir=DEFAULT_RESULT_CACHE, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key):
+        """Return {"arrays": {...}, "metadata": {...}} for a key, or None if it is not stored."""
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files if name != "metadata"}
+                metadata = json.loads(str(data["metadata"]))
+        except (OSError, ValueError, KeyError):
+            # Missing, or left unreadable by an interrupted process: treat as not stored
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return {"arrays": arrays, "metadata": metadata}
+
+    def put(self, key, arrays, metadata):
+        """Store a result's arrays and metadata, then evict down to the size limit."""
+        path = self.path(key)
+        metadata = dict(metadata, key=key, created=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        # Write under a unique name first so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, metadata=np.array(json.dumps(metadata)), **arrays)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def entries(self):
+        """(mtime, size, path) of every stored result, least recently used first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Delete least recently used results until the cache fits in max_bytes; never deletes keep."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
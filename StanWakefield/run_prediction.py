@@ -38,8 +38,8 @@ def check_tesseract():
         print("The predictor will use fallback data instead of image processing.")
         return False
 
-def run_predictor(use_fallback=False):
-    """Run the SEC Tournament Predictor."""
+def run_predictor(use_fallback=False, extra_args=()):
+    """Run the SEC Tournament Predictor, passing along any extra command-line options (e.g. --watch)."""
     script_path = os.path.join(os.path.dirname(__file__), "sec_tournament_predictor.py")
     
     if not os.path.exists(script_path):
@@ -49,6 +49,7 @@ def run_predictor(use_fallback=False):
     cmd = [sys.executable, script_path]
     if use_fallback:
         cmd.append("--fallback")
+    cmd += list(extra_args)
     
     print("Running SEC Tournament Predictor...")
     result = subprocess.run(cmd, check=False)
@@ -81,7 +82,7 @@ def main():
         return False
     
     tesseract_available = check_tesseract()
-    success = run_predictor(use_fallback=not tesseract_available)
+    success = run_predictor(use_fallback=not tesseract_available, extra_args=sys.argv[1:])
     
     if success:
         open_results()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Variance-reduced Monte Carlo estimates of championship probabilities.
+
+Plain sampling needs a very large number of tournaments before a long shot's
+odds settle, because its standard error is sqrt(p(1-p)/n). The methods here
+estimate the same probabilities with less variance per simulated tournament:
+
+    plain       independent tournaments
+    antithetic  tournaments in pairs played with uniforms u and 1 - u
+    stratified  one stratum per combination of winners of up to four opening
+                games, each with its exact probability and a proportional share
+                of the runs
+    control     regression on each team's round-win indicators, whose exact
+                means come from the bracket's advancement probabilities
+    importance  games tempered toward 50/50 so underdogs win more often, with
+                each tournament reweighted by its likelihood ratio
+
+Every estimate carries a standard error and an effective sample size: the
+number of plain tournaments that would give the same standard error.
+"""
+
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from tournament_engine import (NOT_FED, game_sides, play_bracket,
+                               advancement_probabilities, round_probabilities)
+
+SAMPLING_METHODS = ["plain", "antithetic", "stratified", "control", "importance"]
+# Opening games the stratified estimator splits on; strata double with each one
+MAX_STRATIFIED_GAMES = 4
+
+
+class ChampionshipEstimate:
+    """Estimated championship probability and standard error for every team."""
+
+    def __init__(self, method, probability, standard_error, iterations, seconds=0.0, weight_ess=None):
+        self.method = method
+        self.probability = np.asarray(probability, dtype=float)
+        self.standard_error = np.asarray(standard_error, dtype=float)
+        self.iterations = iterations
+        self.seconds = seconds
+        # Kish effective sample size of the importance weights, if any
+        self.weight_ess = weight_ess
+
+    @property
+    def effective_samples(self):
+        """Plain tournaments needed to match each team's standard error."""
+        variance = self.probability * (1 - self.probability)
+        return np.divide(variance, self.standard_error ** 2, out=np.full(len(variance), np.nan),
+                         where=self.standard_error > 0)
+
+    @property
+    def efficiency(self):
+        """Effective samples per tournament actually simulated."""
+        return self.effective_samples / self.iterations
+
+    def iterations_for(self, relative_error):
+        """Tournaments needed for each team's standard error to fall to relative_error of its probability."""
+        target = relative_error * self.probability
+        return np.ceil(np.divide(self.iterations * self.standard_error ** 2, target ** 2,
+                                 out=np.full(len(target), np.nan), where=target > 0))
+
+
+def _champions(bracket, winners):
+    """(simulations x teams) indicator of the tournament champion."""
+    return np.eye(bracket.n_teams)[winners[:, bracket.final]]
+
+
+def _mean_and_se(values):
+    n = len(values)
+    return values.mean(axis=0), values.std(axis=0, ddof=1) / np.sqrt(n)
+
+
+def plain_estimate(bracket, matrix, iterations, rng):
+    """Independent tournaments."""
+    champions = _champions(bracket, play_bracket(bracket, matrix, rng.random((iterations, bracket.n_games))))
+    return (*_mean_and_se(champions), iterations)
+
+
+def antithetic_estimate(bracket, matrix, iterations, rng):
+    """Tournaments in pairs driven by uniforms u and 1 - u."""
+    if iterations < 4:
+        raise ValueError(f"Antithetic sampling needs at least 4 tournaments (2 pairs), not {iterations}")
+    pairs = iterations // 2
+    uniforms = rng.random((pairs, bracket.n_games))
+    first = _champions(bracket, play_bracket(bracket, matrix, uniforms))
+    second = _champions(bracket, play_bracket(bracket, matrix, 1.0 - uniforms))
+    return (*_mean_and_se((first + second) / 2), 2 * pairs)
+
+
+def entry_games(bracket):
+    """Games played between two teams entering the bracket, i.e. the opening games."""
+    return [g for g in range(bracket.n_games) if (bracket.side_team[g] != NOT_FED).all()]
+
+
+def stratified_games(bracket, matrix, limit=MAX_STRATIFIED_GAMES):
+    """The limit opening games closest to a coin flip, whose outcomes vary the most."""
+    games = entry_games(bracket)
+    spread = [matrix[a, b] * (1 - matrix[a, b]) for a, b in (bracket.side_team[g] for g in games)]
+    chosen = np.argsort(spread, kind="stable")[::-1][:limit]
+    return sorted(games[i] for i in chosen)
+
+
+def stratified_estimate(bracket, matrix, iterations, rng):
+    """
+    One stratum per combination of winners of the stratified_games, sized by
+    its exact probability; the other games are played as usual. Every stratum
+    gets at least 2 tournaments so its standard error exists, so the number
+    run can exceed iterations; it is returned.
+    """
+    games = stratified_games(bracket, matrix)
+    estimate = np.zeros(bracket.n_teams)
+    variance = np.zeros(bracket.n_teams)
+    simulated = 0
+    for outcome in itertools.product((0, 1), repeat=len(games)):
+        # Winner of each opening game in this stratum and the stratum's probability
+        fixed, weight = {}, 1.0
+        for g, side in zip(games, outcome):
+            a, b = bracket.side_team[g]
+            fixed[g] = (a, b)[side]
+            weight *= matrix[a, b] if side == 0 else matrix[b, a]
+        if weight == 0.0:
+            continue
+
+        n = max(int(round(iterations * weight)), 2)
+        champions = _champions(bracket, play_bracket(bracket, matrix, rng.random((n, bracket.n_games)), fixed))
+        mean, se = _mean_and_se(champions)
+        estimate += weight * mean
+        variance += (weight * se) ** 2
+        simulated += n
+    return estimate, np.sqrt(variance), simulated
+
+
+def control_estimate(bracket, matrix, iterations, rng):
+    """Champion indicators regressed on each team's earlier round wins, which have exact means."""
+    winners = play_bracket(bracket, matrix, rng.random((iterations, bracket.n_games)))
+    champions = _champions(bracket, winners)
+
+    # Games in each round before the final; one team's wins in them are built at a
+    # time, so memory stays at simulations x rounds rather than x teams as well
+    n_rounds = len(bracket.round_names)
+    early_games = [g for g in range(bracket.n_games) if bracket.game_round[g] < n_rounds - 1]
+    exact = round_probabilities(bracket, advancement_probabilities(bracket, matrix))
+
+    estimate, se = _mean_and_se(champions)
+    for t in range(bracket.n_teams):
+        round_wins = np.zeros((iterations, n_rounds - 1))
+        for g in early_games:
+            round_wins[:, bracket.game_round[g]] += winners[:, g] == t
+        controls = round_wins - exact[:-1, t]
+        controls = controls[:, controls.std(axis=0) > 0]
+        if controls.shape[1] == 0:
+            continue
+        y = champions[:, t] - champions[:, t].mean()
+        beta = np.linalg.lstsq(controls - controls.mean(axis=0), y, rcond=None)[0]
+        adjusted = champions[:, t] - controls @ beta
+        estimate[t] = adjusted.mean()
+        se[t] = adjusted.std(ddof=1 + controls.shape[1]) / np.sqrt(iterations)
+    return estimate, se, iterations
+
+
+def tilted_matrix(matrix, tilt):
+    """Temper every game's log-odds by (1 - tilt), moving favourites and underdogs toward 50/50."""
+    with np.errstate(divide="ignore"):
+        log_odds = np.log(matrix) - np.log1p(-matrix)
+    return 1.0 / (1.0 + np.exp(-(1.0 - tilt) * log_odds))
+
+
+def importance_estimate(bracket, matrix, iterations, rng, tilt=0.5):
+    """Tournaments played on a tilted matrix, reweighted by their likelihood ratio."""
+    proposal = tilted_matrix(matrix, tilt)
+    winners = play_bracket(bracket, proposal, rng.random((iterations, bracket.n_games)))
+
+    log_weight = np.zeros(iterations)
+    for g in range(bracket.n_games):
+        a, b = game_sides(bracket, winners, g)
+        a_won = winners[:, g] == a
+        p, q = matrix[a, b], proposal[a, b]
+        log_weight += np.where(a_won, np.log(p) - np.log(q), np.log1p(-p) - np.log1p(-q))
+    weights = np.exp(log_weight)
+
+    mean, se = _mean_and_se(_champions(bracket, winners) * weights[:, None])
+    return mean, se, iterations, weights.sum() ** 2 / (weights ** 2).sum()
+
+
+def estimate_championship(bracket, matrix, iterations, method="plain", rng=None, tilt=0.5):
+    """
+    Estimate every team's championship probability with the named sampling
+    method. The estimate's iterations are the tournaments actually simulated,
+    which antithetic pairing and stratum minimums can move off the request.
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{method}'; choose from {', '.join(SAMPLING_METHODS)}")
+    if iterations < 2:
+        raise ValueError(f"A standard error needs at least 2 tournaments, not {iterations}")
+    rng = rng if rng is not None else np.random.default_rng()
+
+    start = time.time()
+    weight_ess = None
+    if method == "importance":
+        probability, se, simulated, weight_ess = importance_estimate(bracket, matrix, iterations, rng, tilt)
+    else:
+        estimator = {"plain": plain_estimate, "antithetic": antithetic_estimate,
+                     "stratified": stratified_estimate, "control": control_estimate}[method]
+        probability, se, simulated = estimator(bracket, matrix, iterations, rng)
+    return ChampionshipEstimate(method, probability, se, simulated, time.time() - start, weight_ess)
+
+
+def sampling_report(estimates, teams, relative_error=0.05):
+    """
+    Compare estimates team by team: standard error, effective samples, efficiency
+    and the tournaments (and seconds) each method needs for a standard error of
+    relative_error times the team's probability.
+    """
+    rows = []
+    for estimate in estimates:
+        needed = estimate.iterations_for(relative_error)
+        for t, team in enumerate(teams):
+            rows.append({
+                "method": estimate.method,
+                "team": team,
+                "probability": estimate.probability[t],
+                "standard_error": estimate.standard_error[t],
+                "effective_samples": estimate.effective_samples[t],
+                "efficiency": estimate.efficiency[t],
+                "iterations_needed": needed[t],
+                "seconds_needed": needed[t] * estimate.seconds / estimate.iterations,
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Score-level game model for the SEC Tournament Predictor.
+
+Instead of a single Elo coin flip, each game samples both teams' points.
+A team's expected points against an opponent are its scoring offense plus
+the opponent's scoring defense, less the league average, so a good offense
+scores more and a good defense allows less. Points are drawn from a normal
+(rounded) or Poisson distribution; tied games go to five-minute overtimes,
+each scoring an eighth of a regulation game's expected points, until one
+side leads. A game still tied after MAX_OVERTIMES periods is settled by a
+one-point coin flip, so low-scoring matchups cannot loop forever.
+
+Games are played for a chunk of simulations at once, round by round, so the
+cost is a few array operations per bracket game like the coin-flip engine.
+Each chunk's scores are folded into histograms of margin of victory and
+total points per round and per matchup and then dropped, so memory stays
+the same however many tournaments are played.
+"""
+
+import numpy as np
+import pandas as pd
+from tournament_engine import game_sides
+
+SCORE_DISTRIBUTIONS = ["normal", "poisson"]
+
+# Standard deviation of one team's points in a college game
+DEFAULT_SCORE_SD = 11.0
+OVERTIME_FRACTION = 5.0 / 40.0
+MAX_OVERTIMES = 10
+# Histogram ranges; larger margins and totals are counted in the last bin
+MAX_MARGIN = 100
+MAX_TOTAL = 400
+
+
+class ScoreModel:
+    """Samples points for both teams of a game from their scoring offense and defense."""
+
+    def __init__(self, teams, offense, defense, distribution="normal", sd=DEFAULT_SCORE_SD):
+        if distribution not in SCORE_DISTRIBUTIONS:
+            raise ValueError(f"Unknown score distribution '{distribution}'; "
+                             f"choose from {', '.join(SCORE_DISTRIBUTIONS)}")
+        self.teams = list(teams)
+        self.offense = np.asarray(offense, dtype=float)
+        self.defense = np.asarray(defense, dtype=float)
+        for name, values in (("scoring_offense", self.offense), ("scoring_defense", self.defense)):
+            if len(values) != len(self.teams) or not np.isfinite(values).all():
+                missing = [team for team, value in zip(self.teams, values) if not np.isfinite(value)]
+                raise ValueError(f"Score model needs {name} for every team; missing for "
+                                 f"{', '.join(missing) or 'some teams'}")
+        self.distribution = distribution
+        self.sd = sd
+        self.league_average = (self.offense.mean() + self.defense.mean()) / 2
+        if self.league_average <= 0:
+            raise ValueError("Score model needs positive scoring_offense and scoring_defense; "
+                             f"league average is {self.league_average:g} points")
+
+    @classmethod
+    def from_stats(cls, stats, distribution="normal", sd=DEFAULT_SCORE_SD):
+        """Build the model from a StatsTable's scoring_offense and scoring_defense columns."""
+        # Missing entries stay NaN so the constructor can name the teams without them
+        offense, defense = (stats.filled(np.nan)[:, stats.field_index[field]]
+                            for field in ("scoring_offense", "scoring_defense"))
+        return cls(stats.teams, offense, defense, distribution, sd)
+
+    def expected_points(self, a, b):
+        """Expected regulation points for team(s) a against team(s) b."""
+        return self.offense[a] + self.defense[b] - self.league_average
+
+    def _draw(self, mean, rng):
+        mean = np.maximum(mean, 0.0)
+        if self.distribution == "poisson":
+            return rng.poisson(mean)
+        # Overtime periods are short, so their spread shrinks with their expected points
+        sd = self.sd * np.sqrt(mean / self.league_average)
+        return np.maximum(np.rint(rng.normal(mean, sd)), 0).astype(np.int64)
+
+    def play(self, a, b, rng):
+        """
+        Play games between team index arrays a and b.
+        Returns (points_a, points_b, overtimes), with no ties left.
+        """
+        mean_a, mean_b = self.expected_points(a, b), self.expected_points(b, a)
+        points_a, points_b = self._draw(mean_a, rng), self._draw(mean_b, rng)
+        overtimes = np.zeros(len(points_a), dtype=np.int64)
+
+        tied = np.flatnonzero(points_a == points_b)
+        while len(tied) and overtimes[tied[0]] < MAX_OVERTIMES:
+            points_a[tied] += self._draw(mean_a[tied] * OVERTIME_FRACTION, rng)
+            points_b[tied] += self._draw(mean_b[tied] * OVERTIME_FRACTION, rng)
+            overtimes[tied] += 1
+            tied = tied[points_a[tied] == points_b[tied]]
+        # Still level after the last overtime: one point to a random side
+        a_wins = rng.random(len(tied)) < 0.5
+        points_a[tied[a_wins]] += 1
+        points_b[tied[~a_wins]] += 1
+        return points_a, points_b, overtimes
+
+
+class ScoreSimulation:
+    """
+    Champion counts and score histograms of a batch of simulated tournaments,
+    added one game and chunk of simulations at a time.
+    """
+
+    def __init__(self, bracket):
+        n_rounds, n_pairs = len(bracket.round_names), bracket.n_teams ** 2
+        self.bracket = bracket
+        self.iterations = 0
+        self.winner_counts = np.zeros((bracket.n_games, bracket.n_teams), dtype=np.int64)
+        # Per round: the winner's margin, the combined points and the games that went to overtime
+        self.round_margins = np.zeros((n_rounds, MAX_MARGIN + 1), dtype=np.int64)
+        self.round_totals = np.zeros((n_rounds, MAX_TOTAL + 1), dtype=np.int64)
+        self.round_overtimes = np.zeros(n_rounds, dtype=np.int64)
+        # Per pair of teams (lower team index first): the margin from the first team's side, -MAX_MARGIN..MAX_MARGIN
+        self.pair_margins = np.zeros((n_pairs, 2 * MAX_MARGIN + 1), dtype=np.int64)
+        self.pair_totals = np.zeros((n_pairs, MAX_TOTAL + 1), dtype=np.int64)
+        self.pair_overtimes = np.zeros(n_pairs, dtype=np.int64)
+
+    def add_game(self, g, a, b, points_a, points_b, overtimes):
+        """Count game g's results over a chunk of simulations (team and points arrays per side)."""
+        n_teams = self.bracket.n_teams
+        r = self.bracket.game_round[g]
+        winners = np.where(points_a > points_b, a, b)
+        self.winner_counts[g] += np.bincount(winners, minlength=n_teams)
+
+        margin = points_a.astype(np.int64) - points_b
+        total = np.minimum(points_a.astype(np.int64) + points_b, MAX_TOTAL)
+        went_to_overtime = overtimes > 0
+        self.round_margins[r] += np.bincount(np.minimum(np.abs(margin), MAX_MARGIN), minlength=MAX_MARGIN + 1)
+        self.round_totals[r] += np.bincount(total, minlength=MAX_TOTAL + 1)
+        self.round_overtimes[r] += np.count_nonzero(went_to_overtime)
+
+        # Orient every game so the lower team index is the first team, then count by pair
+        swap = a > b
+        pair = np.where(swap, b * n_teams + a, a * n_teams + b)
+        signed = np.clip(np.where(swap, -margin, margin), -MAX_MARGIN, MAX_MARGIN) + MAX_MARGIN
+        n_pairs = len(self.pair_overtimes)
+        self.pair_margins += np.bincount(pair * (2 * MAX_MARGIN + 1) + signed,
+                                         minlength=n_pairs * (2 * MAX_MARGIN + 1)).reshape(n_pairs, -1)
+        self.pair_totals += np.bincount(pair * (MAX_TOTAL + 1) + total,
+                                        minlength=n_pairs * (MAX_TOTAL + 1)).reshape(n_pairs, -1)
+        self.pair_overtimes += np.bincount(pair[went_to_overtime], minlength=n_pairs)
+
+    def champion_counts(self):
+        """Number of simulations each team won, in bracket team order."""
+        return self.winner_counts[self.bracket.final].copy()
+
+
+def simulate_scores(bracket, model, iterations, rng=None, chunk_size=1000000):
+    """
+    Play every game of the bracket at the score level for each of iterations
+    tournaments, chunk_size tournaments at a time, and return their ScoreSimulation.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    result = ScoreSimulation(bracket)
+    for start in range(0, iterations, chunk_size):
+        n = min(chunk_size, iterations - start)
+        winners = np.empty((n, bracket.n_games), dtype=np.int32)
+        for g in range(bracket.n_games):
+            a, b = game_sides(bracket, winners, g)
+            points_a, points_b, overtimes = model.play(a, b, rng)
+            winners[:, g] = np.where(points_a > points_b, a, b)
+            result.add_game(g, a, b, points_a, points_b, overtimes)
+        result.iterations += n
+    return result
+
+
+def _percentile(counts, q):
+    """The q-th percentile of a histogram whose bin i counts the value i."""
+    return int(np.searchsorted(np.cumsum(counts), q / 100 * counts.sum()))
+
+
+def _summarize(margins, totals, overtimes):
+    """Summary row from a histogram of winning margins, one of total points and the overtime games."""
+    games = margins.sum()
+    return {
+        "games": int(games),
+        "mean_margin": margins @ np.arange(len(margins)) / games,
+        "median_margin": _percentile(margins, 50),
+        "margin_p90": _percentile(margins, 90),
+        "close_games": margins[:4].sum() / games,
+        "mean_total": totals @ np.arange(len(totals)) / games,
+        "total_p10": _percentile(totals, 10),
+        "total_p90": _percentile(totals, 90),
+        "overtime_rate": overtimes / games,
+    }
+
+
+def round_summary(result):
+    """Margin-of-victory and total-points distribution of every round, one row per round."""
+    return pd.DataFrame([{"round": name, **_summarize(result.round_margins[r], result.round_totals[r],
+                                                      result.round_overtimes[r])}
+                         for r, name in enumerate(result.bracket.round_names)])
+
+
+def matchup_summary(result, min_games=1):
+    """
+    Margin and total-points distribution of every pairing that occurred, one row
+    per pair of teams. Margins are from team_a's side (team_a is first alphabetically).
+    """
+    teams = result.bracket.teams
+    signed_values = np.arange(-MAX_MARGIN, MAX_MARGIN + 1)
+    rows = []
+    for p in np.flatnonzero(result.pair_margins.sum(axis=1) >= max(min_games, 1)):
+        signed = result.pair_margins[p]
+        games = signed.sum()
+        # Fold the signed margins into the winner's margin
+        margins = signed[MAX_MARGIN:].copy()
+        margins[1:] += signed[:MAX_MARGIN][::-1]
+        a, b = divmod(int(p), len(teams))
+        row = {"team_a": teams[a], "team_b": teams[b], "team_a_win_rate": signed[MAX_MARGIN + 1:].sum() / games,
+               **_summarize(margins, result.pair_totals[p], result.pair_overtimes[p])}
+        row["mean_margin_a"] = signed @ signed_values / games
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("games", ascending=False, ignore_index=True)
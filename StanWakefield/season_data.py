@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Season data files for the SEC Tournament Predictor.
+
+A season is stored as a folder named <season>.season holding:
+
+    schema.json   schema version, season, source and notes, team and stat names
+    values.npy    (teams x fields) float64 stat values
+    valid.npy     (teams x fields) bool, which values are present
+
+The arrays are raw .npy files, so loading memory-maps them with no parsing;
+they are mapped copy-on-write, so edits to a loaded table never reach the
+file. Convert the fallback_data.py dict with:
+
+    python season_data.py convert --output data/2024-25.season --season 2024-25
+"""
+
+import os
+import json
+import shutil
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+from stats_table import StatsTable, STAT_FIELDS
+
+SCHEMA_VERSION = 1
+SEASON_SUFFIX = ".season"
+
+
+def save_season(path, stats, season, source, notes=""):
+    """Write a StatsTable as a season folder, replacing any existing one."""
+    metadata = {
+        "schema_version": SCHEMA_VERSION,
+        "season": season,
+        "source": source,
+        "notes": notes,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "teams": stats.teams,
+        "fields": stats.fields,
+    }
+
+    # Build the folder next to its destination and swap it in once complete
+    tmp_path = path.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, "values.npy"), np.ascontiguousarray(stats.values, dtype=np.float64))
+    np.save(os.path.join(tmp_path, "valid.npy"), np.ascontiguousarray(stats.valid, dtype=bool))
+    with open(os.path.join(tmp_path, "schema.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return metadata
+
+
+def load_season(path, mmap=True):
+    """
+    Load a season folder as (StatsTable, metadata). With mmap the stat arrays
+    are mapped copy-on-write instead of read into memory.
+    """
+    with open(os.path.join(path, "schema.json")) as f:
+        metadata = json.load(f)
+    if metadata.get("schema_version", 0) > SCHEMA_VERSION:
+        raise ValueError(f"Season file '{path}' uses schema version {metadata['schema_version']}; "
+                         f"this version reads up to {SCHEMA_VERSION}")
+
+    mode = "c" if mmap else None
+    values = np.load(os.path.join(path, "values.npy"), mmap_mode=mode)
+    valid = np.load(os.path.join(path, "valid.npy"), mmap_mode=mode)
+    shape = (len(metadata["teams"]), len(metadata["fields"]))
+    if values.shape != shape or valid.shape != shape:
+        raise ValueError(f"Season file '{path}' arrays do not match its {shape[0]} teams and {shape[1]} fields")
+
+    return StatsTable.from_arrays(metadata["teams"], metadata["fields"], values, valid), metadata
+
+
+def convert_team_stats(team_stats, path, season, source, notes=""):
+    """Write a dict of per-team stat dicts (like FALLBACK_TEAM_STATS) as a season folder."""
+    return save_season(path, StatsTable.from_dict(team_stats, sorted(team_stats), STAT_FIELDS),
+                       season, source, notes)
+
+
+def main():
+    """Convert fallback data to a season file or describe a season file."""
+    parser = argparse.ArgumentParser(description='SEC season data files')
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help='Convert fallback_data.py to a season file')
+    convert.add_argument('--output', required=True, help=f'Season folder to write (ends in {SEASON_SUFFIX})')
+    convert.add_argument('--season', required=True, help='Season name, e.g. 2024-25')
+    convert.add_argument('--notes', default='', help='Free-form notes stored with the data')
+    info = commands.add_parser('info', help='Show a season file\'s metadata')
+    info.add_argument('path', help='Season folder')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        from fallback_data import FALLBACK_TEAM_STATS
+        metadata = convert_team_stats(FALLBACK_TEAM_STATS, args.output, args.season,
+                                      "fallback_data.py (manually entered)", args.notes)
+        print(f"Wrote {len(metadata['teams'])} teams x {len(metadata['fields'])} stats to {args.output}")
+    else:
+        stats, metadata = load_season(args.path)
+        for key in ("schema_version", "season", "source", "notes", "created"):
+            print(f"{key:<15}: {metadata.get(key)}")
+        print(f"{'teams':<15}: {len(stats.teams)}, {stats.count()} of {stats.valid.size} stats present")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,32 @@ using statistical data from secsports.com and an Elo rating system.
 """
 
 import os
+import time
 import numpy as np
 import pandas as pd
 from PIL import Image
-import pytesseract
 import re
 import random
 from tqdm import tqdm
 import matplotlib.pyplot as plt
 import argparse
 import sys
+from rating_fit import load_game_results, fit_bradley_terry
+from stats_table import StatsTable
+from ocr_preprocess import preprocess_image, profile_for, crop_line, LINE_PROFILE
+from ocr_engine import get_ocr_engine, OCR_ENGINES, OCRLine
+from tournament_engine import (Bracket, advancement_probabilities, round_probabilities,
+                               play_bracket_ratings, play_bracket_dynamic, simulate_bracket, matchup_probabilities,
+                               simulated_matchup_counts)
+from sampling import SAMPLING_METHODS, estimate_championship, sampling_report
+from win_models import EloModel, build_win_model, parse_win_model_specs, BATTLE_MODEL, BATTLE_PROMPT_VERSION
+from rating_uncertainty import normalize_ratings, sample_ratings, perturbed_stat_ratings, STAT_NOISE
+from numba_engine import ENGINES, HAVE_NUMBA, simulate_round_counts
+from result_cache import ResultCache, canonical_key, DEFAULT_RESULT_CACHE
+from incremental import IncrementalPredictions
+from outcome_index import OutcomeIndex
+from score_model import ScoreModel, SCORE_DISTRIBUTIONS, simulate_scores, round_summary, matchup_summary
+from season_data import load_season
 
 # Import fallback data
 try:
@@ -24,6 +40,10 @@ try:
 except ImportError:
     FALLBACK_TEAM_STATS = {}
 
+# Fallback data converted to a season file (see season_data.py); preferred when present
+FALLBACK_SEASON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "2024-25.season")
+FALLBACK_SEASON_FILES = [os.path.join(FALLBACK_SEASON, name) for name in ("schema.json", "values.npy", "valid.npy")]
+
 # Constants
 ITERATIONS = 10000
 SEC_TEAMS = [
@@ -47,49 +67,171 @@ SECOND_ROUND_TEAMS = ["Ole Miss", "Texas A&M", "Missouri", "Kentucky"]
 # Teams waiting in the quarterfinals (March 14th)
 QUARTERFINAL_TEAMS = ["Auburn", "Tennessee", "Florida", "Alabama"]
 
+# The full bracket, games in playing order
+SEC_BRACKET = Bracket.from_sec_format(FIRST_ROUND_MATCHUPS, SECOND_ROUND_TEAMS,
+                                      QUARTERFINAL_TEAMS, SEC_TEAMS)
+
+# Stats read from each screenshot type, in column order
+STAT_IMAGE_FIELDS = {
+    "offense-defense": ("scoring_offense", "scoring_defense"),
+    "field-goal-percentage": ("field_goal_pct",),
+    "3-point-field-goals": ("three_pt_made", "three_pt_pct"),
+    "free-throw-percentage": ("free_throw_pct",),
+    "combined-team-rebounds": ("rebounds",),
+    "turnovers": ("turnovers",),
+    "blocked-shots-and-assists": ("blocks", "assists")
+}
+
+# Rows whose least certain word is below this tesseract confidence are read again
+OCR_MIN_CONFIDENCE = 80.0
+# Fewer stats than this per team means the screenshots could not be read
+MIN_STATS_PER_TEAM = 5
+
+# Composite score weights used by initialize_elo_ratings, in STAT_FIELDS order
+COMPOSITE_WEIGHTS = np.array([
+    3.0,    # scoring_offense
+    -2.0,   # scoring_defense (lower is better)
+    100.0,  # field_goal_pct
+    0.0,    # three_pt_made
+    50.0,   # three_pt_pct
+    30.0,   # free_throw_pct
+    1.5,    # rebounds
+    -2.0,   # turnovers
+    1.0,    # blocks
+    1.0     # assists
+])
+
+def stat_type_for(filename):
+    """Return the stat type key for a screenshot filename, or None if it is not recognized."""
+    return next((key for key in STAT_IMAGE_FIELDS if key in filename), None)
+
+def fallback_disagreements(season_stats):
+    """Return the (team, field) cells where fallback_data.py and the fallback season file differ."""
+    data = StatsTable.from_dict(FALLBACK_TEAM_STATS, season_stats.teams, season_stats.fields)
+    differs = (data.valid != season_stats.valid) | ~np.isclose(data.filled(), season_stats.filled())
+    return [(season_stats.teams[i], season_stats.fields[j]) for i, j in zip(*np.nonzero(differs))]
+
+# Season file signatures already checked against fallback_data.py, so the warning prints once per version
+_checked_fallback_seasons = set()
+
+def fallback_stats(teams=SEC_TEAMS):
+    """
+    Return a new StatsTable of the fallback stats, or None if there are none.
+    The season file wins over fallback_data.py; when both exist and disagree
+    a warning names the cells, since an edit to fallback_data.py has no
+    effect until the season file is regenerated.
+    """
+    if os.path.isdir(FALLBACK_SEASON):
+        stats, _ = load_season(FALLBACK_SEASON)
+        signature = tuple(os.stat(path).st_mtime_ns for path in FALLBACK_SEASON_FILES)
+        if FALLBACK_TEAM_STATS and signature not in _checked_fallback_seasons:
+            _checked_fallback_seasons.add(signature)
+            differences = fallback_disagreements(stats)
+            if differences:
+                cells = ", ".join(f"{team} {field}" for team, field in differences[:5])
+                more = f" and {len(differences) - 5} more" if len(differences) > 5 else ""
+                print(f"Warning: fallback_data.py differs from {FALLBACK_SEASON} ({cells}{more}); "
+                      f"using the season file. Regenerate it with "
+                      f"'python season_data.py convert --output data/2024-25.season --season 2024-25'.")
+        return stats.reindex(teams)
+    if FALLBACK_TEAM_STATS:
+        return StatsTable.from_dict(FALLBACK_TEAM_STATS, teams)
+    return None
+
 class SECTournamentPredictor:
-    def __init__(self, stats_folder="stats", use_fallback=False):
+    @property
+    def team_stats(self):
+        """Dict-of-dicts view of the stats table, kept for backwards compatibility."""
+        return self.stats.view()
+    
+    @team_stats.setter
+    def team_stats(self, team_stats):
+        self.stats = StatsTable.from_dict(team_stats, SEC_TEAMS)
+    
+    @property
+    def elo_ratings(self):
+        return self._elo_ratings
+    
+    @elo_ratings.setter
+    def elo_ratings(self, ratings):
+        # New ratings change the default Elo model's matrix
+        self._elo_ratings = ratings
+        self._matrix = None
+    
+    @property
+    def win_model(self):
+        return self._win_model
+    
+    @win_model.setter
+    def win_model(self, model):
+        self._win_model = model
+        self._matrix = None
+    
+    def __init__(self, stats_folder="stats", use_fallback=False, preprocess_ocr=False, ocr_engine=None):
         """Initialize the predictor with the path to the stats folder."""
         self.stats_folder = stats_folder
         self.use_fallback = use_fallback
-        self.team_stats = {team: {} for team in SEC_TEAMS}
+        self.preprocess_ocr = preprocess_ocr
+        # Pass a shared engine to reuse one loaded OCR model across predictors
+        self.ocr_engine = ocr_engine or get_ocr_engine()
+        self.stats = StatsTable(SEC_TEAMS)
+        # OCR confidence (0-100) of each extracted stat; invalid where a stat was not read from an image
+        self.confidence = StatsTable(SEC_TEAMS)
         self.elo_ratings = {}
         self.championship_counts = {team: 0 for team in SEC_TEAMS}
+        self.championship_estimate = None
+        self.score_simulation = None
+        self.dynamic_round_probabilities = None
+        # Simulation results memoized across runs; see use_result_cache
+        self.result_cache = None
+        self.recompute = False
+        # None means Elo on self.elo_ratings; see set_win_model
+        self.win_model = None
         
     def extract_data_from_images(self):
         """Extract team statistics from screenshots using OCR."""
         if self.use_fallback:
             print("Using fallback data instead of OCR extraction.")
-            if not FALLBACK_TEAM_STATS:
-                print("Error: Fallback data not available. Make sure fallback_data.py exists.")
-                sys.exit(1)
-            self.team_stats = FALLBACK_TEAM_STATS.copy()
+            self._use_fallback_stats()
             return self.team_stats
             
         print("Extracting data from images...")
+        try:
+            self.read_stat_images()
+        except ValueError as e:
+            print(f"Warning: {e}.")
+            print("Using fallback data instead.")
+            self._use_fallback_stats()
+            return self.team_stats
+        
+        # Fill in any missing values with averages or fallback data
+        self._handle_missing_values()
+        
+        # Check if we got enough data
+        stats_count = self.stats.count()
+        if stats_count < len(SEC_TEAMS) * MIN_STATS_PER_TEAM:
+            print("Warning: Not enough data extracted from images.")
+            print("Using fallback data instead.")
+            self._use_fallback_stats()
+        
+        return self.team_stats
+    
+    def read_stat_images(self):
+        """
+        OCR every screenshot in the stats folder into self.stats, leaving
+        unread stats missing. Raises ValueError when there are no screenshots.
+        """
+        # Confidences describe this extraction only
+        self.confidence = StatsTable(SEC_TEAMS)
         
         # Check if stats folder exists
         if not os.path.exists(self.stats_folder):
-            print(f"Warning: Stats folder '{self.stats_folder}' not found.")
-            print("Using fallback data instead.")
-            if FALLBACK_TEAM_STATS:
-                self.team_stats = FALLBACK_TEAM_STATS.copy()
-                return self.team_stats
-            else:
-                print("Error: Fallback data not available. Make sure fallback_data.py exists.")
-                sys.exit(1)
+            raise ValueError(f"Stats folder '{self.stats_folder}' not found")
         
         # Process each image in the stats folder
         png_files = [f for f in os.listdir(self.stats_folder) if f.endswith(".png")]
         if not png_files:
-            print(f"Warning: No PNG files found in '{self.stats_folder}' folder.")
-            print("Using fallback data instead.")
-            if FALLBACK_TEAM_STATS:
-                self.team_stats = FALLBACK_TEAM_STATS.copy()
-                return self.team_stats
-            else:
-                print("Error: Fallback data not available. Make sure fallback_data.py exists.")
-                sys.exit(1)
+            raise ValueError(f"No PNG files found in '{self.stats_folder}' folder")
         
         for filename in png_files:
             image_path = os.path.join(self.stats_folder, filename)
@@ -97,20 +239,36 @@ class SECTournamentPredictor:
                 
         print("Data extraction complete.")
         
-        # Fill in any missing values with averages or fallback data
-        self._handle_missing_values()
-        
-        # Check if we got enough data
-        stats_count = sum(len(stats) for team, stats in self.team_stats.items())
-        if stats_count < len(SEC_TEAMS) * 5:  # At least 5 stats per team
-            print("Warning: Not enough data extracted from images.")
-            print("Using fallback data instead.")
-            if FALLBACK_TEAM_STATS:
-                self.team_stats = FALLBACK_TEAM_STATS.copy()
-            else:
-                print("Error: Fallback data not available. Make sure fallback_data.py exists.")
-                sys.exit(1)
-        
+        uncertain = self.low_confidence_stats()
+        if uncertain:
+            print(f"Warning: {len(uncertain)} values read with low OCR confidence:")
+            for team, field, confidence in uncertain:
+                print(f"  {team} {field}: {self.stats.get(team, field)} ({confidence:.0f})")
+        return self.stats
+    
+    def _use_fallback_stats(self):
+        """Replace the stats with a copy of the fallback data, or exit if there is none."""
+        fallback = fallback_stats()
+        if fallback is None:
+            print("Error: Fallback data not available. Make sure data/2024-25.season or fallback_data.py exists.")
+            sys.exit(1)
+        self.stats = fallback
+        self.confidence = StatsTable(SEC_TEAMS)
+    
+    def load_season(self, path):
+        """
+        Use the stats from a season file (see season_data.py) instead of OCR.
+        Missing stats are filled with that season's averages, not the current
+        fallback data, since the file may be from another season.
+        """
+        stats, metadata = load_season(path)
+        print(f"Loaded {metadata['season']} stats from '{path}' ({metadata['source']})")
+        stats = stats.reindex(SEC_TEAMS)
+        missing = stats.valid.size - stats.count()
+        if missing:
+            print(f"Filling {missing} missing stats with the season averages")
+        self.stats = stats.filled_with_means()
+        self.confidence = StatsTable(SEC_TEAMS)
         return self.team_stats
     
     def _process_image(self, image_path, filename):
@@ -118,28 +276,115 @@ class SECTournamentPredictor:
         print(f"Processing image: {filename}")
         
         try:
-            image = Image.open(image_path)
-            text = pytesseract.image_to_string(image)
-            
-            # Extract relevant statistics based on the filename
-            if "offense-defense" in filename:
-                self._parse_offense_defense_stats(text)
-            elif "field-goal-percentage" in filename:
-                self._parse_field_goal_stats(text)
-            elif "3-point-field-goals" in filename:
-                self._parse_3point_stats(text)
-            elif "free-throw-percentage" in filename:
-                self._parse_free_throw_stats(text)
-            elif "combined-team-rebounds" in filename:
-                self._parse_rebound_stats(text)
-            elif "turnovers" in filename:
-                self._parse_turnover_stats(text)
-            elif "blocked-shots-and-assists" in filename:
-                self._parse_blocks_assists_stats(text)
+            stat_type = stat_type_for(filename)
+            if stat_type:
+                for team, fields in self._extract_image(image_path, stat_type).items():
+                    for field, (value, confidence) in fields.items():
+                        self.stats.set(team, field, value)
+                        self.confidence.set(team, field, confidence)
                 
         except Exception as e:
             print(f"Error processing {filename}: {e}")
     
+    def stat_changes_from_image(self, image_path):
+        """
+        OCR one stat image and return {team: {field: value}} for the values that
+        differ from the current stats, without changing them. Feed the result to
+        IncrementalPredictions.update after a screenshot is corrected.
+        """
+        stat_type = stat_type_for(os.path.basename(image_path))
+        if not stat_type:
+            return {}
+        
+        changes = {}
+        for team, fields in self._extract_image(image_path, stat_type).items():
+            for field, (value, _) in fields.items():
+                if not self.stats.valid[self.stats.team_index[team], self.stats.field_index[field]] \
+                        or self.stats.get(team, field) != value:
+                    changes.setdefault(team, {})[field] = value
+        return changes
+    
+    def _extract_image(self, image_path, stat_type):
+        """
+        OCR a stat image row by row and return {team: {field: (value, confidence)}}.
+        Rows read with low confidence are cropped, upscaled and read again as a
+        single line; rows that match no team are too when teams are missing.
+        The whole image is only read once.
+        """
+        image = Image.open(image_path)
+        profile = None
+        if self.preprocess_ocr:
+            profile = profile_for(stat_type)
+            image = preprocess_image(image, profile)
+        lines = self.ocr_engine.image_to_data(image, profile)
+        
+        rows = {}
+        low, unmatched = [], []
+        for line in lines:
+            team, fields = self._parse_stat_line(stat_type, line)
+            if team is None:
+                # Headers have no numbers; anything else may be a garbled row
+                if any(c.isdigit() for c in line.text):
+                    unmatched.append(line)
+            elif min(confidence for _, confidence in fields.values()) < OCR_MIN_CONFIDENCE:
+                low.append(line)
+                self._keep_best_row(rows, team, fields)
+            else:
+                self._keep_best_row(rows, team, fields)
+        
+        retry = low + (unmatched if len(rows) < len(SEC_TEAMS) else [])
+        for line in retry:
+            words = [word for reread in self.ocr_engine.image_to_data(crop_line(image, line.box), LINE_PROFILE)
+                     for word in reread.words]
+            if words:
+                team, fields = self._parse_stat_line(stat_type, OCRLine(words))
+                if team is not None:
+                    self._keep_best_row(rows, team, fields)
+        if retry:
+            print(f"  Re-read {len(retry)} of {len(lines)} rows ({len(low)} low-confidence, "
+                  f"{len(retry) - len(low)} unmatched)")
+        return rows
+    
+    @staticmethod
+    def _keep_best_row(rows, team, fields):
+        """Keep a team's row from whichever read of it was more confident."""
+        confidence = min(c for _, c in fields.values())
+        if team not in rows or confidence > min(c for _, c in rows[team].values()):
+            rows[team] = fields
+    
+    def _parse_stat_line(self, stat_type, line):
+        """
+        Parse one OCRLine of a stat table into (team, {field: (value, confidence)}),
+        or (None, {}). A value's confidence is the lowest of its own word and the
+        team name's words.
+        """
+        fields = STAT_IMAGE_FIELDS[stat_type]
+        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)' + r'\s+(\d+\.\d+)' * len(fields)
+        match = re.search(pattern, line.text)
+        team = self._match_team_name(match.group(1)) if match else None
+        if team is None:
+            return None, {}
+        
+        # Character span of every word in the joined line text
+        spans, start = [], 0
+        for word in line.words:
+            spans.append((start, start + len(word.text)))
+            start += len(word.text) + 1
+        
+        def confidence_of(group):
+            begin, end = match.span(group)
+            return min(word.confidence for word, (a, b) in zip(line.words, spans) if a < end and b > begin)
+        
+        name_confidence = confidence_of(1)
+        return team, {field: (float(match.group(k + 2)), min(name_confidence, confidence_of(k + 2)))
+                      for k, field in enumerate(fields)}
+    
+    def low_confidence_stats(self, threshold=OCR_MIN_CONFIDENCE):
+        """Return (team, field, confidence) for every extracted stat read with less than threshold confidence."""
+        flagged = self.confidence.valid & (self.confidence.values < threshold)
+        return [(self.confidence.teams[i], self.confidence.fields[j], float(self.confidence.values[i, j]))
+                for i, j in zip(*np.nonzero(flagged))]
+    
     def _match_team_name(self, name):
         """Match a team name from OCR text to the official team name."""
         name = name.strip()
@@ -173,158 +418,18 @@ class SECTournamentPredictor:
         
         return None  # No match found
     
-    def _parse_offense_defense_stats(self, text):
-        """Parse scoring offense and defense stats."""
-        lines = text.strip().split('\n')
-        
-        # Regular expression to match team name and two numeric values
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                offense = float(match.group(2))
-                defense = float(match.group(3))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['scoring_offense'] = offense
-                    self.team_stats[team]['scoring_defense'] = defense
-    
-    def _parse_field_goal_stats(self, text):
-        """Parse field goal percentage stats."""
-        lines = text.strip().split('\n')
-        
-        # Pattern to match team name and field goal percentage
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                fg_pct = float(match.group(2))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['field_goal_pct'] = fg_pct
-    
-    def _parse_3point_stats(self, text):
-        """Parse 3-point field goal stats."""
-        lines = text.strip().split('\n')
-        
-        # Pattern to match team name, 3-point makes per game, and percentage
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                threes_made = float(match.group(2))
-                three_pt_pct = float(match.group(3))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['three_pt_made'] = threes_made
-                    self.team_stats[team]['three_pt_pct'] = three_pt_pct
-    
-    def _parse_free_throw_stats(self, text):
-        """Parse free throw percentage stats."""
-        lines = text.strip().split('\n')
-        
-        # Pattern to match team name and free throw percentage
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                ft_pct = float(match.group(2))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['free_throw_pct'] = ft_pct
-    
-    def _parse_rebound_stats(self, text):
-        """Parse rebounding stats."""
-        lines = text.strip().split('\n')
-        
-        # Pattern to match team name and rebounds per game
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                rebounds = float(match.group(2))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['rebounds'] = rebounds
-    
-    def _parse_turnover_stats(self, text):
-        """Parse turnover stats."""
-        lines = text.strip().split('\n')
-        
-        # Pattern to match team name and turnovers per game
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                turnovers = float(match.group(2))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['turnovers'] = turnovers
-    
-    def _parse_blocks_assists_stats(self, text):
-        """Parse blocked shots and assists stats."""
-        lines = text.strip().split('\n')
-        
-        # Pattern to match team name, blocks, and assists
-        pattern = r'([A-Za-z]+(?:\s+[A-Za-z&]+)*)\s+(\d+\.\d+)\s+(\d+\.\d+)'
-        
-        for line in lines:
-            match = re.search(pattern, line)
-            if match:
-                team_name = match.group(1)
-                blocks = float(match.group(2))
-                assists = float(match.group(3))
-                
-                team = self._match_team_name(team_name)
-                if team:
-                    self.team_stats[team]['blocks'] = blocks
-                    self.team_stats[team]['assists'] = assists
-    
     def _handle_missing_values(self):
         """Handle missing values by filling with averages."""
-        stats_fields = [
-            'scoring_offense', 'scoring_defense', 'field_goal_pct',
-            'three_pt_made', 'three_pt_pct', 'free_throw_pct',
-            'rebounds', 'turnovers', 'blocks', 'assists'
-        ]
-        
-        # Calculate averages for each stat
-        averages = {}
-        for field in stats_fields:
-            values = [team_stats[field] for team_stats in self.team_stats.values() 
-                     if field in team_stats]
-            if values:
-                averages[field] = sum(values) / len(values)
-            else:
-                averages[field] = 0.0
+        # Averages over the teams that have each stat
+        averages = self.stats.column_means()
+        missing = ~self.stats.valid
         
-        # Fill missing values with averages
-        for team in SEC_TEAMS:
-            for field in stats_fields:
-                if field not in self.team_stats[team]:
-                    # Try to get from fallback data first
-                    if FALLBACK_TEAM_STATS and team in FALLBACK_TEAM_STATS and field in FALLBACK_TEAM_STATS[team]:
-                        self.team_stats[team][field] = FALLBACK_TEAM_STATS[team][field]
-                    else:
-                        self.team_stats[team][field] = averages[field]
+        # Try to get from fallback data first, then fall back to the averages
+        fallback = fallback_stats(self.stats.teams) or StatsTable(self.stats.teams)
+        from_fallback = missing & fallback.valid
+        self.stats.values[from_fallback] = fallback.values[from_fallback]
+        self.stats.values = np.where(missing & ~fallback.valid, averages, self.stats.values)
+        self.stats.valid[:] = True
     
     def initialize_elo_ratings(self):
         """Initialize Elo ratings for each team based on their stats."""
@@ -333,35 +438,12 @@ class SECTournamentPredictor:
         # Base Elo rating
         base_elo = 1500
         
-        # Calculate initial Elo ratings based on team stats
-        for team in SEC_TEAMS:
-            team_stats = self.team_stats[team]
-            
-            # Create a composite score using a weighted formula
-            offense_score = team_stats.get('scoring_offense', 0) * 3
-            defense_score = -team_stats.get('scoring_defense', 0) * 2  # Lower is better
-            shooting_score = (
-                team_stats.get('field_goal_pct', 0) * 100 + 
-                team_stats.get('three_pt_pct', 0) * 50 +
-                team_stats.get('free_throw_pct', 0) * 30
-            )
-            efficiency_score = (
-                team_stats.get('rebounds', 0) * 1.5 +
-                team_stats.get('assists', 0) * 1.0 -
-                team_stats.get('turnovers', 0) * 2.0 +
-                team_stats.get('blocks', 0) * 1.0
-            )
-            
-            # Calculate the final rating
-            self.elo_ratings[team] = base_elo + offense_score + defense_score + shooting_score + efficiency_score
+        # Composite score for every team at once; missing stats count as 0
+        ratings = base_elo + self.stats.filled(0.0) @ COMPOSITE_WEIGHTS
         
         # Normalize ratings to avoid extreme values
-        min_rating = min(self.elo_ratings.values())
-        max_rating = max(self.elo_ratings.values())
-        
-        for team in SEC_TEAMS:
-            normalized = 1400 + (self.elo_ratings[team] - min_rating) * (600 / (max_rating - min_rating))
-            self.elo_ratings[team] = normalized
+        normalized = normalize_ratings(ratings)
+        self.elo_ratings = {team: float(rating) for team, rating in zip(self.stats.teams, normalized)}
         
         print("Elo ratings initialized:")
         for team, rating in sorted(self.elo_ratings.items(), key=lambda x: x[1], reverse=True):
@@ -369,67 +451,390 @@ class SECTournamentPredictor:
         
         return self.elo_ratings
     
-    def calculate_win_probability(self, team_a, team_b):
-        """Calculate the probability of team_a beating team_b using Elo ratings."""
-        elo_a = self.elo_ratings.get(team_a, 1500)
-        elo_b = self.elo_ratings.get(team_b, 1500)
+    def fit_ratings_from_results(self, results_path, home_advantage=True, margin_weighted=False):
+        """Replace the stat-based Elo ratings with Bradley-Terry ratings fitted on game results."""
+        print(f"Fitting ratings on game results from '{results_path}'...")
+        results = load_game_results(results_path)
+        ratings, home_edge = fit_bradley_terry(results, home_advantage=home_advantage,
+                                               margin_weighted=margin_weighted)
+        
+        # Tournament games are on a neutral floor, so the home edge is not applied
+        missing = [team for team in SEC_TEAMS if team not in ratings]
+        if missing:
+            print(f"Warning: No game results for {', '.join(missing)}; using 1500.")
+        self.elo_ratings = {team: ratings.get(team, 1500.0) for team in SEC_TEAMS}
+        
+        print(f"Fitted ratings on {len(results)} games (home-court edge {home_edge:.1f} Elo points):")
+        for team, rating in sorted(self.elo_ratings.items(), key=lambda x: x[1], reverse=True):
+            print(f"{team:<20}: {rating:.1f}")
+        
+        return self.elo_ratings
+    
+    def outcome_index(self, iterations=ITERATIONS, seed=None):
+        """Simulate tournaments and index their results for conditional queries (see outcome_index.py)."""
+        winners = simulate_bracket(SEC_BRACKET, self.probability_matrix(), iterations, np.random.default_rng(seed))
+        return OutcomeIndex(SEC_BRACKET, winners)
+    
+    def incremental_predictions(self):
+        """Exact odds from the stat-based ratings that update in place as single stats change."""
+        return IncrementalPredictions(SEC_BRACKET, self.stats, COMPOSITE_WEIGHTS)
+    
+    def set_win_model(self, names, weights=None, battle_cache=None, blend_space="probability", results=None,
+                      battle_model=BATTLE_MODEL, battle_prompt_version=BATTLE_PROMPT_VERSION):
+        """
+        Choose the win-probability model by name: elo (the current ratings),
+        stat-logistic (weighted stats without normalization), fitted
+        (Bradley-Terry ratings fitted on the game results file) or battles
+        (cached mascot battle verdicts from battle_model and
+        battle_prompt_version). Several names are blended with the given
+        weights (see win_models.build_win_model).
+        """
+        self.win_model = build_win_model(names, weights, blend_space, ratings=self.elo_ratings,
+                                         stats=self.stats.copy(), stat_weights=COMPOSITE_WEIGHTS,
+                                         results=results, battle_cache=battle_cache,
+                                         battle_model=battle_model, battle_prompt_version=battle_prompt_version)
+        return self.win_model
+    
+    def probability_matrix(self):
+        """
+        Return the (teams x teams) matrix of win probabilities, in SEC_TEAMS
+        order. The model is evaluated once and the matrix kept until the
+        ratings or the win model are replaced; it is read-only.
+        """
+        if self._matrix is None:
+            model = self.win_model or EloModel(self.elo_ratings)
+            self._matrix = model.probability_matrix(SEC_TEAMS)
+            self._matrix.setflags(write=False)
+        return self._matrix
+    
+    def calculate_win_probability(self, team_a, team_b, matrix=None):
+        """
+        Return the probability of team_a beating team_b, read from the
+        win-probability matrix. Teams outside SEC_TEAMS are asked of the model
+        directly (1500-rated under Elo).
+        """
+        index = SEC_BRACKET.team_index
+        if team_a not in index or team_b not in index:
+            model = self.win_model or EloModel(self.elo_ratings)
+            return float(model.probability_matrix([team_a, team_b])[0, 1])
+        matrix = self.probability_matrix() if matrix is None else matrix
+        return float(matrix[index[team_a], index[team_b]])
+    
+    def advancement_probabilities(self, locked=None):
+        """Return exact (games x teams) probabilities of each team winning each bracket game."""
+        return advancement_probabilities(SEC_BRACKET, self.probability_matrix(), locked)
+    
+    def round_probabilities(self, locked=None):
+        """Return each team's exact probability of winning its game in each round."""
+        table = round_probabilities(SEC_BRACKET, self.advancement_probabilities(locked))
+        return {round_name: dict(zip(SEC_TEAMS, row.tolist()))
+                for round_name, row in zip(SEC_BRACKET.round_names, table)}
+    
+    def matchup_probabilities(self, locked=None):
+        """Return the exact (rounds x teams x teams) probability of each pair of teams meeting in each round."""
+        return matchup_probabilities(SEC_BRACKET, self.advancement_probabilities(locked))
+    
+    def simulated_matchup_probabilities(self, iterations=ITERATIONS, seed=None, batch_size=1000000):
+        """Estimate the matchup tensor from simulated tournaments, as a cross-check on the exact one."""
+        rng = np.random.default_rng(seed)
+        matrix = self.probability_matrix()
+        counts = 0
+        for start in range(0, iterations, batch_size):
+            winners = simulate_bracket(SEC_BRACKET, matrix, min(batch_size, iterations - start), rng)
+            counts = counts + simulated_matchup_counts(SEC_BRACKET, winners)
+        return counts / iterations
+    
+    def matchup_table(self, iterations=0, seed=None):
+        """
+        One row per round and pairing that can occur, with its exact probability
+        and, if iterations is non-zero, its simulated frequency.
+        """
+        exact = self.matchup_probabilities()
+        rounds, first, second = np.nonzero(np.triu(exact, k=1))
+        order = np.lexsort((-exact[rounds, first, second], rounds))
+        rounds, first, second = rounds[order], first[order], second[order]
+        table = pd.DataFrame({
+            "round": [SEC_BRACKET.round_names[r] for r in rounds],
+            "team_a": [SEC_TEAMS[i] for i in first],
+            "team_b": [SEC_TEAMS[j] for j in second],
+            "probability": exact[rounds, first, second],
+        })
+        if iterations:
+            simulated = self.simulated_matchup_probabilities(iterations, seed)
+            table["simulated"] = simulated[rounds, first, second]
+        return table
+    
+    def export_matchups(self, csv_path="sec_matchups.csv", heatmap_path="sec_matchups.png",
+                        iterations=0, seed=None):
+        """Write the matchup table to CSV and a heatmap per round to an image."""
+        table = self.matchup_table(iterations, seed)
+        table.to_csv(csv_path, index=False)
+        print(f"Matchup probabilities saved to '{csv_path}'")
         
-        # Elo formula for win probability
-        exponent = (elo_b - elo_a) / 400.0
-        return 1.0 / (1.0 + 10.0 ** exponent)
+        exact = self.matchup_probabilities()
+        names = SEC_BRACKET.round_names
+        # squeeze=False keeps axes a 2-D array even for a one-round bracket
+        fig, axes = plt.subplots(1, len(names), figsize=(6 * len(names), 6.5), squeeze=False)
+        for ax, name, meetings in zip(axes[0], names, exact):
+            image = ax.imshow(meetings, cmap='viridis', vmin=0)
+            ax.set_title(name)
+            ax.set_xticks(range(len(SEC_TEAMS)), SEC_TEAMS, rotation=90, fontsize=7)
+            ax.set_yticks(range(len(SEC_TEAMS)), SEC_TEAMS, fontsize=7)
+            fig.colorbar(image, ax=ax, fraction=0.046)
+        fig.suptitle('Probability of each SEC Tournament matchup by round')
+        fig.tight_layout()
+        fig.savefig(heatmap_path)
+        plt.close(fig)
+        print(f"Matchup heatmaps saved to '{heatmap_path}'")
+        return table
     
-    def simulate_game(self, team_a, team_b):
+    def simulate_game(self, team_a, team_b, matrix=None):
         """Simulate a game between two teams and return the winner."""
-        prob_a_wins = self.calculate_win_probability(team_a, team_b)
+        prob_a_wins = self.calculate_win_probability(team_a, team_b, matrix)
         return team_a if random.random() < prob_a_wins else team_b
     
-    def simulate_tournament(self):
+    def simulate_tournament(self, matrix=None):
         """Simulate the entire SEC tournament once."""
+        matrix = self.probability_matrix() if matrix is None else matrix
+        
         # First Round (March 12th) - Seeds 9-16
         first_round_winners = []
         for matchup in FIRST_ROUND_MATCHUPS:
-            winner = self.simulate_game(matchup[0], matchup[1])
+            winner = self.simulate_game(matchup[0], matchup[1], matrix)
             first_round_winners.append(winner)
         
         # Second Round (March 13th)
         second_round_matchups = list(zip(first_round_winners, SECOND_ROUND_TEAMS))
         second_round_winners = []
         for matchup in second_round_matchups:
-            winner = self.simulate_game(matchup[0], matchup[1])
+            winner = self.simulate_game(matchup[0], matchup[1], matrix)
             second_round_winners.append(winner)
         
         # Quarterfinals (March 14th)
         quarterfinal_matchups = list(zip(second_round_winners, QUARTERFINAL_TEAMS))
         quarterfinal_winners = []
         for matchup in quarterfinal_matchups:
-            winner = self.simulate_game(matchup[0], matchup[1])
+            winner = self.simulate_game(matchup[0], matchup[1], matrix)
             quarterfinal_winners.append(winner)
         
         # Semifinals (March 15th)
-        semifinal_1_winner = self.simulate_game(quarterfinal_winners[0], quarterfinal_winners[1])
-        semifinal_2_winner = self.simulate_game(quarterfinal_winners[2], quarterfinal_winners[3])
+        semifinal_1_winner = self.simulate_game(quarterfinal_winners[0], quarterfinal_winners[1], matrix)
+        semifinal_2_winner = self.simulate_game(quarterfinal_winners[2], quarterfinal_winners[3], matrix)
         
         # Championship (March 16th)
-        champion = self.simulate_game(semifinal_1_winner, semifinal_2_winner)
+        champion = self.simulate_game(semifinal_1_winner, semifinal_2_winner, matrix)
         
         return champion
     
-    def run_simulation(self, iterations=ITERATIONS):
-        """Run multiple iterations of tournament simulation."""
+    def run_simulation(self, iterations=ITERATIONS, engine="python", seed=None):
+        """
+        Run multiple iterations of tournament simulation. engine "python" plays
+        one tournament at a time; "numpy", "numba" or "auto" use the streaming
+        engines in numba_engine.py, which are meant for very large runs.
+        """
         print(f"Running {iterations} tournament simulations...")
         
-        for _ in tqdm(range(iterations)):
-            champion = self.simulate_tournament()
-            self.championship_counts[champion] += 1
+        # The win model is evaluated once per run, not once per game
+        matrix = self.probability_matrix()
+        if engine != "python":
+            rounds = self._memoized("rounds", iterations, seed, engine, {},
+                                    lambda: simulate_round_counts(SEC_BRACKET, matrix, iterations, seed, engine))
+            for team, count in zip(SEC_TEAMS, rounds[-1].tolist()):
+                self.championship_counts[team] += count
+            print("Simulations complete.")
+            self.championship_estimate = None
+            return self.championship_counts
+        
+        def simulate():
+            if seed is not None:
+                random.seed(seed)
+            counts = np.zeros(len(SEC_TEAMS), dtype=np.int64)
+            for _ in tqdm(range(iterations)):
+                counts[SEC_BRACKET.team_index[self.simulate_tournament(matrix)]] += 1
+            return counts
+        
+        for team, count in zip(SEC_TEAMS, self._memoized("champion", iterations, seed, engine, {}, simulate).tolist()):
+            self.championship_counts[team] += count
         
         print("Simulations complete.")
+        self.championship_estimate = None
         return self.championship_counts
     
+    def use_result_cache(self, cache=DEFAULT_RESULT_CACHE, recompute=False):
+        """
+        Memoize seeded simulation results on disk (see result_cache.py): runs
+        whose inputs and seed match an earlier run load its counts instead of
+        simulating; runs without a seed are neither read nor stored. cache is a
+        ResultCache or a directory; recompute ignores stored results but still
+        stores the new ones.
+        """
+        self.result_cache = cache if isinstance(cache, ResultCache) else ResultCache(cache)
+        self.recompute = recompute
+        return self.result_cache
+    
+    def simulation_inputs(self, kind, iterations, seed, engine, params):
+        """Everything a simulation's result depends on, for canonical_key."""
+        model = self.win_model or EloModel(self.elo_ratings)
+        return {
+            "kind": kind,
+            "stats": {"teams": self.stats.teams, "fields": self.stats.fields, "valid": self.stats.valid,
+                      "values": np.where(self.stats.valid, self.stats.values, 0.0)},
+            "ratings": [float(self.elo_ratings.get(team, 1500)) for team in SEC_TEAMS],
+            # The matrix pins down any model exactly; the name tells blends and fits apart in the metadata
+            "win_model": {"name": type(model).__name__, "matrix": self.probability_matrix()},
+            "bracket": SEC_BRACKET.to_dict(),
+            "iterations": int(iterations),
+            "seed": seed,
+            "engine": engine,
+            "params": params,
+        }
+    
+    def _memoized(self, kind, iterations, seed, engine, params, simulate):
+        """
+        Return simulate()'s counts, loading them from the result cache when these
+        inputs were run before. Unseeded runs are fresh draws and bypass the cache.
+        """
+        if self.result_cache is None or seed is None:
+            return simulate()
+        if engine == "auto":
+            engine = "numba" if HAVE_NUMBA else "numpy"
+        key = canonical_key(self.simulation_inputs(kind, iterations, seed, engine, params))
+        if not self.recompute:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                print(f"Loaded {iterations} simulations from the result cache "
+                      f"(stored {cached['metadata']['created']}, key {key[:12]})")
+                return cached["arrays"]["counts"]
+        
+        start = time.perf_counter()
+        counts = simulate()
+        self.result_cache.put(key, {"counts": counts}, {
+            "kind": kind, "iterations": int(iterations), "seed": seed, "engine": engine,
+            "win_model": type(self.win_model or EloModel(self.elo_ratings)).__name__,
+            "teams": SEC_TEAMS, "rounds": SEC_BRACKET.round_names if counts.ndim == 2 else None,
+            "seconds": time.perf_counter() - start,
+        })
+        return counts
+    
+    def simulate_scores(self, iterations=ITERATIONS, distribution="normal", seed=None, chunk_size=1000000):
+        """
+        Simulate tournaments at the score level from scoring offense and defense,
+        chunk_size tournaments at a time, keeping only counts and score
+        histograms (see score_model.py).
+        """
+        print(f"Running {iterations} score-level tournament simulations...")
+        model = ScoreModel.from_stats(self.stats, distribution)
+        self.score_simulation = simulate_scores(SEC_BRACKET, model, iterations, np.random.default_rng(seed),
+                                                chunk_size)
+        self.championship_counts = dict(zip(SEC_TEAMS, self.score_simulation.champion_counts().tolist()))
+        self.championship_estimate = None
+        return self.score_simulation
+    
+    def _point_ratings(self, what):
+        """
+        Ratings in SEC_TEAMS order for simulators that play Elo on per-simulation
+        ratings; raises ValueError when a different win model is set.
+        """
+        model = self.win_model or EloModel(self.elo_ratings)
+        if not isinstance(model, EloModel):
+            raise ValueError(f"{what} plays Elo ratings; it cannot use the {model.name} win model")
+        return np.array([model.ratings.get(team, model.default) for team in SEC_TEAMS], dtype=float)
+    
+    def simulate_with_uncertainty(self, iterations=ITERATIONS, rating_sd=None, rating_cov=None,
+                                  stat_noise=None, seed=None, chunk_size=1000000):
+        """
+        Simulate tournaments with a different rating vector drawn for each one:
+        around the current ratings with rating_sd or rating_cov, or by
+        perturbing every team's stats with noise of stat_noise times each
+        stat's spread across the teams (see rating_uncertainty.py).
+        Only the Elo model has ratings to draw, so other win models are refused.
+        """
+        point = self._point_ratings("Rating uncertainty")
+        if stat_noise is not None and self.stats.count() == 0:
+            raise ValueError("Perturbing the stats needs stat inputs; extract the stats first")
+        print(f"Running {iterations} tournament simulations with rating uncertainty...")
+        
+        def simulate():
+            rng = np.random.default_rng(seed)
+            counts = np.zeros(len(SEC_TEAMS), dtype=np.int64)
+            for start in range(0, iterations, chunk_size):
+                n = min(chunk_size, iterations - start)
+                if stat_noise is not None:
+                    ratings = perturbed_stat_ratings(self.stats.values, self.stats.valid, COMPOSITE_WEIGHTS,
+                                                     n, rng, stat_noise)
+                else:
+                    ratings = sample_ratings(point, n, rng, rating_sd, rating_cov)
+                winners = play_bracket_ratings(SEC_BRACKET, ratings, rng.random((n, SEC_BRACKET.n_games)))
+                counts += np.bincount(winners[:, SEC_BRACKET.final], minlength=len(SEC_TEAMS))
+            return counts
+        
+        params = {"rating_sd": rating_sd, "rating_cov": rating_cov, "stat_noise": stat_noise,
+                  "chunk_size": chunk_size}
+        counts = self._memoized("uncertainty", iterations, seed, "numpy", params, simulate)
+        self.championship_counts = dict(zip(SEC_TEAMS, counts.tolist()))
+        self.championship_estimate = None
+        return self.championship_counts
+    
+    def simulate_with_dynamics(self, iterations=ITERATIONS, k_factor=0.0, fatigue=0.0, rating_sd=None,
+                               rating_cov=None, seed=None, chunk_size=1000000):
+        """
+        Simulate tournaments whose ratings change as they are played: winners
+        gain k_factor * (1 - win probability) Elo points and teams lose fatigue
+        points per game already played (see play_bracket_dynamic). Starting
+        ratings can be drawn per simulation as in simulate_with_uncertainty.
+        Ratings are Elo ratings, so other win models are refused.
+        """
+        point = self._point_ratings("In-tournament dynamics")
+        print(f"Running {iterations} tournament simulations with in-tournament dynamics "
+              f"(K {k_factor:g}, fatigue {fatigue:g} per game)...")
+        
+        def simulate():
+            rng = np.random.default_rng(seed)
+            counts = np.zeros((len(SEC_BRACKET.round_names), len(SEC_TEAMS)), dtype=np.int64)
+            for start in range(0, iterations, chunk_size):
+                n = min(chunk_size, iterations - start)
+                ratings = point if rating_sd is None and rating_cov is None \
+                    else sample_ratings(point, n, rng, rating_sd, rating_cov)
+                winners = play_bracket_dynamic(SEC_BRACKET, ratings, rng.random((n, SEC_BRACKET.n_games)),
+                                               k_factor=k_factor, fatigue=fatigue)
+                for g in range(SEC_BRACKET.n_games):
+                    counts[SEC_BRACKET.game_round[g]] += np.bincount(winners[:, g], minlength=len(SEC_TEAMS))
+            return counts
+        
+        params = {"k_factor": k_factor, "fatigue": fatigue, "rating_sd": rating_sd, "rating_cov": rating_cov,
+                  "chunk_size": chunk_size}
+        counts = self._memoized("dynamics", iterations, seed, "numpy", params, simulate)
+        
+        self.dynamic_round_probabilities = {round_name: dict(zip(SEC_TEAMS, (row / iterations).tolist()))
+                                            for round_name, row in zip(SEC_BRACKET.round_names, counts)}
+        self.championship_counts = dict(zip(SEC_TEAMS, counts[-1].tolist()))
+        self.championship_estimate = None
+        return self.championship_counts
+    
+    def estimate_championship(self, iterations=ITERATIONS, method="plain", seed=None):
+        """Estimate championship probabilities with a variance-reduced sampling method (see sampling.py)."""
+        print(f"Estimating championship odds from {iterations} {method} simulations...")
+        self.championship_estimate = estimate_championship(
+            SEC_BRACKET, self.probability_matrix(), iterations, method, np.random.default_rng(seed))
+        if self.championship_estimate.iterations != iterations:
+            print(f"  ({self.championship_estimate.iterations} simulations actually run)")
+        return self.championship_estimate
+    
+    def sampling_report(self, iterations=ITERATIONS, relative_error=0.05, seed=None):
+        """Compare every sampling method on the current ratings, one row per method and team."""
+        estimates = [estimate_championship(SEC_BRACKET, self.probability_matrix(), iterations, method,
+                                           np.random.default_rng(seed))
+                     for method in SAMPLING_METHODS]
+        return sampling_report(estimates, SEC_TEAMS, relative_error)
+    
     def get_championship_probabilities(self):
         """Calculate championship probabilities for each team."""
-        total_simulations = sum(self.championship_counts.values())
-        probabilities = {team: count / total_simulations 
-                        for team, count in self.championship_counts.items()}
+        if self.championship_estimate is not None:
+            probabilities = dict(zip(SEC_TEAMS, self.championship_estimate.probability.tolist()))
+        else:
+            total_simulations = sum(self.championship_counts.values())
+            probabilities = {team: count / total_simulations 
+                            for team, count in self.championship_counts.items()}
         
         # Sort teams by probability in descending order
         sorted_probs = sorted(probabilities.items(), key=lambda x: x[1], reverse=True)
@@ -454,7 +859,7 @@ class SECTournamentPredictor:
         # Create a bar chart of the results
         self._plot_results(probs)
         
-    def _plot_results(self, probabilities):
+    def _plot_results(self, probabilities, path='sec_championship_prediction.png'):
         """Create and save a visualization of the results."""
         teams = [team for team, _ in probabilities]
         probs = [prob for _, prob in probabilities]
@@ -472,8 +877,68 @@ class SECTournamentPredictor:
                     f'{height:.1%}', ha='center', va='bottom')
         
         plt.tight_layout()
-        plt.savefig('sec_championship_prediction.png')
-        print("Results visualization saved to 'sec_championship_prediction.png'")
+        # Save under a temporary name first so a viewer never opens a half-written chart
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+        plt.savefig(tmp_path)
+        plt.close()
+        os.replace(tmp_path, path)
+        print(f"Results visualization saved to '{path}'")
+
+def load_rating_cov(path):
+    """Read a rating covariance matrix from a CSV or .npy file; None passes through."""
+    if path is None:
+        return None
+    return np.load(path) if path.endswith('.npy') else np.loadtxt(path, delimiter=',')
+
+def check_flag_combinations(parser, args):
+    """
+    Each simulation mode reads only some flags; exit with a usage error for
+    combinations where a flag would be silently ignored.
+    """
+    modes = [flag for flag, chosen in (
+        ('--sampling-report', args.sampling_report),
+        ('--matchups', args.matchups),
+        ('--game-model score', args.game_model == 'score'),
+        ('--k-factor/--fatigue', bool(args.k_factor or args.fatigue)),
+        ('--sampling', args.sampling is not None),
+    ) if chosen]
+    if len(modes) > 1:
+        parser.error(f"{modes[0]} cannot be combined with {modes[1]}")
+    mode = modes[0] if modes else None
+    
+    draws = [flag for flag, chosen in (
+        ('--rating-sd', args.rating_sd is not None),
+        ('--rating-cov', args.rating_cov is not None),
+        ('--stat-noise', args.stat_noise is not None),
+    ) if chosen]
+    
+    # The watcher and the server build their own predictor from the inputs alone
+    if args.watch and args.serve:
+        parser.error("--watch cannot be combined with --serve")
+    service = '--watch' if args.watch else '--serve' if args.serve else None
+    if service:
+        ignored = modes + draws + [flag for flag, chosen in (
+            ('--engine', args.engine != 'python'),
+            ('--win-model', bool(args.win_model)),
+            ('--seed', args.seed is not None),
+        ) if chosen]
+        if ignored:
+            parser.error(f"{ignored[0]} cannot be combined with {service}")
+    
+    if draws and mode not in (None, '--k-factor/--fatigue'):
+        parser.error(f"{draws[0]} cannot be combined with {mode}")
+    if args.engine != 'python' and (mode or draws):
+        parser.error(f"--engine only applies to the plain simulation, not {mode or draws[0]}")
+    if args.stat_noise is not None and mode == '--k-factor/--fatigue':
+        parser.error("--stat-noise cannot be combined with --k-factor/--fatigue")
+    
+    if args.win_model:
+        names, _ = parse_win_model_specs(args.win_model)
+        if mode == '--game-model score':
+            parser.error("--win-model cannot be combined with --game-model score, which samples points instead")
+        if any(name != 'elo' for name in names) and (draws or mode == '--k-factor/--fatigue'):
+            parser.error(f"{(draws or [mode])[0]} draws Elo ratings and needs --win-model elo")
 
 def main():
     """Main execution function."""
@@ -483,12 +948,154 @@ def main():
                         help=f'Number of simulation iterations (default: {ITERATIONS})')
     parser.add_argument('--fallback', action='store_true', 
                         help='Use fallback data instead of OCR extraction')
+    parser.add_argument('--season-data', default=None,
+                        help='Season file (see season_data.py) to read the stats from instead of OCR')
+    parser.add_argument('--preprocess-ocr', action='store_true',
+                        help='Crop, rescale and binarize the screenshots before OCR (compare with '
+                             'ocr_debug.py --compare first)')
+    parser.add_argument('--ocr-engine', default='pytesseract', choices=sorted(OCR_ENGINES),
+                        help='OCR engine: pytesseract (one tesseract process per image) or tesserocr (in process)')
+    parser.add_argument('--results', default=None,
+                        help='CSV of game results to fit Bradley-Terry ratings on instead of the stat-based Elo')
+    parser.add_argument('--engine', default='python', choices=['python'] + ENGINES,
+                        help='Simulation engine: python (one tournament at a time), numpy, numba, '
+                             'or auto (numba when installed)')
+    parser.add_argument('--sampling', default=None, choices=SAMPLING_METHODS,
+                        help='Estimate the odds with a vectorized, variance-reduced sampling method')
+    parser.add_argument('--sampling-report', action='store_true',
+                        help='Compare standard errors and effective sample sizes of every sampling method')
+    parser.add_argument('--win-model', action='append', default=None, metavar='NAME[:WEIGHT]',
+                        help='Win-probability model: elo (default), stat-logistic, fitted (Bradley-Terry on --results) '
+                             'or battles. '
+                             'Repeat to blend models, e.g. --win-model elo:3 --win-model battles:1')
+    parser.add_argument('--battle-cache', default=os.path.join('..', 'DanielChurch', 'mascot_battle_cache.json'),
+                        help='Mascot battle cache used by --win-model battles')
+    parser.add_argument('--battle-model', default=BATTLE_MODEL,
+                        help='Read only battle verdicts from this model')
+    parser.add_argument('--battle-prompt-version', type=int, default=BATTLE_PROMPT_VERSION,
+                        help='Read only battle verdicts from this prompt version')
+    parser.add_argument('--blend-space', default='probability', choices=['probability', 'logit'],
+                        help='Average blended models\' probabilities or their log-odds')
+    parser.add_argument('--game-model', default='elo', choices=['elo', 'score'],
+                        help='elo: one weighted coin flip per game; score: sample both teams\' points')
+    parser.add_argument('--score-distribution', default='normal', choices=SCORE_DISTRIBUTIONS,
+                        help='Points distribution for --game-model score')
+    parser.add_argument('--rating-sd', type=float, default=None,
+                        help='Draw each simulation\'s ratings with this standard deviation around the point ratings')
+    parser.add_argument('--rating-cov', default=None,
+                        help='CSV or .npy covariance matrix (SEC_TEAMS order) for drawing each simulation\'s ratings')
+    parser.add_argument('--stat-noise', type=float, nargs='?', const=STAT_NOISE, default=None,
+                        metavar='FRACTION',
+                        help='Draw each simulation\'s ratings from the stats perturbed by noise of this fraction '
+                             f'of each stat\'s spread across the teams (default {STAT_NOISE:g})')
+    parser.add_argument('--k-factor', type=float, default=0.0,
+                        help='Raise each simulated winner\'s rating by K * (1 - its win probability) for its '
+                             'next game (e.g. 20)')
+    parser.add_argument('--fatigue', type=float, default=0.0,
+                        help='Elo points a team loses for every game it has already played in the tournament '
+                             '(e.g. 15)')
+    parser.add_argument('--matchups', action='store_true',
+                        help='Write the probability of every pairing in every round to sec_matchups.csv '
+                             'and sec_matchups.png, checked against --iterations simulations')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and update sec_predictions.json and the chart whenever the stat '
+                             'images, season file, results or bracket file change')
+    parser.add_argument('--bracket', default=None,
+                        help='Bracket JSON file to predict and watch with --watch (default: the 2025 SEC bracket)')
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help='Seconds between checks of the inputs with --watch')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for the simulations')
+    parser.add_argument('--result-cache', default=DEFAULT_RESULT_CACHE,
+                        help='Folder of memoized simulation results; a --seed run with the same inputs, '
+                             'iterations, seed and engine as an earlier one loads its counts. '
+                             'Runs without --seed are never cached')
+    parser.add_argument('--no-result-cache', action='store_true', help='Neither read nor store memoized results')
+    parser.add_argument('--recompute', action='store_true',
+                        help='Simulate even if the result cache has these inputs, and store the new result')
+    parser.add_argument('--serve', action='store_true',
+                        help='Keep the predictions in memory and answer queries over local HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on with --serve')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on with --serve')
     args = parser.parse_args()
+    check_flag_combinations(parser, args)
+
+    if args.watch:
+        from prediction_watcher import PredictionWatcher
+        season = args.season_data or (FALLBACK_SEASON if args.fallback else None)
+        watcher = PredictionWatcher(args.stats, args.results, season, args.bracket,
+                                    poll_interval=args.poll_interval, preprocess_ocr=args.preprocess_ocr,
+                                    ocr_engine=get_ocr_engine(args.ocr_engine))
+        watcher.run()
+        return
+    
+    if args.serve:
+        from prediction_server import PredictionService, serve
+        service = PredictionService(args.stats, args.fallback, args.results, args.iterations,
+                                    preprocess_ocr=args.preprocess_ocr,
+                                    ocr_engine=get_ocr_engine(args.ocr_engine))
+        serve(service, args.host, args.port)
+        return
+    
+    predictor = SECTournamentPredictor(stats_folder=args.stats, use_fallback=args.fallback,
+                                       preprocess_ocr=args.preprocess_ocr,
+                                       ocr_engine=get_ocr_engine(args.ocr_engine))
+    if args.results:
+        predictor.fit_ratings_from_results(args.results)
+    else:
+        if args.season_data:
+            predictor.load_season(args.season_data)
+        else:
+            predictor.extract_data_from_images()
+        predictor.initialize_elo_ratings()
+    
+    if args.win_model:
+        names, weights = parse_win_model_specs(args.win_model)
+        predictor.set_win_model(names, weights, args.battle_cache, args.blend_space, args.results,
+                                args.battle_model, args.battle_prompt_version)
+    
+    if not args.no_result_cache:
+        predictor.use_result_cache(args.result_cache, recompute=args.recompute)
+    
+    if args.sampling_report:
+        report = predictor.sampling_report(iterations=args.iterations)
+        print("\nEffective samples per simulated tournament (higher is better):")
+        print(report.pivot(index="team", columns="method", values="efficiency").round(2).to_string())
+        print("\nSimulations needed for a standard error of 5% of each team's odds:")
+        print(report.pivot(index="team", columns="method", values="iterations_needed").to_string())
+        return
+    
+    if args.matchups:
+        table = predictor.export_matchups(iterations=args.iterations, seed=args.seed)
+        if "simulated" in table:
+            gap = (table["probability"] - table["simulated"]).abs().max()
+            print(f"\nMost likely matchups (largest gap from simulation: {gap:.4f}):")
+        else:
+            print("\nMost likely matchups:")
+        print(table.sort_values("probability", ascending=False).head(10).round(4).to_string(index=False))
+        return
     
-    predictor = SECTournamentPredictor(stats_folder=args.stats, use_fallback=args.fallback)
-    predictor.extract_data_from_images()
-    predictor.initialize_elo_ratings()
-    predictor.run_simulation(iterations=args.iterations)
+    if args.game_model == 'score':
+        scores = predictor.simulate_scores(iterations=args.iterations, distribution=args.score_distribution,
+                                           seed=args.seed)
+        print("\nMargin of victory and total points by round:")
+        print(round_summary(scores).round(2).to_string(index=False))
+        print("\nMost frequent matchups:")
+        print(matchup_summary(scores).head(10).round(2).to_string(index=False))
+    elif args.k_factor or args.fatigue:
+        predictor.simulate_with_dynamics(iterations=args.iterations, k_factor=args.k_factor, fatigue=args.fatigue,
+                                         rating_sd=args.rating_sd, rating_cov=load_rating_cov(args.rating_cov),
+                                         seed=args.seed)
+        print("\nChance of winning a game in each round:")
+        print(pd.DataFrame(predictor.dynamic_round_probabilities).sort_values(
+            SEC_BRACKET.round_names[-1], ascending=False).round(3).to_string())
+    elif args.rating_sd is not None or args.rating_cov is not None or args.stat_noise is not None:
+        cov = load_rating_cov(args.rating_cov)
+        predictor.simulate_with_uncertainty(iterations=args.iterations, rating_sd=args.rating_sd,
+                                            rating_cov=cov, stat_noise=args.stat_noise, seed=args.seed)
+    elif args.sampling:
+        predictor.estimate_championship(iterations=args.iterations, method=args.sampling, seed=args.seed)
+    else:
+        predictor.run_simulation(iterations=args.iterations, engine=args.engine, seed=args.seed)
     predictor.display_results()
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Columnar team statistics for the SEC Tournament Predictor.
+
+Stats are held in a (teams x fields) float array with a matching validity
+mask, so imputation and rating formulas run as array operations instead of
+loops over per-team dicts. Dict-style views are provided for code that still
+reads or writes team_stats[team][field].
+"""
+
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+
+STAT_FIELDS = [
+    'scoring_offense', 'scoring_defense', 'field_goal_pct',
+    'three_pt_made', 'three_pt_pct', 'free_throw_pct',
+    'rebounds', 'turnovers', 'blocks', 'assists'
+]
+
+
+class StatsTable:
+    """Team statistics as a (teams x fields) array plus a validity mask."""
+
+    def __init__(self, teams, fields=STAT_FIELDS):
+        self.teams = list(teams)
+        self.fields = list(fields)
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.field_index = {field: j for j, field in enumerate(self.fields)}
+        self.values = np.zeros((len(self.teams), len(self.fields)))
+        self.valid = np.zeros((len(self.teams), len(self.fields)), dtype=bool)
+
+    @classmethod
+    def from_dict(cls, team_stats, teams=None, fields=STAT_FIELDS):
+        """Build a table from a dict of per-team stat dicts. Values are copied."""
+        table = cls(teams if teams is not None else list(team_stats), fields)
+        for team, stats in team_stats.items():
+            if team not in table.team_index:
+                continue
+            for field, value in stats.items():
+                if field in table.field_index:
+                    table.set(team, field, value)
+        return table
+
+    @classmethod
+    def from_arrays(cls, teams, fields, values, valid):
+        """Wrap existing (teams x fields) value and validity arrays without copying them."""
+        table = cls(teams, fields)
+        table.values = values
+        table.valid = valid
+        return table
+
+    def reindex(self, teams):
+        """Return a copy with rows in the given team order; unknown teams have no stats."""
+        table = StatsTable(teams, self.fields)
+        known = [i for i, team in enumerate(table.teams) if team in self.team_index]
+        rows = [self.team_index[table.teams[i]] for i in known]
+        table.values[known] = self.values[rows]
+        table.valid[known] = self.valid[rows]
+        return table
+
+    def set(self, team, field, value):
+        """Set one stat and mark it valid."""
+        i, j = self.team_index[team], self.field_index[field]
+        self.values[i, j] = value
+        self.valid[i, j] = True
+
+    def get(self, team, field, default=None):
+        """Return one stat, or default if it is missing."""
+        i, j = self.team_index[team], self.field_index[field]
+        return float(self.values[i, j]) if self.valid[i, j] else default
+
+    def column(self, field):
+        """Return the values of one stat for every team (missing entries are 0)."""
+        return self.filled()[:, self.field_index[field]]
+
+    def filled(self, fill_value=0.0):
+        """Return the values with missing entries replaced by fill_value."""
+        return np.where(self.valid, self.values, fill_value)
+
+    def column_means(self):
+        """Mean of each stat over the teams that have it, 0 for stats nobody has."""
+        counts = self.valid.sum(axis=0)
+        totals = self.filled().sum(axis=0)
+        return np.divide(totals, counts, out=np.zeros(len(self.fields)), where=counts > 0)
+
+    def filled_with_means(self):
+        """
+        Return a copy with every missing entry set to its stat's mean over the
+        teams that have it, all marked valid. An average value never moves the
+        min-max range of the ratings, so gaps neither reward nor punish a team.
+        """
+        table = self.copy()
+        table.values = self.filled(self.column_means())
+        table.valid[:] = True
+        return table
+
+    def count(self):
+        """Number of stats present across all teams."""
+        return int(self.valid.sum())
+
+    def copy(self):
+        """Return an independent copy of the table."""
+        table = StatsTable(self.teams, self.fields)
+        table.values = self.values.copy()
+        table.valid = self.valid.copy()
+        return table
+
+    def to_dict(self):
+        """Return the stats as a plain dict of per-team dicts."""
+        return {team: dict(row) for team, row in self.view().items()}
+
+    def view(self):
+        """Return a live dict-of-dicts view backed by this table."""
+        return TeamStatsView(self)
+
+
+class TeamStatsView(Mapping):
+    """Read-only mapping of team -> live per-team stats view."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, team):
+        if team not in self._table.team_index:
+            raise KeyError(team)
+        return TeamStatsRow(self._table, team)
+
+    def __iter__(self):
+        return iter(self._table.teams)
+
+    def __len__(self):
+        return len(self._table.teams)
+
+
+class TeamStatsRow(MutableMapping):
+    """One team's stats as a dict; reads and writes go straight to the table."""
+
+    def __init__(self, table, team):
+        self._table = table
+        self._row = table.team_index[team]
+
+    def __getitem__(self, field):
+        j = self._table.field_index[field]
+        if not self._table.valid[self._row, j]:
+            raise KeyError(field)
+        return float(self._table.values[self._row, j])
+
+    def __setitem__(self, field, value):
+        j = self._table.field_index[field]
+        self._table.values[self._row, j] = value
+        self._table.valid[self._row, j] = True
+
+    def __delitem__(self, field):
+        j = self._table.field_index[field]
+        if not self._table.valid[self._row, j]:
+            raise KeyError(field)
+        self._table.valid[self._row, j] = False
+
+    def __iter__(self):
+        valid = self._table.valid[self._row]
+        return iter([field for field, ok in zip(self._table.fields, valid) if ok])
+
+    def __len__(self):
+        return int(self._table.valid[self._row].sum())
+
+    def __repr__(self):
+        return repr(dict(self))
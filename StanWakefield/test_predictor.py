@@ -7,13 +7,46 @@ without running the full simulation.
 """
 
 import os
-from sec_tournament_predictor import SECTournamentPredictor, SEC_TEAMS
+import json
+import time
+import tempfile
+import threading
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+from PIL import Image
+from sec_tournament_predictor import (SECTournamentPredictor, SEC_TEAMS, SEC_BRACKET, FALLBACK_TEAM_STATS,
+                                      COMPOSITE_WEIGHTS, QUARTERFINAL_TEAMS, fallback_stats,
+                                      FALLBACK_SEASON, FALLBACK_SEASON_FILES, fallback_disagreements)
+from rating_fit import fit_bradley_terry
+from ocr_engine import get_ocr_engine, OCREngine, OCRLine, OCRWord
+from ocr_debug import read_stat_image
+from http.server import ThreadingHTTPServer
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from prediction_server import PredictionService, PredictionRequestHandler
+from prediction_watcher import PredictionWatcher
+from distributed import Coordinator, sweep_scenarios, block_counts
+from backtest import BacktestSeason, run_backtest, LEVELS
+from result_cache import canonical_key
+from rating_uncertainty import normalize_ratings
+from batch_predict import load_manifest, run_batch, season_stats
+from sampling import SAMPLING_METHODS, MAX_STRATIFIED_GAMES, estimate_championship
+from score_model import ScoreModel, MAX_OVERTIMES, MAX_MARGIN, round_summary, matchup_summary
+from tournament_engine import (Bracket, simulate_bracket, win_probability_matrix, play_bracket,
+                               play_bracket_ratings, play_bracket_dynamic)
+from numba_engine import HAVE_NUMBA, simulate_round_counts
+from incremental import IncrementalPredictions
+from season_data import save_season, load_season
+from stats_table import StatsTable
+from win_models import EloModel, StatLogisticModel, BattleVerdictModel, BlendModel
 
 def test_data_extraction():
     """Test the data extraction from images."""
     print("Testing data extraction...")
     
-    predictor = SECTournamentPredictor()
+    predictor = SECTournamentPredictor(ocr_engine=get_ocr_engine(os.environ.get("OCR_ENGINE", "pytesseract")))
     
     # Check if stats folder exists
     if not os.path.exists("stats"):
@@ -110,6 +143,878 @@ def test_tournament_simulation():
     
     return champion in SEC_TEAMS
 
+def test_stats_table():
+    """Test the columnar stats table behind team_stats."""
+    print("\nTesting stats table...")
+    
+    predictor = SECTournamentPredictor()
+    
+    # Writes through the dict view land in the array
+    predictor.team_stats["Auburn"]["rebounds"] = 40.0
+    predictor.team_stats["Alabama"]["rebounds"] = 36.0
+    if predictor.stats.get("Auburn", "rebounds") != 40.0 or "assists" in predictor.team_stats["Auburn"]:
+        print("Warning: Dict view does not match the stats table.")
+        return False
+    
+    # Missing values are filled from fallback data first, then from the column mean
+    predictor._handle_missing_values()
+    expected = FALLBACK_TEAM_STATS["Georgia"]["rebounds"] if FALLBACK_TEAM_STATS else 38.0
+    if abs(predictor.team_stats["Georgia"]["rebounds"] - expected) > 1e-9:
+        print(f"Warning: Georgia rebounds imputed as {predictor.team_stats['Georgia']['rebounds']}")
+        return False
+    
+    print(f"Stats table holds {predictor.stats.count()} values for {len(predictor.team_stats)} teams.")
+    return predictor.stats.count() == len(SEC_TEAMS) * len(predictor.stats.fields)
+
+def test_rating_fit():
+    """Test Bradley-Terry ratings fitted on a synthetic season."""
+    print("\nTesting Bradley-Terry rating fit...")
+    
+    # A Division I sized season drawn from known team strengths
+    rng = np.random.default_rng(2025)
+    n_teams, n_games = 364, 6000
+    strengths = rng.normal(0, 1, n_teams)
+    home = rng.integers(0, n_teams, n_games)
+    away = (home + rng.integers(1, n_teams, n_games)) % n_teams
+    home_wins = rng.random(n_games) < 1 / (1 + np.exp(-(strengths[home] - strengths[away] + 0.4)))
+    results = pd.DataFrame({
+        'Home': [f"Team {i}" for i in home],
+        'Away': [f"Team {i}" for i in away],
+        'Home Score': np.where(home_wins, 75, 70),
+        'Away Score': np.where(home_wins, 70, 75),
+        'Neutral': False
+    })
+    
+    start = time.time()
+    ratings, home_edge = fit_bradley_terry(results)
+    elapsed = time.time() - start
+    print(f"Fitted {len(ratings)} teams on {n_games} games in {elapsed:.3f}s (home edge {home_edge:.1f})")
+    
+    fitted = np.array([ratings[f"Team {i}"] for i in range(n_teams)])
+    correlation = np.corrcoef(fitted, strengths)[0, 1]
+    print(f"Correlation with true strengths: {correlation:.3f}")
+    
+    if elapsed > 1.0 or correlation < 0.8 or home_edge <= 0:
+        print("Warning: Fitted ratings are too slow or do not match the true strengths.")
+        return False
+    
+    return True
+
+def test_prediction_service():
+    """Test exact odds and what-if queries from the warm prediction service."""
+    print("\nTesting prediction service...")
+    
+    service = PredictionService(use_fallback=True, iterations=5000)
+    service.refresh()
+    
+    # Exact championship odds agree with the simulation run alongside them
+    odds = service.championship_odds()
+    total = sum(entry["probability"] for entry in odds)
+    worst = max(abs(entry["probability"] - entry["simulated"]) for entry in odds)
+    print(f"Exact odds sum to {total:.6f}; largest gap to simulation {worst:.3f}")
+    if abs(total - 1.0) > 1e-9 or worst > 0.03:
+        return False
+    
+    # Locking the final makes its winner certain; queries stay fast
+    start = time.time()
+    what_if = service.what_if({"14": "Florida"}, {"Texas": 1900})
+    elapsed = time.time() - start
+    print(f"What-if query answered in {elapsed * 1000:.1f}ms")
+    if what_if["rounds"]["Championship"]["Florida"] != 1.0 or elapsed > 0.1:
+        return False
+    
+    # The locked champion won its earlier games too
+    if [what_if["rounds"][name]["Florida"] for name in ("Quarterfinals", "Semifinals")] != [1.0, 1.0] \
+            or what_if["winners"] != {10: "Florida", 13: "Florida", 14: "Florida"}:
+        return False
+    
+    # Unknown teams, impossible results and locks that contradict each other are rejected
+    for winners in ({"14": "Nowhere"}, {"0": "Auburn"}, {"14": "Florida", "13": "Alabama"}):
+        try:
+            service.what_if(winners)
+            return False
+        except ValueError:
+            pass
+    
+    # Malformed request bodies get a 400 instead of a dropped connection
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PredictionRequestHandler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    statuses = []
+    try:
+        for body in (b'{"winners": ', b'[1, 2]', b'{"winners": {"14": "Florida"}}'):
+            request = Request(f"http://127.0.0.1:{server.server_address[1]}/what-if", data=body, method="POST")
+            try:
+                with urlopen(request, timeout=5) as response:
+                    statuses.append(response.status)
+            except HTTPError as e:
+                statuses.append(e.code)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"POST statuses: {statuses}")
+    return statuses == [400, 400, 200]
+
+def test_batch_predict():
+    """Test batch predictions over a manifest of seasons."""
+    print("\nTesting batch predictions...")
+    
+    with tempfile.TemporaryDirectory() as folder:
+        # An older season without Texas and Oklahoma, on an eight-team bracket
+        season = {team: stats for team, stats in FALLBACK_TEAM_STATS.items()
+                  if team not in ("Texas", "Oklahoma")}
+        bracket = {
+            "rounds": ["Quarterfinals", "Semifinals", "Championship"],
+            "games": [{"round": 0, "sides": ["Auburn", "LSU"]}, {"round": 0, "sides": ["Alabama", "Georgia"]},
+                      {"round": 0, "sides": ["Florida", "Arkansas"]}, {"round": 0, "sides": ["Tennessee", "Kentucky"]},
+                      {"round": 1, "sides": [0, 1]}, {"round": 1, "sides": [2, 3]},
+                      {"round": 2, "sides": [4, 5]}]
+        }
+        manifest = {"seasons": [{"name": "old", "data": "season.json", "bracket": "bracket.json"},
+                                {"name": "current", "fallback": True},
+                                {"name": "unread", "stats": "empty"}]}
+        for name, data in (("season.json", season), ("bracket.json", bracket), ("manifest.json", manifest)):
+            with open(os.path.join(folder, name), "w") as f:
+                json.dump(data, f)
+        os.makedirs(os.path.join(folder, "empty"))
+        
+        # A season without screenshots fails on its own instead of using the current fallback data
+        seasons = load_manifest(os.path.join(folder, "manifest.json"))
+        table = run_batch(seasons, iterations=5000, workers=2, ocr_cache=None)
+        
+        # So does one whose screenshots give too few stats
+        stats_folder = os.path.join(folder, "stats")
+        os.makedirs(stats_folder)
+        Image.new("L", (200, 400), 255).save(os.path.join(stats_folder, "turnovers.png"))
+        rows = [[(team, 95), (f"{FALLBACK_TEAM_STATS[team]['turnovers']:.1f}", 95)] for team in SEC_TEAMS]
+        try:
+            season_stats({"name": "sparse", "stats": stats_folder}, ScriptedOCREngine(rows, []))
+            return False
+        except ValueError as e:
+            print(f"Rejected: {e}")
+    
+    print(f"Batch produced {len(table)} rows for {table['season'].nunique()} seasons")
+    champions = table[table["round"] == "Championship"].groupby("season")["exact"].sum()
+    if len(table) != 8 * 3 + 16 * 5 or not np.allclose(champions, 1.0):
+        return False
+    return bool((table["exact"] - table["simulated"]).abs().max() < 0.03)
+
+def test_sampling_methods():
+    """Test that every sampling method is unbiased and importance sampling helps the long shots."""
+    print("\nTesting sampling methods...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    exact = np.array([predictor.round_probabilities()["Championship"][team] for team in SEC_TEAMS])
+    
+    efficiency = {}
+    for method in SAMPLING_METHODS:
+        estimate = predictor.estimate_championship(iterations=40000, method=method, seed=7)
+        observed = estimate.standard_error > 0
+        z = np.abs(estimate.probability - exact)[observed] / estimate.standard_error[observed]
+        print(f"{method:<12} largest error {z.max():.2f} standard errors in {estimate.seconds:.2f}s")
+        if z.max() > 5:
+            return False
+        efficiency[method] = estimate.efficiency[SEC_TEAMS.index("Arkansas")]
+    
+    # Small runs: antithetic pairs and stratum minimums move the count off the request
+    if predictor.estimate_championship(iterations=101, method="antithetic", seed=7).iterations != 100:
+        return False
+    if predictor.estimate_championship(iterations=20, method="stratified", seed=7).iterations <= 20:
+        return False
+    try:
+        predictor.estimate_championship(iterations=3, method="antithetic", seed=7)
+        return False
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    
+    # A 64-team field still needs only a few strata, not 2^32
+    teams = [f"Team {i}" for i in range(64)]
+    games = [(0, teams[2 * i], teams[2 * i + 1]) for i in range(32)]
+    for r, first in enumerate((0, 32, 48, 56, 60), 1):
+        size = 2 ** (5 - r)
+        games += [(r, first + 2 * i, first + 2 * i + 1) for i in range(size)]
+    field = Bracket(games, [f"Round {r}" for r in range(6)], teams)
+    matrix = win_probability_matrix(np.random.default_rng(3).normal(1500, 150, 64))
+    wide = estimate_championship(field, matrix, 1000, "stratified", np.random.default_rng(7))
+    print(f"64-team stratified run: {wide.iterations} tournaments")
+    if not 1000 <= wide.iterations <= 1000 + 2 * 2 ** MAX_STRATIFIED_GAMES:
+        return False
+    
+    return efficiency["importance"] > 3 * efficiency["plain"]
+
+def test_score_model():
+    """Test score-level simulation: no ties, sensible scores, and cost close to the coin-flip engine."""
+    print("\nTesting score-level game model...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    
+    start = time.time()
+    simulate_bracket(SEC_BRACKET, predictor.probability_matrix(), 200000, np.random.default_rng(1))
+    coin_flip = time.time() - start
+    start = time.time()
+    scores = predictor.simulate_scores(iterations=200000, seed=1)
+    score_level = time.time() - start
+    print(f"Coin flips {coin_flip:.2f}s, scores {score_level:.2f}s for 200000 tournaments")
+    
+    summary = round_summary(scores)
+    print(summary[["round", "mean_margin", "mean_total", "overtime_rate"]].round(2).to_string(index=False))
+    if scores.pair_margins[:, MAX_MARGIN].any():
+        return False
+    if not summary["mean_total"].between(120, 180).all() or score_level > 8 * coin_flip:
+        return False
+    
+    # Chunks are folded into the same histograms: every game is counted once
+    chunked = predictor.simulate_scores(iterations=50001, seed=2, chunk_size=20000)
+    games_per_round = np.bincount(SEC_BRACKET.game_round)
+    matchups = matchup_summary(chunked)
+    if chunked.iterations != 50001 or (round_summary(chunked)["games"] != 50001 * games_per_round).any() \
+            or matchups["games"].sum() != 50001 * SEC_BRACKET.n_games \
+            or not matchups["team_a_win_rate"].between(0, 1).all():
+        return False
+    
+    # Scoreless teams finish through the overtime cap; missing stats are refused up front
+    scoreless = ScoreModel(["A", "B"], [0.0, 0.0], [1e-9, 1e-9])
+    points_a, points_b, overtimes = scoreless.play(np.zeros(1000, int), np.ones(1000, int),
+                                                   np.random.default_rng(1))
+    if (points_a == points_b).any() or overtimes.max() > MAX_OVERTIMES:
+        return False
+    empty = StatsTable(SEC_TEAMS, predictor.stats.fields)
+    for build in (lambda: ScoreModel.from_stats(empty), lambda: ScoreModel(["A", "B"], [0, 0], [0, 0])):
+        try:
+            build()
+            return False
+        except ValueError as e:
+            print(f"Rejected: {e}")
+    return sum(predictor.championship_counts.values()) == 50001
+
+def test_win_models():
+    """Test that win models produce consistent matrices and can be blended."""
+    print("\nTesting win models...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "battles.json")
+        with open(path, "w") as f:
+            json.dump({"version": 1, "entries": {"gpt-4|1|Auburn|Vanderbilt": {
+                "model": "gpt-4", "prompt_version": 1, "teams": ["Auburn", "Vanderbilt"],
+                "wins": {"Auburn": 1, "Vanderbilt": 2}, "ties": 1, "samples": 4}, "gpt-4|2|Auburn|Vanderbilt": {
+                "model": "gpt-4", "prompt_version": 2, "teams": ["Auburn", "Vanderbilt"],
+                "wins": {"Auburn": 4, "Vanderbilt": 0}, "ties": 0, "samples": 4}}}, f)
+        battles = BattleVerdictModel(path)
+        # Verdicts from another prompt version are kept apart, not overwritten in file order
+        if BattleVerdictModel(path, prompt_version=2).probability_matrix(["Auburn", "Vanderbilt"])[0, 1] != 1.0:
+            return False
+    
+    elo = EloModel(predictor.elo_ratings)
+    models = [elo, StatLogisticModel(predictor.stats, [3.0, -2.0] + [0.0] * 8), battles,
+              BlendModel([elo, battles], [3, 1]), BlendModel([elo, battles], space="logit")]
+    for model in models:
+        matrix = model.probability_matrix(SEC_TEAMS)
+        if not np.allclose(matrix + matrix.T, 1.0) or matrix.min() < 0 or matrix.max() > 1:
+            print(f"Warning: {model.name} matrix is not a valid win-probability matrix")
+            return False
+    
+    auburn, vanderbilt = SEC_TEAMS.index("Auburn"), SEC_TEAMS.index("Vanderbilt")
+    if battles.probability_matrix(SEC_TEAMS)[auburn, vanderbilt] != 0.375:
+        return False
+    
+    # The predictor's simulators and exact solver read whichever model is set
+    predictor.set_win_model(["elo", "battles"], [3, 1], path)
+    blended = 0.75 * elo.probability_matrix(SEC_TEAMS)[auburn, vanderbilt] + 0.25 * 0.5
+    print(f"Blended Auburn over Vanderbilt: {predictor.calculate_win_probability('Auburn', 'Vanderbilt'):.3f}")
+    if abs(predictor.calculate_win_probability("Auburn", "Vanderbilt") - blended) > 1e-12:
+        return False
+    
+    # The matrix is built once per model and rebuilt when the model or ratings change
+    matrix = predictor.probability_matrix()
+    if predictor.probability_matrix() is not matrix:
+        return False
+    predictor.win_model = None
+    if predictor.probability_matrix() is matrix or predictor.probability_matrix()[auburn, vanderbilt] != \
+            elo.probability_matrix(SEC_TEAMS)[auburn, vanderbilt]:
+        return False
+    predictor.elo_ratings = dict(predictor.elo_ratings, Auburn=1500.0)
+    expected = 1.0 / (1.0 + 10.0 ** ((predictor.elo_ratings["Vanderbilt"] - 1500.0) / 400.0))
+    if abs(predictor.calculate_win_probability("Auburn", "Vanderbilt") - expected) > 1e-12:
+        return False
+    
+    # Teams outside the bracket get the model's default rating
+    return predictor.calculate_win_probability("Auburn", "Gonzaga") == 0.5
+
+def test_rating_uncertainty():
+    """Test per-simulation rating draws: zero noise matches the exact odds, more noise flattens them."""
+    print("\nTesting rating uncertainty...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    exact = predictor.round_probabilities()["Championship"]["Auburn"]
+    
+    iterations = 200000
+    fixed = predictor.simulate_with_uncertainty(iterations, rating_sd=0.0, seed=3)["Auburn"] / iterations
+    noisy = predictor.simulate_with_uncertainty(iterations, rating_sd=150.0, seed=3)["Auburn"] / iterations
+    unperturbed = predictor.simulate_with_uncertainty(iterations, stat_noise=0.0, seed=3)["Auburn"] / iterations
+    perturbed = predictor.simulate_with_uncertainty(iterations, stat_noise=1.0, seed=3)["Auburn"] / iterations
+    print(f"Auburn: exact {exact:.3f}, no noise {fixed:.3f}, sd 150 {noisy:.3f}, "
+          f"stats unperturbed {unperturbed:.3f}, stat noise 1 {perturbed:.3f}")
+    
+    se = np.sqrt(exact * (1 - exact) / iterations)
+    # Unperturbed stats give back the point ratings, so the same draws replay the same tournaments
+    if not (abs(fixed - exact) < 5 * se and noisy < exact - 10 * se and unperturbed == fixed
+            and perturbed < exact - 10 * se):
+        return False
+    
+    # Rating draws only mean something for the Elo model
+    predictor.set_win_model(["stat-logistic"])
+    try:
+        predictor.simulate_with_uncertainty(1000, rating_sd=50.0)
+        return False
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    return True
+
+def test_streaming_engines():
+    """Test that the streaming engines agree with the exact odds."""
+    print("\nTesting streaming simulation engines...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    exact = predictor.round_probabilities()["Championship"]
+    
+    iterations = 1000000
+    for engine in ["numpy"] + (["numba"] if HAVE_NUMBA else []):
+        predictor.championship_counts = {team: 0 for team in SEC_TEAMS}
+        start = time.time()
+        counts = predictor.run_simulation(iterations, engine=engine, seed=11)
+        print(f"{engine}: {iterations} tournaments in {time.time() - start:.2f}s")
+        for team in SEC_TEAMS:
+            se = np.sqrt(exact[team] * (1 - exact[team]) / iterations)
+            if abs(counts[team] / iterations - exact[team]) > 5 * se + 1e-9:
+                print(f"Warning: {engine} odds for {team} are off")
+                return False
+    
+    if HAVE_NUMBA:
+        # The kernel against the NumPy engine in every round, plus its own bookkeeping
+        matrix = predictor.probability_matrix()
+        kernel = simulate_round_counts(SEC_BRACKET, matrix, iterations, seed=5, engine="numba")
+        reference = simulate_round_counts(SEC_BRACKET, matrix, iterations, seed=5, engine="numpy")
+        p = reference / iterations
+        se = np.sqrt(p * (1 - p) * 2 / iterations)
+        if (np.abs(kernel - reference) / iterations > 5 * se + 1e-9).any():
+            print("Warning: numba and numpy round counts disagree")
+            return False
+        games_per_round = np.bincount(SEC_BRACKET.game_round)
+        for n in (0, 1, 100, 1001):
+            small = simulate_round_counts(SEC_BRACKET, matrix, n, seed=5, engine="numba")
+            if not np.array_equal(small.sum(axis=1), games_per_round * n):
+                return False
+        if not np.array_equal(kernel, simulate_round_counts(SEC_BRACKET, matrix, iterations, seed=5,
+                                                            engine="numba")):
+            return False
+    
+    return True
+
+def test_incremental_predictions():
+    """Test that incremental updates match a full rebuild and only redo the affected games."""
+    print("\nTesting incremental recomputation...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    incremental = predictor.incremental_predictions()
+    if not np.allclose(incremental.dist, predictor.advancement_probabilities()):
+        return False
+    
+    # A mid-table change touches one path; a new best team moves the normalization range
+    updates = [({"Kentucky": {"rebounds": 41.0}}, False), ({"Georgia": {"assists": None}}, False),
+               ({"Vanderbilt": {"scoring_offense": 95.0}}, True)]
+    for changes, full in updates:
+        info = incremental.update(changes)
+        rebuilt = IncrementalPredictions(SEC_BRACKET, incremental.stats, incremental.weights)
+        print(f"{info['teams']}: {info['games']} games in {info['seconds'] * 1000:.2f}ms")
+        if info["full"] != full or not np.allclose(incremental.dist, rebuilt.dist, atol=1e-12):
+            return False
+        if not full and info["games"] == SEC_BRACKET.n_games:
+            return False
+    
+    return True
+
+def test_season_data():
+    """Test season files: round trip, fast memory-mapped loads, and no aliasing of the fallback data."""
+    print("\nTesting season data files...")
+    
+    # Changing the predictor's stats must not change the fallback data
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    original = FALLBACK_TEAM_STATS["Auburn"]["rebounds"]
+    predictor.team_stats["Auburn"]["rebounds"] = 99.0
+    fresh = SECTournamentPredictor(use_fallback=True)
+    fresh.extract_data_from_images()
+    if FALLBACK_TEAM_STATS["Auburn"]["rebounds"] != original or fresh.team_stats["Auburn"]["rebounds"] != original:
+        print("Warning: Changing team_stats changed the fallback data")
+        return False
+    
+    with tempfile.TemporaryDirectory() as folder:
+        # 20 seasons of a Division I sized league
+        rng = np.random.default_rng(0)
+        teams = [f"Team {i}" for i in range(364)]
+        for season in range(20):
+            stats = StatsTable(teams)
+            stats.values = rng.normal(70, 5, stats.values.shape)
+            stats.valid = rng.random(stats.valid.shape) > 0.05
+            save_season(os.path.join(folder, f"{2005 + season}.season"), stats, str(2005 + season), "test")
+        
+        start = time.time()
+        loaded = [load_season(os.path.join(folder, f"{2005 + season}.season")) for season in range(20)]
+        elapsed = time.time() - start
+        print(f"Loaded 20 seasons x 364 teams in {elapsed * 1000:.1f}ms")
+        
+        last, metadata = loaded[-1]
+        if not (np.array_equal(last.values, stats.values) and np.array_equal(last.valid, stats.valid)):
+            return False
+        
+        # Copy-on-write: edits stay in memory
+        last.set("Team 0", "rebounds", -1.0)
+        reloaded, _ = load_season(os.path.join(folder, "2024.season"))
+        if reloaded.get("Team 0", "rebounds") == -1.0:
+            return False
+        del loaded, last, reloaded
+        
+        # A season file with gaps loads into the predictor with the gaps set to that season's averages
+        sparse = fallback_stats()
+        sparse.valid[SEC_TEAMS.index("Auburn")] = False
+        path = os.path.join(folder, "sparse.season")
+        save_season(path, sparse, "sparse", "test")
+        predictor.load_season(path)
+        if not predictor.stats.valid.all():
+            return False
+        if not np.allclose(predictor.stats.values[SEC_TEAMS.index("Auburn")], sparse.column_means()):
+            return False
+    
+    # The shipped season file matches fallback_data.py, and a difference is found cell by cell
+    shipped, _ = load_season(FALLBACK_SEASON)
+    if fallback_disagreements(shipped):
+        return False
+    edited = shipped.copy()
+    edited.set("Auburn", "rebounds", 99.0)
+    if fallback_disagreements(edited) != [("Auburn", "rebounds")]:
+        return False
+    watched = {path for path, _, _ in PredictionService(use_fallback=True).input_signature()}
+    if not set(FALLBACK_SEASON_FILES) <= watched:
+        return False
+    
+    return metadata["season"] == "2024" and elapsed < 1.0
+
+def test_conditional_queries():
+    """Test conditional queries on the outcome index against a direct scan of the simulations."""
+    print("\nTesting conditional queries...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    index = predictor.outcome_index(iterations=100001, seed=5)
+    winners = simulate_bracket(SEC_BRACKET, predictor.probability_matrix(), 100001, np.random.default_rng(5))
+    
+    # P(Auburn champion | Alabama reaches the final)
+    alabama, auburn = SEC_TEAMS.index("Alabama"), SEC_TEAMS.index("Auburn")
+    in_final = (winners[:, 12] == alabama) | (winners[:, 13] == alabama)
+    expected = ((winners[:, SEC_BRACKET.final] == auburn) & in_final).sum() / in_final.sum()
+    start = time.time()
+    result = index.probability(index.champion("Auburn"), given=index.reaches("Alabama", "Championship"))
+    print(f"P(Auburn | Alabama in final) = {result['probability']:.4f} "
+          f"from {result['given_count']} simulations in {(time.time() - start) * 1000:.2f}ms")
+    if abs(result["probability"] - expected) > 1e-12 or result["given_count"] != in_final.sum():
+        return False
+    
+    # A first-round team in the semifinals, and its complement
+    upset = index.event_from_spec({"entered": "First Round", "reaches": "Semifinals"})
+    first_round = [SEC_TEAMS.index(team) for team in index.entered("First Round")]
+    if upset.count() != np.isin(winners[:, 8:12], first_round).any(axis=1).sum():
+        return False
+    if (~upset).count() + upset.count() != 100001:
+        return False
+    
+    marginals = index.marginals(given=upset)
+    if abs(sum(entry["probability"] for entry in marginals.values()) - 1.0) > 1e-9:
+        return False
+    
+    # Empty specs match nothing (no teams) or everything (no conditions); a game spec is won_game
+    if index.event_from_spec({"teams": [], "wins": "Championship"}).count() != 0:
+        return False
+    if index.event_from_spec({"entered": "Championship", "reaches": "Championship"}).count() != 0:
+        return False
+    if index.event_from_spec([]).count() != 100001:
+        return False
+    if index.event_from_spec({"team": "Auburn", "game": 14}).count() != index.champion("Auburn").count():
+        return False
+    for bad in ({"team": "Auburn", "game": 15}, {"team": "Auburn", "wins": "Sweet 16"}, "Auburn"):
+        try:
+            index.event_from_spec(bad)
+            return False
+        except ValueError:
+            pass
+    return True
+
+def test_matchup_probabilities():
+    """Test the exact matchup tensor against simulated pairings and its invariants."""
+    print("\nTesting matchup probabilities...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    exact = predictor.matchup_probabilities()
+    simulated = predictor.simulated_matchup_probabilities(iterations=200000, seed=11)
+    worst = np.abs(exact - simulated).max()
+    print(f"Largest gap between exact and simulated matchup odds: {worst:.4f}")
+    if worst > 0.01 or not np.allclose(exact, exact.transpose(0, 2, 1)):
+        return False
+    
+    # Each round's pairings add up to its number of games, and a team meets
+    # someone in a round exactly as often as it reaches that round
+    games = np.bincount(SEC_BRACKET.game_round)
+    if not np.allclose(exact.sum(axis=(1, 2)) / 2, games):
+        return False
+    rounds = predictor.round_probabilities()
+    semifinalists = sum(rounds["Quarterfinals"][team] for team in SEC_TEAMS)
+    auburn = SEC_TEAMS.index("Auburn")
+    if not np.isclose(exact[3, auburn].sum(), rounds["Quarterfinals"]["Auburn"]) or not np.isclose(semifinalists, 4):
+        return False
+    
+    table = predictor.matchup_table()
+    return len(table) == np.count_nonzero(exact) // 2 and table["probability"].iloc[0] == 1.0
+
+class ScriptedOCREngine(OCREngine):
+    """Returns fixed table rows for a whole image and queued rows for single-line re-reads."""
+
+    name = "scripted"
+
+    def __init__(self, rows, rereads):
+        self.rows = rows
+        self.rereads = list(rereads)
+        self.line_reads = 0
+        self.page_reads = 0
+
+    @staticmethod
+    def _line(row, y):
+        return OCRLine(OCRWord(text, confidence, (0, y, 100, y + 15)) for text, confidence in row)
+
+    def image_to_string(self, image, profile=None):
+        return "\n".join(line.text for line in self.image_to_data(image, profile))
+
+    def image_to_data(self, image, profile=None):
+        if profile is not None and profile.psm == 7:
+            self.line_reads += 1
+            return [self._line(self.rereads.pop(0), 0)]
+        self.page_reads += 1
+        return [self._line(row, 20 * i) for i, row in enumerate(self.rows)]
+
+def test_confidence_ocr():
+    """Test that only low-confidence and unmatched rows are re-read, and per-field confidences."""
+    print("\nTesting confidence-aware OCR...")
+    
+    rows = [[("Team", 96), ("TO", 95)]]
+    for team in SEC_TEAMS:
+        value = f"{FALLBACK_TEAM_STATS[team]['turnovers']:.1f}"
+        if team == "Kentucky":
+            rows.append([("Kentucky", 97), ("11.8", 41)])
+        elif team == "Tennessee":
+            rows.append([("Tnnssee", 52), ("l" + value, 38)])
+        else:
+            rows.append([(word, 93) for word in team.split()] + [(value, 91)])
+    kentucky = f"{FALLBACK_TEAM_STATS['Kentucky']['turnovers']:.1f}"
+    tennessee = f"{FALLBACK_TEAM_STATS['Tennessee']['turnovers']:.1f}"
+    engine = ScriptedOCREngine(rows, [[("Kentucky", 96), (kentucky, 90)], [("Tennessee", 70), (tennessee, 88)]])
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "turnovers.png")
+        Image.new("L", (200, 400), 255).save(path)
+        predictor = SECTournamentPredictor(preprocess_ocr=False, ocr_engine=engine)
+        predictor._process_image(path, "turnovers.png")
+        
+        # ocr_debug reads images through the same extraction
+        clean = ScriptedOCREngine([[(team, 95), (f"{FALLBACK_TEAM_STATS[team]['turnovers']:.1f}", 95)]
+                                   for team in SEC_TEAMS], [])
+        if len(read_stat_image(path, engine=clean)) != len(SEC_TEAMS):
+            return False
+    
+    # Two rows re-read, the rest of the table read once
+    print(f"Single-line re-reads: {engine.line_reads}")
+    if engine.line_reads != 2 or predictor.stats.valid[:, predictor.stats.field_index["turnovers"]].sum() != 16:
+        return False
+    if predictor.stats.get("Kentucky", "turnovers") != float(kentucky) \
+            or predictor.confidence.get("Kentucky", "turnovers") != 90:
+        return False
+    
+    # A re-read that is still uncertain is kept and flagged
+    return predictor.low_confidence_stats() == [("Tennessee", "turnovers", 70.0)]
+
+def test_prediction_watcher():
+    """Test that the watcher re-reads only changed images and matches a full rebuild."""
+    print("\nTesting watch mode...")
+    
+    rows = [[(team, 95), (f"{FALLBACK_TEAM_STATS[team]['turnovers']:.1f}", 95)] for team in SEC_TEAMS]
+    engine = ScriptedOCREngine(rows, [])
+    with tempfile.TemporaryDirectory() as folder:
+        stats_folder = os.path.join(folder, "stats")
+        os.makedirs(stats_folder)
+        for name in ("turnovers.png", "combined-team-rebounds.png"):
+            Image.new("L", (200, 400), 255).save(os.path.join(stats_folder, name))
+        watcher = PredictionWatcher(stats_folder, output_path=os.path.join(folder, "odds.json"),
+                                    chart_path=os.path.join(folder, "odds.png"),
+                                    preprocess_ocr=False, ocr_engine=engine)
+        watcher.build()
+        watcher.write_outputs()
+        
+        # Touching a file without changing it does no work
+        path = os.path.join(stats_folder, "turnovers.png")
+        os.utime(path, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+        reads = engine.page_reads
+        if watcher.changed_inputs() or engine.page_reads != reads:
+            return False
+        
+        # A corrected screenshot is the only image read again
+        rows[SEC_TEAMS.index("Kentucky")][1] = ("16.5", 95)
+        Image.new("L", (200, 401), 255).save(path)
+        changed = watcher.changed_inputs()
+        summary = watcher.apply(changed)
+        watcher.write_outputs()
+        print(f"Updated {summary['teams']} from {summary['inputs']} in {summary['seconds'] * 1000:.1f}ms")
+        if changed != [path] or engine.page_reads != reads + 1 or "Kentucky" not in summary["teams"]:
+            return False
+        
+        with open(os.path.join(folder, "odds.json")) as f:
+            written = json.load(f)
+        expected = IncrementalPredictions(SEC_BRACKET, watcher.predictor.stats, watcher.incremental.weights)
+        if watcher.predictor.stats.get("Kentucky", "turnovers") != 16.5:
+            return False
+        return all(abs(written["championship"][team] - p) < 1e-12
+                   for team, p in expected.championship_probabilities().items())
+
+def test_distributed_simulation():
+    """Test the coordinator against local workers, including a lost worker and a reissued unit."""
+    print("\nTesting distributed simulation...")
+    
+    scenarios = sweep_scenarios(fallback_stats(), {"default": COMPOSITE_WEIGHTS}, [0.0, 40.0], SEC_BRACKET)
+    
+    # A unit whose lease runs out goes to a second worker; the late copy is not counted
+    coordinator = Coordinator(scenarios[:1], blocks=2, block_size=500, blocks_per_unit=2, lease=0.05, port=0)
+    coordinator.handle("a", {"type": "hello"})
+    first = coordinator.handle("a", {"type": "next"})
+    time.sleep(0.1)
+    second = coordinator.handle("b", {"type": "next"})
+    counts = sum(block_counts(scenarios[0], SEC_BRACKET, 0, block, 500, 2025) for block in range(2))
+    result = {"type": "result", "scenario": 0, "start": 0, "stop": 2, "counts": counts.tolist()}
+    coordinator.handle("b", result)
+    coordinator.handle("a", result)
+    coordinator.server.server_close()
+    if first != second or coordinator.counters["duplicates"] != 1 or not (coordinator.totals[0] == counts).all():
+        return False
+    
+    # Three worker processes, one of which disappears holding a unit
+    coordinator = Coordinator(scenarios, blocks=12, block_size=2000, blocks_per_unit=3, lease=30.0, port=0)
+    port = str(coordinator.address[1])
+    results = {}
+    thread = threading.Thread(target=lambda: results.update(table=coordinator.run(timeout=120)))
+    thread.start()
+    command = [sys.executable, "distributed.py", "worker", "--port", port]
+    folder = os.path.dirname(os.path.abspath(__file__))
+    workers = [subprocess.Popen(command + ["--fail-after", "1"], cwd=folder)]
+    deadline = time.time() + 60
+    while coordinator.counters["issued"] == 0 and time.time() < deadline:
+        time.sleep(0.05)
+    workers += [subprocess.Popen(command, cwd=folder) for _ in range(2)]
+    thread.join()
+    for worker in workers:
+        worker.wait(timeout=60)
+    print(f"Coordinator counters: {coordinator.counters}")
+    
+    expected = [sum(block_counts(scenario, SEC_BRACKET, s, block, 2000, 2025) for block in range(12))
+                for s, scenario in enumerate(scenarios)]
+    table = results["table"]
+    return (coordinator.counters["lost"] >= 1
+            and all((total == counts).all() for total, counts in zip(coordinator.totals, expected))
+            and (table["iterations"] == 24000).all())
+
+def test_backtest():
+    """Test backtest scores on seasons played out under a known model."""
+    print("\nTesting backtesting...")
+    
+    rng = np.random.default_rng(8)
+    base = fallback_stats()
+    seasons = []
+    for k in range(30):
+        stats = base.copy()
+        stats.values = stats.values * (1 + 0.03 * rng.standard_normal(stats.values.shape))
+        ratings = normalize_ratings(1500 + stats.filled(0.0) @ COMPOSITE_WEIGHTS)
+        matrix = win_probability_matrix(ratings)
+        winners = simulate_bracket(SEC_BRACKET, matrix, 1, rng)[0]
+        # A regular season of neutral-floor games played under the same ratings, for the fitted model
+        home, away = rng.integers(0, len(SEC_TEAMS), (2, 400))
+        home, away = home[home != away], away[home != away]
+        home_won = rng.random(len(home)) < matrix[home, away]
+        results = pd.DataFrame({"Home": np.array(SEC_TEAMS)[home], "Away": np.array(SEC_TEAMS)[away],
+                                "Home Score": np.where(home_won, 75, 65), "Away Score": np.where(home_won, 65, 75),
+                                "Neutral": True})
+        seasons.append(BacktestSeason(f"season-{k}", SEC_BRACKET, stats, [SEC_TEAMS[t] for t in winners], results))
+    
+    configurations = [{"name": "true"}, {"name": "coin flip", "weights": [0.0] * len(COMPOSITE_WEIGHTS)}]
+    configurations += [{"name": "elo model", "win_model": "elo"}, {"name": "fitted", "win_model": ["fitted"]},
+                       {"name": "blend", "win_model": ["elo:1", "stat-logistic:1"], "blend_space": "logit"}]
+    configurations += [{"name": f"scale {scale}", "scale": scale} for scale in range(100, 1100, 10)]
+    start = time.time()
+    summary, calibration = run_backtest(seasons, configurations)
+    elapsed = time.time() - start
+    print(f"Scored {len(configurations)} configurations on {len(seasons)} seasons in {elapsed:.2f}s")
+    
+    scores = summary.set_index(["configuration", "level"])
+    # A coin flip scores ln 2 and 0.25 on every game; the true model does better at every level
+    if not np.isclose(scores.loc[("coin flip", "game"), "log_loss"], np.log(2)) \
+            or not np.isclose(scores.loc[("coin flip", "game"), "brier"], 0.25):
+        return False
+    if not all(scores.loc[("true", level), "log_loss"] < scores.loc[("coin flip", level), "log_loss"]
+               for level in LEVELS):
+        return False
+    # Win models built by name: elo is the default path exactly, and a fit on the season's games beats a coin flip
+    if not np.allclose(scores.loc["elo model", "log_loss"], scores.loc["true", "log_loss"]):
+        return False
+    print(f"Game log loss: true {scores.loc[('true', 'game'), 'log_loss']:.4f}, "
+          f"fitted {scores.loc[('fitted', 'game'), 'log_loss']:.4f}, blend {scores.loc[('blend', 'game'), 'log_loss']:.4f}")
+    if not scores.loc[("fitted", "game"), "log_loss"] < np.log(2):
+        return False
+    
+    counts = calibration.groupby(["configuration", "level"])["count"].sum()
+    return (counts == scores["predictions"].reindex(counts.index)).all() and elapsed < 10
+
+def test_tournament_dynamics():
+    """Test in-tournament dynamics: none matches the static model, fatigue favours teams with byes."""
+    print("\nTesting in-tournament rating dynamics...")
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    ratings = np.array([predictor.elo_ratings[team] for team in SEC_TEAMS])
+    
+    iterations = 200000
+    uniforms = np.random.default_rng(4).random((iterations, SEC_BRACKET.n_games))
+    static = play_bracket_ratings(SEC_BRACKET, np.tile(ratings, (iterations, 1)), uniforms)
+    if not (play_bracket_dynamic(SEC_BRACKET, ratings, uniforms) == static).all():
+        return False
+    
+    # Per-simulation starting ratings give the same tournaments as shared ones
+    tired = play_bracket_dynamic(SEC_BRACKET, ratings, uniforms, k_factor=20, fatigue=30)
+    if not (play_bracket_dynamic(SEC_BRACKET, np.tile(ratings, (iterations, 1)), uniforms,
+                                 k_factor=20, fatigue=30) == tired).all():
+        return False
+    
+    matrix = win_probability_matrix(ratings)
+    start = time.time()
+    play_bracket(SEC_BRACKET, matrix, uniforms)
+    static_time = time.time() - start
+    start = time.time()
+    play_bracket_dynamic(SEC_BRACKET, ratings, uniforms, k_factor=20, fatigue=30)
+    dynamic_time = time.time() - start
+    print(f"Static {static_time:.3f}s, dynamic {dynamic_time:.3f}s for {iterations} tournaments")
+    
+    # Quarterfinal entrants play at most three games, first-round entrants up to five
+    byes = [SEC_BRACKET.team_index[team] for team in QUARTERFINAL_TEAMS]
+    bye_share = lambda winners: np.isin(winners[:, SEC_BRACKET.final], byes).mean()
+    print(f"Title share of quarterfinal entrants: static {bye_share(static):.3f}, "
+          f"fatigue {bye_share(tired):.3f}")
+    
+    counts = predictor.simulate_with_dynamics(20000, k_factor=20, fatigue=30, seed=4)
+    if not (bye_share(tired) > bye_share(static) + 0.005 and sum(counts.values()) == 20000
+            and np.isclose(sum(predictor.dynamic_round_probabilities["Championship"].values()), 1.0)):
+        return False
+    
+    # Dynamics move Elo ratings, so other win models are refused
+    predictor.set_win_model(["stat-logistic"])
+    try:
+        predictor.simulate_with_dynamics(1000, k_factor=20)
+        return False
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    
+    # The CLI refuses flags that the chosen mode would silently ignore
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sec_tournament_predictor.py")
+    for flags in (["--k-factor", "20", "--stat-noise"], ["--game-model", "score", "--win-model", "elo"],
+                  ["--game-model", "score", "--rating-sd", "50"], ["--sampling", "control", "--rating-sd", "50"],
+                  ["--watch", "--seed", "1"], ["--serve", "--win-model", "fitted"], ["--watch", "--sampling", "plain"]):
+        run = subprocess.run([sys.executable, script, "--fallback"] + flags, capture_output=True, text=True)
+        print(f"{' '.join(flags)}: {run.stderr.strip().splitlines()[-1]}")
+        if run.returncode != 2 or "cannot be combined" not in run.stderr:
+            return False
+    
+    # A zero rating spread is still a rating draw, in validation and in the simulation run
+    with tempfile.TemporaryDirectory() as folder:
+        rejected = subprocess.run([sys.executable, script, "--fallback", "--rating-sd", "0", "--engine", "numpy"],
+                                  capture_output=True, text=True, cwd=folder)
+        run = subprocess.run([sys.executable, script, "--fallback", "--rating-sd", "0", "--iterations", "200",
+                              "--no-result-cache"], capture_output=True, text=True, cwd=folder)
+    return rejected.returncode == 2 and run.returncode == 0 and "with rating uncertainty" in run.stdout
+
+def test_result_cache():
+    """Test memoized results: same inputs load the stored counts, unseeded runs and changed inputs miss, old entries are evicted."""
+    print("\nTesting the result cache...")
+    
+    if canonical_key({"a": 1, "b": [0.5, np.arange(3)]}) != canonical_key({"b": (0.5, np.arange(3)), "a": 1}) \
+            or canonical_key({"a": 1}) == canonical_key({"a": 1.0}):
+        return False
+    
+    predictor = SECTournamentPredictor(use_fallback=True)
+    predictor.extract_data_from_images()
+    predictor.initialize_elo_ratings()
+    with tempfile.TemporaryDirectory() as folder:
+        cache = predictor.use_result_cache(folder)
+        
+        def run(seed, iterations=500000):
+            predictor.championship_counts = {team: 0 for team in SEC_TEAMS}
+            start = time.perf_counter()
+            counts = predictor.run_simulation(iterations, engine="numpy", seed=seed)
+            return dict(counts), time.perf_counter() - start
+        
+        first, simulated = run(3)
+        second, loaded = run(3)
+        print(f"Simulated in {simulated * 1000:.0f}ms, loaded in {loaded * 1000:.1f}ms")
+        if second != first or loaded > 0.05 or len(cache.entries()) != 1:
+            return False
+        
+        # Unseeded runs are fresh draws: never stored
+        run(None, iterations=1000)
+        if len(cache.entries()) != 1:
+            return False
+        
+        # A different seed or stat is a different result
+        run(4)
+        predictor.stats.set("Auburn", "rebounds", 30.0)
+        run(3)
+        if len(cache.entries()) != 3:
+            return False
+        
+        predictor.recompute = True
+        recomputed, recompute_time = run(3)
+        if recomputed != second or recompute_time < 5 * loaded or len(cache.entries()) != 3:
+            return False
+        
+        # Keep room for about two results; the least recently read one goes first
+        size = cache.entries()[-1][1]
+        cache.max_bytes = int(2.5 * size)
+        predictor.recompute = False
+        oldest = cache.entries()[0][2]
+        os.utime(oldest, ns=(0, 0))
+        middle = cache.entries()[1][2]
+        cache.get(os.path.basename(middle)[:-4])
+        cache.evict()
+        remaining = [path for _, _, path in cache.entries()]
+        return len(remaining) == 2 and oldest not in remaining and middle in remaining
+
 def main():
     """Run all tests."""
     print("SEC Tournament Predictor Test Suite")
@@ -119,7 +1024,26 @@ def main():
         test_data_extraction,
         test_elo_rating_initialization,
         test_game_simulation,
-        test_tournament_simulation
+        test_tournament_simulation,
+        test_stats_table,
+        test_rating_fit,
+        test_prediction_service,
+        test_batch_predict,
+        test_sampling_methods,
+        test_score_model,
+        test_win_models,
+        test_rating_uncertainty,
+        test_streaming_engines,
+        test_incremental_predictions,
+        test_season_data,
+        test_conditional_queries,
+        test_matchup_probabilities,
+        test_confidence_ocr,
+        test_prediction_watcher,
+        test_distributed_simulation,
+        test_backtest,
+        test_tournament_dynamics,
+        test_result_cache
     ]
     
     results = []
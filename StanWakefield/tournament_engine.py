@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Tournament structure and exact advancement probabilities.
+
+A Bracket is a list of games in playing order. Each side of a game is either
+a team entering there or the winner of an earlier game, which covers byes
+like the SEC format as well as plain power-of-two brackets. Given a pairwise
+win-probability matrix, the probability of every team winning every game
+follows exactly from one pass over the games, since the two sides of a game
+come from disjoint parts of the bracket:
+
+    P(t wins g) = P(t on side A) * sum_u P(u on side B) * M[t, u]   (and vice versa)
+"""
+
+import json
+import numpy as np
+
+NOT_FED = -1
+
+
+class Bracket:
+    """Single-elimination bracket over a fixed list of teams."""
+
+    def __init__(self, games, round_names, teams):
+        """
+        games is a list of (round, side_a, side_b) in playing order, where a
+        side is a team name or the index of an earlier game whose winner
+        plays here. teams fixes the team order used by probability matrices.
+        """
+        self.teams = list(teams)
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.round_names = list(round_names)
+        self.game_round = np.array([game[0] for game in games], dtype=np.int64)
+
+        # side_team holds the team entering on a side, side_game the game feeding it
+        self.side_team = np.full((len(games), 2), NOT_FED, dtype=np.int64)
+        self.side_game = np.full((len(games), 2), NOT_FED, dtype=np.int64)
+        for g, (_, *sides) in enumerate(games):
+            for s, side in enumerate(sides):
+                if isinstance(side, str):
+                    self.side_team[g, s] = self.team_index[side]
+                elif 0 <= side < g:
+                    self.side_game[g, s] = side
+                else:
+                    raise ValueError(f"Game {g} is fed by game {side}, which is not played before it")
+
+    @classmethod
+    def from_sec_format(cls, first_round, second_round_teams, quarterfinal_teams, teams):
+        """Build the SEC bracket: first round, two rounds with byes, semifinals and final."""
+        games = [(0, a, b) for a, b in first_round]
+        games += [(1, i, team) for i, team in enumerate(second_round_teams)]
+        games += [(2, 4 + i, team) for i, team in enumerate(quarterfinal_teams)]
+        games += [(3, 8, 9), (3, 10, 11), (4, 12, 13)]
+        round_names = ["First Round", "Second Round", "Quarterfinals", "Semifinals", "Championship"]
+        return cls(games, round_names, teams)
+
+    @classmethod
+    def from_dict(cls, data, teams=None):
+        """
+        Build a bracket from a dict like
+        {"rounds": [...], "games": [{"round": 0, "sides": ["Texas", "Vanderbilt"]}, ...]}.
+        Sides that are integers refer to earlier games.
+        """
+        games = [(game["round"], *game["sides"]) for game in data["games"]]
+        if teams is None:
+            teams = data.get("teams") or sorted({side for game in games for side in game[1:]
+                                                 if isinstance(side, str)})
+        return cls(games, data["rounds"], teams)
+
+    @classmethod
+    def load(cls, path, teams=None):
+        """Load a bracket spec from a JSON file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f), teams)
+
+    def to_dict(self):
+        """Return the bracket as a JSON-friendly dict."""
+        games = []
+        for g in range(self.n_games):
+            sides = [self.teams[self.side_team[g, s]] if self.side_team[g, s] != NOT_FED
+                     else int(self.side_game[g, s]) for s in range(2)]
+            games.append({"round": int(self.game_round[g]), "sides": sides})
+        return {"rounds": self.round_names, "teams": self.teams, "games": games}
+
+    @property
+    def n_games(self):
+        return len(self.game_round)
+
+    @property
+    def n_teams(self):
+        return len(self.teams)
+
+    @property
+    def final(self):
+        """Index of the championship game."""
+        return self.n_games - 1
+
+    def team_path(self, team):
+        """Games team can play in: the game it enters and every game that game feeds, in order."""
+        t = self.team_index[team]
+        games = [int(g) for g in np.flatnonzero((self.side_team == t).any(axis=1))]
+        while games:
+            later = np.flatnonzero((self.side_game == games[-1]).any(axis=1))
+            if len(later) == 0:
+                break
+            games.append(int(later[0]))
+        return games
+
+    def entrants(self):
+        """Teams that appear in the bracket, in team order."""
+        entered = np.zeros(self.n_teams, dtype=bool)
+        entered[self.side_team[self.side_team != NOT_FED]] = True
+        return [team for team, ok in zip(self.teams, entered) if ok]
+
+
+def win_probability_matrix(ratings, scale=400.0):
+    """Return M[i, j] = P(team i beats team j) under the Elo formula."""
+    ratings = np.asarray(ratings, dtype=float)
+    return 1.0 / (1.0 + 10.0 ** ((ratings[None, :] - ratings[:, None]) / scale))
+
+
+def advancement_probabilities(bracket, matrix, locked=None):
+    """
+    Return a (games x teams) array where [g, t] is the probability that team t wins game g.
+
+    locked maps game index -> team name for results that are already known or
+    assumed ("what if"). A locked winner also wins every earlier game on its
+    path (see lock_paths), so a locked champion is certain to reach each round.
+    """
+    dist = np.zeros((bracket.n_games, bracket.n_teams))
+    return update_advancement(bracket, matrix, dist, range(bracket.n_games), lock_paths(bracket, locked))
+
+
+def lock_paths(bracket, locked):
+    """
+    Extend locked (game index -> team name) so that each locked winner also
+    wins every game it plays on the way to its locked game. Raises ValueError
+    when a team cannot play in its locked game or two locks disagree.
+    """
+    expanded = {}
+    for g, team in sorted((locked or {}).items()):
+        path = bracket.team_path(team)
+        if g not in path:
+            raise ValueError(f"{team} cannot play in game {g}")
+        for earlier in path[:path.index(g) + 1]:
+            if expanded.get(earlier, team) != team:
+                raise ValueError(f"Game {earlier} cannot be won by both {expanded[earlier]} and {team}")
+            expanded[earlier] = team
+    return expanded
+
+
+def update_advancement(bracket, matrix, dist, games, locked=None):
+    """
+    Recompute the rows of dist (see advancement_probabilities) for the given
+    games, in playing order, in place. Games a change can reach are enough:
+    a team's row and column of the matrix only matter in the games it can play.
+    """
+    locked = locked or {}
+    for g in sorted(games):
+        sides = side_probabilities(bracket, dist, g)
+        dist[g] = 0.0
+        if g in locked:
+            t = bracket.team_index[locked[g]]
+            if sides[0, t] == 0.0 and sides[1, t] == 0.0:
+                raise ValueError(f"{locked[g]} cannot play in game {g}")
+            dist[g, t] = 1.0
+            continue
+
+        dist[g] = sides[0] * (matrix @ sides[1]) + sides[1] * (matrix @ sides[0])
+
+    return dist
+
+
+def side_probabilities(bracket, dist, g):
+    """Return a (2 x teams) array: the probability of each team being on each side of game g."""
+    sides = np.zeros((2, bracket.n_teams))
+    for s in range(2):
+        if bracket.side_team[g, s] != NOT_FED:
+            sides[s, bracket.side_team[g, s]] = 1.0
+        else:
+            sides[s] = dist[bracket.side_game[g, s]]
+    return sides
+
+
+def matchup_probabilities(bracket, dist):
+    """
+    Return a symmetric (rounds x teams x teams) array where [r, i, j] is the
+    probability that teams i and j meet in round r. The two sides of a game
+    come from disjoint parts of the bracket, so the pairing probability is
+    the product of the side probabilities.
+    """
+    meetings = np.zeros((len(bracket.round_names), bracket.n_teams, bracket.n_teams))
+    for g in range(bracket.n_games):
+        a, b = side_probabilities(bracket, dist, g)
+        pairing = np.outer(a, b)
+        meetings[bracket.game_round[g]] += pairing + pairing.T
+    return meetings
+
+
+def simulated_matchup_counts(bracket, winners):
+    """Return a symmetric (rounds x teams x teams) count of the pairings played in simulated tournaments."""
+    n_rounds, n_teams = len(bracket.round_names), bracket.n_teams
+    counts = np.zeros(n_rounds * n_teams * n_teams, dtype=np.int64)
+    for g in range(bracket.n_games):
+        a, b = game_sides(bracket, winners, g)
+        cell = (bracket.game_round[g] * n_teams + a) * n_teams + b
+        counts += np.bincount(cell, minlength=len(counts))
+    counts = counts.reshape(n_rounds, n_teams, n_teams)
+    return counts + counts.transpose(0, 2, 1)
+
+
+def round_probabilities(bracket, dist):
+    """Return a (rounds x teams) array of the probability each team wins its game in each round."""
+    table = np.zeros((len(bracket.round_names), bracket.n_teams))
+    np.add.at(table, bracket.game_round, dist)
+    return table
+
+
+def game_sides(bracket, winners, g):
+    """Return the teams on each side of game g in every simulation, given the earlier winners."""
+    return tuple(np.full(len(winners), bracket.side_team[g, s]) if bracket.side_team[g, s] != NOT_FED
+                 else winners[:, bracket.side_game[g, s]] for s in range(2))
+
+
+def play_bracket(bracket, matrix, uniforms, fixed=None):
+    """
+    Play every game of the bracket for each row of uniforms (simulations x games).
+    Side A wins game g when its uniform is below M[a, b]. fixed maps game index
+    to an array of winners to use instead of playing that game.
+    """
+    fixed = fixed or {}
+    winners = np.empty(uniforms.shape, dtype=np.int32)
+    for g in range(bracket.n_games):
+        if g in fixed:
+            winners[:, g] = fixed[g]
+            continue
+        a, b = game_sides(bracket, winners, g)
+        winners[:, g] = np.where(uniforms[:, g] < matrix[a, b], a, b)
+    return winners
+
+
+def play_bracket_ratings(bracket, ratings, uniforms, scale=400.0):
+    """
+    Like play_bracket, but every simulation has its own ratings: ratings is a
+    (simulations x teams) array and each game uses the Elo formula on its row.
+    """
+    # Elo odds are a ratio of strengths 10^(rating / scale), so take the powers once
+    strength = (10.0 ** (np.asarray(ratings, dtype=float) / scale)).ravel()
+    offset = np.arange(len(uniforms)) * ratings.shape[1]
+    winners = np.empty(uniforms.shape, dtype=np.int32)
+    for g in range(bracket.n_games):
+        a, b = game_sides(bracket, winners, g)
+        strength_a, strength_b = strength[offset + a], strength[offset + b]
+        winners[:, g] = np.where(uniforms[:, g] * (strength_a + strength_b) < strength_a, a, b)
+    return winners
+
+
+def bracket_stages(bracket):
+    """
+    Split the games into stages that can be played at the same time: runs of
+    consecutive games of one round, none fed by another game in the run.
+    Returns a list of slices; for the SEC bracket these are its five rounds.
+    """
+    stages, start = [], 0
+    for g in range(1, bracket.n_games + 1):
+        if g == bracket.n_games or bracket.game_round[g] != bracket.game_round[start] \
+                or (bracket.side_game[g] >= start).any():
+            stages.append(slice(start, g))
+            start = g
+    return stages
+
+
+def play_bracket_dynamic(bracket, ratings, uniforms, scale=400.0, k_factor=0.0, fatigue=0.0):
+    """
+    Like play_bracket_ratings, but ratings move during the tournament: every
+    winner gains k_factor * (1 - its win probability) Elo points, and a team
+    plays each game fatigue points below its rating for every game it has
+    already played in the tournament. ratings is a (teams,) array or a
+    (simulations x teams) one.
+
+    Only winners play on, so the state each simulation carries is the
+    strength and games played of the winner of every game so far; a stage
+    (round) of games is played for every simulation at once from its
+    feeders' rows. State is kept games x simulations so each stage is a
+    contiguous block.
+    """
+    strength = 10.0 ** (np.asarray(ratings, dtype=float) / scale)
+    # Strength multiplier after 0, 1, 2, ... games played
+    tired = 10.0 ** (-fatigue * np.arange(bracket.n_games + 1) / scale)
+    boost = k_factor * np.log(10.0) / scale
+    draws = np.ascontiguousarray(uniforms.T)
+    winners = np.empty(draws.shape, dtype=np.int32)
+    won_strength = np.empty(draws.shape)
+    won_played = np.empty(draws.shape, dtype=np.int8)
+    for stage in bracket_stages(bracket):
+        sides = []
+        for s in range(2):
+            team, feeder = bracket.side_team[stage, s], bracket.side_game[stage, s]
+            entering = (team != NOT_FED)[:, None]
+            if entering.all():
+                fresh = strength[..., team].T if strength.ndim == 2 else strength[team, None]
+                sides.append((team[:, None], fresh, np.zeros((1, 1), dtype=np.int8)))
+            elif not entering.any():
+                sides.append((winners[feeder], won_strength[feeder], won_played[feeder]))
+            else:
+                fresh = strength[..., np.maximum(team, 0)].T if strength.ndim == 2 \
+                    else strength[np.maximum(team, 0), None]
+                feeder = np.maximum(feeder, 0)
+                sides.append((np.where(entering, team[:, None], winners[feeder]),
+                              np.where(entering, fresh, won_strength[feeder]),
+                              np.where(entering, 0, won_played[feeder]).astype(np.int8)))
+        (a, strength_a, played_a), (b, strength_b, played_b) = sides
+        effective_a, effective_b = strength_a, strength_b
+        if fatigue:
+            effective_a, effective_b = strength_a * tired[played_a], strength_b * tired[played_b]
+        # Same comparison as play_bracket_ratings, so no dynamics gives the same winners
+        total = effective_a + effective_b
+        a_wins = draws[stage] * total < effective_a
+        winners[stage] = np.where(a_wins, a, b)
+        won_strength[stage] = np.where(a_wins, strength_a, strength_b)
+        won_played[stage] = np.where(a_wins, played_a, played_b) + 1
+        if k_factor:
+            # A winner's rating rises by how unlikely its win was; the loser is out
+            won_strength[stage] *= np.exp(boost * np.where(a_wins, effective_b, effective_a) / total)
+    return np.ascontiguousarray(winners.T)
+
+
+def simulate_bracket(bracket, matrix, iterations, rng=None):
+    """Return an (iterations x games) array holding the index of the team that won each game."""
+    rng = rng if rng is not None else np.random.default_rng()
+    return play_bracket(bracket, matrix, rng.random((iterations, bracket.n_games)))
+
+
+def simulated_round_probabilities(bracket, winners):
+    """Return the (rounds x teams) share of simulations in which each team won its game in each round."""
+    table = np.zeros((len(bracket.round_names), bracket.n_teams))
+    for g in range(bracket.n_games):
+        table[bracket.game_round[g]] += np.bincount(winners[:, g], minlength=bracket.n_teams)
+    return table / len(winners)
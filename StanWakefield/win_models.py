@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Win-probability models for the SEC Tournament Predictor.
+
+A WinModel's only job is to turn a list of teams into a pairwise matrix
+M[i, j] = P(team i beats team j). Simulators and exact solvers read that
+matrix and nothing else, so a model is evaluated once per run rather than
+once per simulated game, and models can be swapped or blended freely.
+"""
+
+import os
+import json
+from abc import ABC, abstractmethod
+import numpy as np
+from rating_fit import load_game_results, fit_bradley_terry
+from tournament_engine import win_probability_matrix
+
+ELO_SCALE = 400.0
+# The battles model reads verdicts from DanielChurch/predictions.py's current MODEL and PROMPT_VERSION
+BATTLE_MODEL = "gpt-4"
+BATTLE_PROMPT_VERSION = 1
+
+
+class WinModel(ABC):
+    """Interface for anything that can produce a pairwise win-probability matrix."""
+
+    name = None
+
+    @abstractmethod
+    def probability_matrix(self, teams):
+        """Return a (teams x teams) array of P(row team beats column team)."""
+
+
+class EloModel(WinModel):
+    """Elo formula on a dict of team ratings; unrated teams get 1500."""
+
+    name = "elo"
+
+    def __init__(self, ratings, scale=ELO_SCALE, default=1500.0):
+        self.ratings = dict(ratings)
+        self.scale = scale
+        self.default = default
+
+    def probability_matrix(self, teams):
+        return win_probability_matrix([self.ratings.get(team, self.default) for team in teams], self.scale)
+
+
+class StatLogisticModel(WinModel):
+    """
+    Logistic model on a weighted sum of team stats. Unlike the stat-based Elo
+    ratings, the composite is not min-max normalized, so the gap between two
+    teams depends only on their stats.
+    """
+
+    name = "stat-logistic"
+
+    def __init__(self, stats, weights, scale=ELO_SCALE / np.log(10)):
+        self.stats = stats
+        self.weights = np.asarray(weights, dtype=float)
+        self.scale = scale
+
+    def probability_matrix(self, teams):
+        composite = self.stats.filled(0.0) @ self.weights
+        by_team = dict(zip(self.stats.teams, composite))
+        values = np.array([by_team.get(team, composite.mean()) for team in teams])
+        return 1.0 / (1.0 + np.exp(-(values[:, None] - values[None, :]) / self.scale))
+
+
+class BradleyTerryModel(WinModel):
+    """Ratings fitted on game results (see rating_fit.py), on a neutral floor."""
+
+    name = "fitted"
+
+    def __init__(self, results, home_advantage=True, margin_weighted=False):
+        if isinstance(results, str):
+            results = load_game_results(results)
+        ratings, self.home_edge = fit_bradley_terry(results, home_advantage=home_advantage,
+                                                    margin_weighted=margin_weighted)
+        self.elo = EloModel(ratings)
+
+    def probability_matrix(self, teams):
+        return self.elo.probability_matrix(teams)
+
+
+class BattleVerdictModel(WinModel):
+    """
+    Win rates from a cached set of mascot battle verdicts, as written by
+    DanielChurch/battle_cache.py. Only verdicts from the given model and
+    prompt version are read (None reads any), since the cache keeps every
+    version's entries side by side. Ties count as half a win and pairs that
+    were never asked are a coin flip.
+    """
+
+    name = "battles"
+
+    def __init__(self, path, model=BATTLE_MODEL, prompt_version=BATTLE_PROMPT_VERSION):
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f).get("entries", {})
+        else:
+            print(f"Warning: Battle cache '{path}' not found; every battle is a coin flip.")
+        self.model = model
+        self.prompt_version = prompt_version
+
+    def probability_matrix(self, teams):
+        index = {team: i for i, team in enumerate(teams)}
+        matrix = np.full((len(teams), len(teams)), 0.5)
+        for entry in self.entries.values():
+            if self.model is not None and entry["model"] != self.model:
+                continue
+            if self.prompt_version is not None and entry["prompt_version"] != self.prompt_version:
+                continue
+            first, second = entry["teams"]
+            if first not in index or second not in index or entry["samples"] == 0:
+                continue
+            rate = (entry["wins"][first] + entry["ties"] / 2) / entry["samples"]
+            matrix[index[first], index[second]] = rate
+            matrix[index[second], index[first]] = 1.0 - rate
+        return matrix
+
+
+class BlendModel(WinModel):
+    """
+    Weighted average of several models, either of their probabilities or of
+    their log-odds (which keeps a confident model's edge when blended with a
+    coin flip).
+    """
+
+    name = "blend"
+
+    def __init__(self, models, weights=None, space="probability"):
+        if space not in ("probability", "logit"):
+            raise ValueError(f"Unknown blend space '{space}'; choose probability or logit")
+        self.models = list(models)
+        weights = np.ones(len(self.models)) if weights is None else np.asarray(weights, dtype=float)
+        self.weights = weights / weights.sum()
+        self.space = space
+
+    def probability_matrix(self, teams):
+        matrices = np.array([model.probability_matrix(teams) for model in self.models])
+        if self.space == "probability":
+            return np.tensordot(self.weights, matrices, axes=1)
+
+        clipped = np.clip(matrices, 1e-9, 1 - 1e-9)
+        log_odds = np.tensordot(self.weights, np.log(clipped) - np.log1p(-clipped), axes=1)
+        return 1.0 / (1.0 + np.exp(-log_odds))
+
+
+WIN_MODELS = ["elo", "stat-logistic", "fitted", "battles"]
+
+
+def parse_win_model_specs(specs):
+    """Split "name[:weight]" specs, as given to --win-model, into (names, weights)."""
+    if isinstance(specs, str):
+        specs = [specs]
+    parts = [spec.split(":", 1) + ["1"] for spec in specs]
+    return [part[0] for part in parts], [float(part[1]) for part in parts]
+
+
+def build_win_model(names, weights=None, blend_space="probability", ratings=None, stats=None,
+                    stat_weights=None, results=None, battle_cache=None, scale=ELO_SCALE,
+                    battle_model=BATTLE_MODEL, battle_prompt_version=BATTLE_PROMPT_VERSION):
+    """
+    Build a win model by name: elo (on ratings, with scale), stat-logistic (on
+    stats and stat_weights), fitted (Bradley-Terry on results, a results file
+    or table, or an already fitted BradleyTerryModel) or battles (the verdicts
+    in battle_cache from battle_model and battle_prompt_version). Several
+    names are blended with the given weights.
+    """
+    models = []
+    for name in names:
+        if name == "elo":
+            if ratings is None:
+                raise ValueError("The elo win model needs ratings")
+            models.append(EloModel(ratings, scale))
+        elif name == "stat-logistic":
+            if stats is None or stat_weights is None:
+                raise ValueError("The stat-logistic win model needs stats and weights")
+            models.append(StatLogisticModel(stats, stat_weights))
+        elif name == "fitted":
+            if results is None:
+                raise ValueError("The fitted win model needs a game results file")
+            models.append(results if isinstance(results, BradleyTerryModel) else BradleyTerryModel(results))
+        elif name == "battles":
+            if battle_cache is None:
+                raise ValueError("The battles win model needs a battle cache")
+            models.append(BattleVerdictModel(battle_cache, battle_model, battle_prompt_version))
+        else:
+            raise ValueError(f"Unknown win model '{name}'; choose from {', '.join(WIN_MODELS)}")
+    return models[0] if len(models) == 1 else BlendModel(models, weights, blend_space)